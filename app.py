@@ -0,0 +1,225 @@
+import logging
+import asyncio
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from typing import Optional
+
+from config import BOT_TOKEN, BOT_MODE, TELEGRAM_API_URL, FSM_STORAGE, REDIS_URL
+from handlers import register_all_handlers
+from middlewares import setup_middleware
+from database.models import init_db
+from database.connection_pool import close_pool, set_pool_observer
+from database.activity_buffer import activity_buffer
+from database.path_registry import path_registry
+from database.fsm_storage import SQLiteStorage
+from database.user_cache import user_cache
+from config import DATABASE_PATH, IMAGE_CACHE_CHAT_ID, TEXTS_RELOAD_INTERVAL, METRICS_HOST, METRICS_PORT
+from services.image_registry import warm_up_images
+from services.image_variants import load_image_variants, get_image_variants_stats
+from services.materials_index import materials_index
+from services.search_index import search_index
+from services.previews import preview_cache
+from services.file_streaming import get_upload_stats, shutdown_upload_executor
+from services.inline_search import get_inline_cache_stats
+from services.outbound import outbound_scheduler
+from services.file_id_cache import get_file_id_cache_stats
+from services.metrics import registry, ApiMetricsMiddleware, DB_WAIT_SECONDS, DB_SECONDS, start_metrics_server
+from services.text_manager import reload_texts, watch_texts
+from keyboards.learning_kb import get_keyboard_cache_stats
+from middlewares.ordering import update_ordering
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def create_bot() -> Bot:
+    """
+    Создает экземпляр бота (с нестандартным сервером Bot API, если он задан)
+    """
+    session = None
+    if TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+
+    bot = Bot(token=BOT_TOKEN, session=session, default=DefaultBotProperties(parse_mode="HTML"))
+
+    # Все исходящие запросы проходят через планировщик с учетом лимитов Telegram
+    bot.session.middleware(outbound_scheduler)
+    # Время самих запросов к Telegram (без ожидания в очереди) и объем загрузок
+    bot.session.middleware(ApiMetricsMiddleware())
+    return bot
+
+def create_storage() -> BaseStorage:
+    """
+    Создает хранилище состояний FSM согласно настройке FSM_STORAGE.
+    При нескольких процессах нужно общее хранилище (sqlite или redis)
+    """
+    if FSM_STORAGE == "sqlite":
+        return SQLiteStorage()
+
+    if FSM_STORAGE == "redis":
+        try:
+            from aiogram.fsm.storage.redis import RedisStorage
+        except ImportError as e:
+            raise RuntimeError("FSM_STORAGE=redis requires the 'redis' package") from e
+        return RedisStorage.from_url(REDIS_URL)
+
+    return MemoryStorage()
+
+# Создание экземпляра бота и диспетчера с новым синтаксисом для 3.7.0+
+bot = create_bot()
+storage = create_storage()
+dp = Dispatcher(storage=storage)
+
+# Фоновые задачи, которые нужно остановить при завершении работы
+background_tasks = []
+
+# Сервер метрик (если включен)
+metrics_runner = None
+
+def _observe_db(wait: float, held: float) -> None:
+    """
+    Записывает в метрики время ожидания соединения с базой и время работы с ним
+    """
+    DB_WAIT_SECONDS.observe(wait)
+    DB_SECONDS.observe(held)
+
+def setup_metrics():
+    """
+    Подключает к метрикам статистику базы данных, кэшей и очередей
+    """
+    set_pool_observer(_observe_db)
+
+    registry.register_stats("user_cache", user_cache.stats, "User profile cache")
+    registry.register_stats("file_id_cache", get_file_id_cache_stats, "Telegram file_id cache")
+    registry.register_stats("keyboard_cache", get_keyboard_cache_stats, "Navigation keyboard cache")
+    registry.register_stats("outbound", outbound_scheduler.stats, "Outbound request scheduler")
+    registry.register_stats("updates", update_ordering.stats, "Update processing")
+    registry.register_stats(
+        "materials_index",
+        lambda: {"version": materials_index.version, "directories": len(materials_index.iter_listings())},
+        "Materials index"
+    )
+    registry.register_stats("search_index", search_index.stats, "Materials search index")
+    registry.register_stats("uploads", get_upload_stats, "File uploads to Telegram")
+    registry.register_stats("inline_cache", get_inline_cache_stats, "Inline query results cache")
+    registry.register_stats("previews", preview_cache.stats, "Material previews")
+    registry.register_stats("image_variants", get_image_variants_stats, "Optimized interface images")
+
+async def on_startup(worker_index: Optional[int] = None):
+    """
+    Действия, выполняемые при запуске бота
+    """
+    logger.info("Starting bot...")
+
+    # Инициализируем базу данных
+    init_db(DATABASE_PATH)
+
+    # Собираем каталог переводов заранее, чтобы ошибки в переводах были видны при запуске
+    reload_texts()
+    if TEXTS_RELOAD_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(watch_texts(TEXTS_RELOAD_INTERVAL)))
+
+    # Настраиваем обработчики и middleware
+    register_all_handlers(dp)
+    setup_middleware(dp)
+    setup_metrics()
+
+    # Загружаем сохраненные идентификаторы путей, чтобы кнопки старых сообщений продолжали работать
+    await asyncio.to_thread(path_registry.load)
+
+    # Запускаем фоновую запись активности пользователей
+    activity_buffer.start()
+
+    # Строим индекс материалов и запускаем отслеживание изменений
+    await materials_index.start()
+
+    # Загружаем поисковый индекс и обновляем его по дереву материалов
+    # (при нескольких процессах индекс обновляет и сохраняет только первый, остальные перечитывают файл)
+    await search_index.start(build=not worker_index)
+
+    # Строим превью PDF и изображений в пуле процессов, не задерживая запуск бота
+    # (при нескольких процессах превью строит только первый, остальные перечитывают его список)
+    await preview_cache.start(build=not worker_index)
+
+    # Загружаем список оптимизированных вариантов изображений интерфейса и расписаний
+    await asyncio.to_thread(load_image_variants)
+
+    # Заранее загружаем изображения интерфейса, не задерживая запуск бота
+    # (при нескольких процессах это делает только первый)
+    if IMAGE_CACHE_CHAT_ID and not worker_index:
+        asyncio.create_task(warm_up_images(bot, IMAGE_CACHE_CHAT_ID))
+
+    # Запускаем сервер метрик (при нескольких процессах у каждого свой порт)
+    if METRICS_PORT:
+        global metrics_runner
+        metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT + (worker_index or 0))
+
+    logger.info("Bot started successfully!")
+
+async def on_shutdown():
+    """
+    Действия, выполняемые при остановке бота
+    """
+    logger.info("Stopping bot...")
+
+    # Останавливаем фоновые задачи
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+
+    # Останавливаем сервер метрик
+    global metrics_runner
+    if metrics_runner is not None:
+        await metrics_runner.cleanup()
+        metrics_runner = None
+
+    # Останавливаем отслеживание изменений в материалах
+    await materials_index.stop()
+    await search_index.stop()
+    await preview_cache.stop()
+
+    # Останавливаем потоки чтения загружаемых файлов
+    shutdown_upload_executor()
+
+    # Сохраняем накопленную активность и закрываем соединения с базой данных
+    await activity_buffer.stop()
+    await storage.close()
+    close_pool()
+
+async def main(worker_index: Optional[int] = None):
+    """
+    Главная функция запуска бота
+
+    Аргументы:
+        worker_index (Optional[int]): Номер процесса-обработчика, если бот запущен в нескольких процессах
+    """
+    # Устанавливаем обработчики событий запуска и остановки
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+
+    # Запускаем бота
+    if BOT_MODE == "webhook":
+        # Сессию бота закрывает обработчик вебхука после обработки принятых обновлений
+        from webhook import run_webhook
+        await run_webhook(
+            dp,
+            bot,
+            reuse_port=worker_index is not None,
+            # Вебхук в Telegram регистрирует только один процесс
+            set_webhook=not worker_index,
+            worker_index=worker_index
+        )
+        return
+
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await bot.session.close()
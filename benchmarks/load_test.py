@@ -0,0 +1,328 @@
+"""
+Нагрузочный тест бота без обращения к Telegram.
+
+Собирает настоящий диспетчер (обработчики, middleware, индекс материалов, база данных),
+подменяет сессию бота на фиктивную, которая только записывает запросы к API,
+и прогоняет синтетические сценарии множества пользователей:
+/start -> выбор языка -> личный кабинет -> университет -> факультет -> центр обучения ->
+навигация вглубь папок -> превью и скачивание файла.
+
+Пример запуска:
+    python benchmarks/load_test.py --users 2000 --concurrency 200
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import datetime
+import itertools
+import tempfile
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+def _prepare_environment(args: argparse.Namespace, db_path: str) -> None:
+    """
+    Настраивает окружение до импорта модулей бота (config читает его при импорте)
+    """
+    sys.path.insert(0, str(ROOT_DIR))
+    os.environ.setdefault("BOT_TOKEN", "123456:LOAD-TEST")
+    os.environ["MATERIALS_FOLDER"] = args.materials
+    os.environ["DATABASE_PATH"] = db_path
+    os.environ["MATERIALS_POLL_INTERVAL"] = "0"
+    os.environ["TEXTS_RELOAD_INTERVAL"] = "0"
+    os.environ["METRICS_PORT"] = "0"
+    os.environ.pop("IMAGE_CACHE_CHAT_ID", None)
+
+    if not args.with_pacing:
+        # Без ограничения частоты измеряется сам бот, а не лимиты Telegram
+        os.environ["OUTBOUND_GLOBAL_RATE"] = "1000000000"
+        os.environ["OUTBOUND_CHAT_RATE"] = "1000000000"
+        os.environ["OUTBOUND_CHAT_BURST"] = "1000000000"
+        os.environ["OUTBOUND_GROUP_RATE"] = "1000000000"
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Вычисляет перцентиль (методом ближайшего ранга)
+
+    Аргументы:
+        values (List[float]): Отсортированные значения
+        q (float): Перцентиль от 0 до 100
+
+    Возвращает:
+        float: Значение перцентиля (0, если значений нет)
+    """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    Сводка по времени обработки, в миллисекундах
+    """
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Прогоняет нагрузочный тест и возвращает результаты
+    """
+    import logging
+
+    from aiogram import Bot
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.client.session.base import BaseSession
+    from aiogram.types import (
+        Update, Message, CallbackQuery, Chat, User, PhotoSize, Document, InlineKeyboardMarkup
+    )
+
+    import app
+    from keyboards.main_kb import get_main_menu_button_text
+    from services.metrics import ApiMetricsMiddleware
+    from services.materials_index import materials_index
+    from services.previews import preview_cache
+
+    # Логи каждого обновления искажают измерения
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("aiogram").setLevel(logging.WARNING)
+
+    api_calls: Counter = Counter()
+    message_ids = itertools.count(1)
+    # Все сообщения, которые вернула фиктивная сессия
+    sent_messages: List[Message] = []
+
+    class RecordingSession(BaseSession):
+        """
+        Сессия бота, которая не отправляет запросы, а записывает их и возвращает правдоподобные ответы
+        """
+
+        async def make_request(self, bot, method, timeout=None):
+            api_method = method.__api_method__
+            api_calls[api_method] += 1
+
+            if args.api_latency:
+                await asyncio.sleep(args.api_latency / 1000)
+
+            if method.__returning__ is bool or api_method in ("deleteMessage", "answerCallbackQuery"):
+                return True
+
+            chat_id = getattr(method, "chat_id", None) or 1
+            fields = dict(
+                message_id=next(message_ids),
+                date=datetime.datetime.now(),
+                chat=Chat(id=chat_id, type="private")
+            )
+            reply_markup = getattr(method, "reply_markup", None)
+            if isinstance(reply_markup, InlineKeyboardMarkup):
+                fields["reply_markup"] = reply_markup
+
+            if api_method in ("sendPhoto", "editMessageMedia", "editMessageCaption"):
+                fields["photo"] = [PhotoSize(file_id=f"photo-{api_method}-{fields['message_id']}",
+                                             file_unique_id="u", width=1, height=1)]
+                fields["caption"] = getattr(method, "caption", None)
+            elif api_method == "sendDocument":
+                fields["document"] = Document(file_id=f"doc-{fields['message_id']}", file_unique_id="u")
+                fields["caption"] = getattr(method, "caption", None)
+            else:
+                fields["text"] = getattr(method, "text", None) or "text"
+
+            message = Message(**fields)
+            sent_messages.append(message)
+            return message
+
+        async def close(self):
+            pass
+
+        async def stream_content(self, *args, **kwargs):
+            yield b""
+
+    session = RecordingSession()
+    if args.with_pacing:
+        session.middleware(app.outbound_scheduler)
+    session.middleware(ApiMetricsMiddleware())
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=session, default=DefaultBotProperties(parse_mode="HTML"))
+
+    await app.on_startup()
+
+    # Превью строятся в фоне после запуска; измеряем работу с уже построенными превью
+    while preview_cache.enabled and preview_cache.synced_version != materials_index.version:
+        await asyncio.sleep(0.1)
+
+    update_ids = itertools.count(1)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    rng = random.Random(args.seed)
+    languages = args.languages.split(",")
+
+    async def feed(step: str, update: Update) -> None:
+        """
+        Передает обновление диспетчеру и измеряет время его обработки
+        """
+        started = time.perf_counter()
+        try:
+            await app.dp.feed_update(bot, update)
+        except Exception as e:
+            errors[f"{step}: {type(e).__name__}"] += 1
+        latencies[step].append(time.perf_counter() - started)
+
+    async def simulate_user(index: int) -> None:
+        user = User(id=10_000_000 + index, is_bot=False, first_name=f"user{index}")
+        chat = Chat(id=user.id, type="private")
+        language = rng.choice(languages)
+        last_message: Dict[str, Message] = {}
+
+        # Запоминаем последнее сообщение бота с инлайн-клавиатурой, как его видит пользователь
+        def remember(result: Any) -> None:
+            if isinstance(result, Message) and result.reply_markup is not None and result.chat.id == user.id:
+                last_message["message"] = result
+
+        def message_update(text: str) -> Update:
+            return Update(update_id=next(update_ids), message=Message(
+                message_id=next(message_ids), date=datetime.datetime.now(), chat=chat, from_user=user, text=text
+            ))
+
+        def callback_update(data: str) -> Update:
+            message = last_message.get("message") or Message(
+                message_id=next(message_ids), date=datetime.datetime.now(), chat=chat, text="text"
+            )
+            return Update(update_id=next(update_ids), callback_query=CallbackQuery(
+                id=str(next(message_ids)), from_user=user, chat_instance="load-test", data=data, message=message
+            ))
+
+        def find_buttons(prefix: str, text_prefix: str = "") -> List[str]:
+            message = last_message.get("message")
+            if message is None or message.reply_markup is None:
+                return []
+            return [
+                button.callback_data
+                for row in message.reply_markup.inline_keyboard
+                for button in row
+                if button.callback_data and button.callback_data.startswith(prefix)
+                and button.text.startswith(text_prefix)
+            ]
+
+        async def step(name: str, update: Update) -> None:
+            results_before = len(sent_messages)
+            await feed(name, update)
+            for result in sent_messages[results_before:]:
+                remember(result)
+
+        await step("start", message_update("/start"))
+        await step("language", callback_update(f"language:{language}"))
+        await step("profile", message_update(get_main_menu_button_text(language, "profile_button")))
+        await step("university", callback_update("univ:spbgpmu"))
+
+        faculties = find_buttons("faculty:")
+        if faculties:
+            await step("faculty", callback_update(rng.choice(faculties)))
+
+        await step("learning", message_update(get_main_menu_button_text(language, "learning_center_button")))
+
+        for _ in range(args.depth):
+            files = find_buttons("dl:") + find_buttons("pv:")
+            if files and rng.random() < 0.7:
+                break
+
+            # Кнопка "Назад" тоже ведет на nav:, поэтому выбираем только папки
+            folders = find_buttons("nav:", "📁")
+            if not folders:
+                break
+
+            await step("navigate", callback_update(rng.choice(folders)))
+
+        # PDF и изображения сначала открываются как превью, файл целиком скачивается кнопкой под ним
+        previews = find_buttons("pv:")
+        files = find_buttons("dl:")
+        if previews and (not files or rng.random() < len(previews) / (len(previews) + len(files))):
+            await step("preview", callback_update(rng.choice(previews)))
+            files = find_buttons("dl:")
+            if not files or rng.random() >= 0.5:
+                return
+
+        if files:
+            await step("download", callback_update(rng.choice(files)))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(index: int) -> None:
+        async with semaphore:
+            await simulate_user(index)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(index) for index in range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    await app.on_shutdown()
+
+    total_updates = sum(len(values) for values in latencies.values())
+    total_calls = sum(api_calls.values())
+    all_latencies = [value for values in latencies.values() for value in values]
+
+    return {
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "updates": total_updates,
+        "elapsed_s": elapsed,
+        "updates_per_s": total_updates / elapsed if elapsed else 0.0,
+        "api_calls": total_calls,
+        "api_calls_per_update": total_calls / total_updates if total_updates else 0.0,
+        "api_calls_by_method": dict(api_calls.most_common()),
+        "latency": summarize(all_latencies),
+        "latency_by_step": {name: summarize(values) for name, values in latencies.items()},
+        "errors": dict(errors)
+    }
+
+def print_report(result: Dict[str, Any]) -> None:
+    """
+    Выводит результаты в виде таблицы
+    """
+    print(f"Users: {result['users']}, concurrency: {result['concurrency']}")
+    print(f"Updates: {result['updates']} in {result['elapsed_s']:.2f} s ({result['updates_per_s']:.1f} updates/s)")
+    print(f"API calls: {result['api_calls']} ({result['api_calls_per_update']:.2f} per update)")
+    print()
+    print(f"{'step':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(result["latency_by_step"].items()) + [("total", result["latency"])]
+    for name, stats in rows:
+        print(f"{name:<12}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    print()
+    print("API calls by method: " + ", ".join(f"{name}={count}" for name, count in result["api_calls_by_method"].items()))
+    if result["errors"]:
+        print("Errors: " + ", ".join(f"{name}={count}" for name, count in result["errors"].items()))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test of the bot dispatcher")
+    parser.add_argument("--users", type=int, default=1000, help="number of simulated users")
+    parser.add_argument("--concurrency", type=int, default=100, help="users active at the same time")
+    parser.add_argument("--depth", type=int, default=6, help="maximum navigation depth")
+    parser.add_argument("--languages", default="ru,en,ar", help="comma-separated user languages")
+    parser.add_argument("--materials", default=str(ROOT_DIR / "materials"), help="materials folder")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated Telegram API latency, ms")
+    parser.add_argument("--with-pacing", action="store_true", help="keep outbound rate limiting enabled")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--json", dest="json_path", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _prepare_environment(args, os.path.join(tmp_dir, "load_test.db"))
+        result = asyncio.run(run(args))
+
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Микробенчмарки функций, которые выполняются почти на каждое обновление:
+построение клавиатур (навигация, выбор факультета, главное меню), smart_sort_key и get_text.
+
+Дерево материалов генерируется во временной папке: папки с 10, 1 000 и 10 000 элементов.
+Каждый бенчмарк выполняется для всех языков интерфейса.
+
+Примеры запуска:
+    python benchmarks/microbench.py --save baseline.json
+    python benchmarks/microbench.py --compare baseline.json --threshold 0.25
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import inspect
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Размеры синтетических папок (количество элементов)
+TREE_SIZES = (10, 1000, 10000)
+
+# Языки интерфейса
+LANGUAGES = ("ru", "en", "ar")
+
+# Шаблоны имен элементов: русские и английские названия с номерами, как в реальных материалах
+NAME_TEMPLATES = (
+    "Лекция {n}",
+    "Lecture {n}",
+    "{n} семестр",
+    "Тема {n}. Введение",
+    "Методичка по анатомии {n}",
+    "Exam questions {n}-{m}",
+    "Атлас",
+    "Практическое занятие №{n}"
+)
+
+def _prepare_environment(materials_dir: str, db_path: str) -> None:
+    """
+    Настраивает окружение до импорта модулей бота (config читает его при импорте)
+    """
+    sys.path.insert(0, str(ROOT_DIR))
+    os.environ.setdefault("BOT_TOKEN", "123456:MICROBENCH")
+    os.environ["MATERIALS_FOLDER"] = materials_dir
+    os.environ["DATABASE_PATH"] = db_path
+    os.environ["MATERIALS_POLL_INTERVAL"] = "0"
+    os.environ["TEXTS_RELOAD_INTERVAL"] = "0"
+
+def build_tree(root: str, sizes=TREE_SIZES, seed: int = 1) -> Dict[int, str]:
+    """
+    Создает синтетическое дерево материалов: для каждого размера - папку факультета
+    с указанным количеством подпапок и файлов
+
+    Аргументы:
+        root (str): Корневая папка
+        sizes: Количества элементов
+        seed (int): Начальное значение генератора случайных чисел
+
+    Возвращает:
+        Dict[int, str]: Размер -> путь к папке с этим количеством элементов
+    """
+    rng = random.Random(seed)
+    paths = {}
+
+    for size in sizes:
+        folder = os.path.join(root, f"Факультет {size}", "Материалы")
+        os.makedirs(folder, exist_ok=True)
+
+        names = set()
+        while len(names) < size:
+            template = rng.choice(NAME_TEMPLATES)
+            name = template.format(n=rng.randint(1, size), m=rng.randint(1, 99))
+            if name in names:
+                name = f"{name} ({len(names)})"
+            names.add(name)
+
+        for index, name in enumerate(sorted(names)):
+            # Примерно каждый пятый элемент - папка, остальные - файлы
+            if index % 5 == 0:
+                os.makedirs(os.path.join(folder, name), exist_ok=True)
+            else:
+                with open(os.path.join(folder, f"{name}.pdf"), "wb") as file:
+                    file.write(b"%PDF-1.4\n")
+
+        paths[size] = folder
+
+    return paths
+
+async def measure(
+        function: Callable[[], Union[Any, Awaitable[Any]]],
+        repeat: int,
+        min_time: float
+) -> Dict[str, float]:
+    """
+    Измеряет время одного вызова функции
+
+    Аргументы:
+        function (Callable): Функция без аргументов (обычная или асинхронная)
+        repeat (int): Количество серий измерений
+        min_time (float): Минимальная длительность одной серии в секундах
+
+    Возвращает:
+        Dict[str, float]: Медиана и минимум времени одного вызова в микросекундах и число вызовов в серии
+    """
+    async def call() -> None:
+        result = function()
+        if inspect.isawaitable(result):
+            await result
+
+    # Подбираем количество вызовов в серии, чтобы серия длилась не меньше min_time
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            await call()
+        if time.perf_counter() - started >= min_time or number >= 1_000_000:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await call()
+        timings.append((time.perf_counter() - started) / number)
+
+    timings.sort()
+    return {
+        "median_us": timings[len(timings) // 2] * 1e6,
+        "min_us": timings[0] * 1e6,
+        "number": number
+    }
+
+async def run(args: argparse.Namespace, tree: Dict[int, str]) -> Dict[str, Dict[str, float]]:
+    """
+    Выполняет все микробенчмарки
+
+    Возвращает:
+        Dict[str, Dict[str, float]]: Имя бенчмарка -> результаты измерения
+    """
+    from database.models import init_db
+    from config import DATABASE_PATH
+    from services.materials_index import materials_index
+    from services.text_manager import reload_texts, get_text, get_catalog
+    from keyboards.learning_kb import get_navigation_keyboard, clear_keyboard_cache, smart_sort_key
+    from keyboards.university_kb import get_faculty_selection_keyboard_with_selected
+    from keyboards.main_kb import get_main_keyboard
+
+    init_db(DATABASE_PATH)
+    reload_texts()
+    materials_index.build()
+
+    benchmarks: Dict[str, Callable[[], Any]] = {}
+
+    for language in LANGUAGES:
+        keys = list(get_catalog().get_texts(language))
+
+        def lookup_all(language=language, keys=keys):
+            for key in keys:
+                get_text(language, key)
+
+        benchmarks[f"get_text/all_keys/{language}"] = lookup_all
+        benchmarks[f"get_main_keyboard/{language}"] = lambda language=language: get_main_keyboard(language)
+        benchmarks[f"faculty_keyboard/{language}"] = lambda language=language: (
+            get_faculty_selection_keyboard_with_selected(language, "spbgpmu", "Факультет 10")
+        )
+
+    for size, folder in tree.items():
+        names = os.listdir(folder)
+        benchmarks[f"smart_sort_key/sort/{size}"] = lambda names=names: sorted(names, key=smart_sort_key)
+        # Сортировка по ключам, заранее вычисленным при построении индекса материалов
+        entries = materials_index.get_listing(folder).files
+        benchmarks[f"smart_sort_key/presorted_keys/{size}"] = (
+            lambda entries=entries: sorted(entries, key=lambda entry: entry.sort_key)
+        )
+
+        parent = os.path.dirname(folder)
+        for language in LANGUAGES:
+            # Первое построение регистрирует идентификаторы путей в базе, дальше они берутся из памяти
+            await get_navigation_keyboard(language, folder, parent)
+
+            async def cold(language=language, folder=folder, parent=parent):
+                clear_keyboard_cache()
+                await get_navigation_keyboard(language, folder, parent)
+
+            benchmarks[f"navigation_keyboard/cold/{size}/{language}"] = cold
+            benchmarks[f"navigation_keyboard/warm/{size}/{language}"] = (
+                lambda language=language, folder=folder, parent=parent:
+                get_navigation_keyboard(language, folder, parent)
+            )
+
+    results = {}
+    for name, function in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = await measure(function, args.repeat, args.min_time)
+        print(f"{name:<48}{results[name]['median_us']:>14.2f} us")
+
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Сравнивает результаты с базовыми и находит регрессии
+
+    Аргументы:
+        results (Dict[str, Dict[str, float]]): Текущие результаты
+        baseline (Dict[str, Any]): Сохраненные базовые результаты
+        threshold (float): Допустимое относительное замедление (0.25 - на 25%)
+
+    Возвращает:
+        List[str]: Описания регрессий
+    """
+    regressions = []
+    base_results = baseline.get("results", {})
+
+    print()
+    print(f"{'benchmark':<48}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for name, current in results.items():
+        base = base_results.get(name)
+        if base is None:
+            continue
+
+        change = current["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(f"{name}: {base['median_us']:.2f} us -> {current['median_us']:.2f} us ({change:+.0%})")
+        print(f"{name:<48}{base['median_us']:>14.2f}{current['median_us']:>14.2f}{change:>+10.0%}{marker}")
+
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of keyboard builders and text lookups")
+    parser.add_argument("--repeat", type=int, default=5, help="measurement series per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum duration of one series, s")
+    parser.add_argument("--sizes", default=",".join(map(str, TREE_SIZES)),
+                        help="comma-separated numbers of entries in synthetic folders")
+    parser.add_argument("--filter", help="run only benchmarks whose name contains this string")
+    parser.add_argument("--save", help="write results to this JSON file (baseline)")
+    parser.add_argument("--compare", help="compare with a baseline JSON file and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        materials_dir = os.path.join(tmp_dir, "materials")
+        tree = build_tree(materials_dir, [int(size) for size in args.sizes.split(",")])
+        _prepare_environment(materials_dir, os.path.join(tmp_dir, "microbench.db"))
+
+        results = asyncio.run(run(args, tree))
+
+        from database.connection_pool import close_pool
+        close_pool()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results
+            }, file, indent=2, ensure_ascii=False)
+        print(f"\nResults saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+        print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,130 @@ load_dotenv()
 
 # Основные настройки бота
 BOT_TOKEN = os.getenv("BOT_TOKEN")
+# Адрес сервера Bot API (например, локального сервера или тестовой заглушки); по умолчанию api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
 CHANNEL_LINK = os.getenv("CHANNEL_LINK")
 MATERIALS_FOLDER = os.getenv("MATERIALS_FOLDER", "data/materials")
 IMAGES_FOLDER = os.getenv("IMAGES_FOLDER", "images/schedule")
 INTERFACE_IMAGES_FOLDER = os.getenv("INTERFACE_IMAGES_FOLDER", "images/interface")
 DEFAULT_LANGUAGE = os.getenv("LANGUAGE_DEFAULT", "ru")
 
+# Оптимизированные варианты изображений интерфейса и расписаний (собираются scripts/build_images.py):
+# папка с вариантами и manifest.json, формат (jpeg или webp) и максимальный размер отправляемого варианта
+IMAGE_VARIANTS_DIR = os.getenv("IMAGE_VARIANTS_DIR", "images/optimized")
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "jpeg")
+IMAGE_VARIANT_SIZE = int(os.getenv("IMAGE_VARIANT_SIZE", "1280"))
+
+# Интервал (в секундах) проверки изменений в папке с материалами, 0 - не проверять
+MATERIALS_POLL_INTERVAL = float(os.getenv("MATERIALS_POLL_INTERVAL", "60"))
+# Интервал (в секундах) проверки размера и времени модификации всех файлов с материалами, 0 - не проверять.
+# Обычная проверка смотрит только на папки и не замечает файлы, перезаписанные на месте;
+# полная проверка делает stat каждого файла, поэтому на сетевых дисках ее стоит запускать редко
+MATERIALS_FILE_CHECK_INTERVAL = float(os.getenv("MATERIALS_FILE_CHECK_INTERVAL", "3600"))
+
+# Максимальное количество готовых клавиатур навигации в кэше
+KEYBOARD_CACHE_SIZE = int(os.getenv("KEYBOARD_CACHE_SIZE", "2000"))
+
+# Количество папок и файлов на одной странице клавиатуры навигации
+NAV_PAGE_SIZE = int(os.getenv("NAV_PAGE_SIZE", "30"))
+
+# Служебный чат для предварительной загрузки изображений интерфейса и расписаний при запуске.
+# Если не задан, изображения загружаются в Telegram при первой отправке
+IMAGE_CACHE_CHAT_ID = os.getenv("IMAGE_CACHE_CHAT_ID")
+
+# Режим получения обновлений: polling или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# Настройки режима webhook
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Сколько секунд при остановке ждать обработки уже принятых обновлений
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))
+
+# Количество процессов-обработчиков вебхука (слушают один порт через SO_REUSEPORT)
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "1"))
+# Время жизни профиля в кэше при нескольких процессах: профиль, измененный в другом процессе,
+# может устареть не дольше чем на это время
+WORKER_USER_CACHE_TTL = float(os.getenv("WORKER_USER_CACHE_TTL", "2"))
+
+# Хранилище состояний FSM: memory, sqlite или redis
+FSM_STORAGE = os.getenv("FSM_STORAGE", "memory")
+# Адрес Redis-совместимого сервера для FSM_STORAGE=redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
 # Пути к директориям проекта
 BASE_DIR = Path(__file__).resolve().parent
 TEXTS_DIR = BASE_DIR / "texts"
-DATABASE_PATH = BASE_DIR / "database" / "lsp_bot.db"
+# Интервал (в секундах) проверки изменений в файлах переводов, 0 - не проверять
+TEXTS_RELOAD_INTERVAL = float(os.getenv("TEXTS_RELOAD_INTERVAL", "10"))
+DATABASE_PATH = Path(os.getenv("DATABASE_PATH", BASE_DIR / "database" / "lsp_bot.db"))
+
+# Настройки пула соединений с базой данных
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "8192"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5"))
+
+# Отложенная запись активности пользователей: интервал (в секундах) и размер буфера
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", "10"))
+ACTIVITY_FLUSH_SIZE = int(os.getenv("ACTIVITY_FLUSH_SIZE", "500"))
+
+# Кэш профилей пользователей: максимальное количество записей и время жизни (в секундах)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+
+# Параллельная обработка обновлений: максимум одновременно обрабатываемых обновлений,
+# очередь одного пользователя, после которой отбрасываются нажатия кнопок и inline-запросы,
+# и очередь, после которой отбрасываются и сообщения (пользователь получает уведомление)
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "64"))
+UPDATE_USER_PENDING_LIMIT = int(os.getenv("UPDATE_USER_PENDING_LIMIT", "5"))
+UPDATE_USER_QUEUE_LIMIT = int(os.getenv("UPDATE_USER_QUEUE_LIMIT", "20"))
+
+# HTTP-сервер метрик в формате Prometheus (/metrics); 0 - не запускать
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Ограничение частоты исходящих сообщений (лимиты Telegram): всего в секунду,
+# в один личный чат в секунду (с допустимым всплеском) и в одну группу в секунду.
+# Общий лимит относится ко всему боту и делится между процессами вебхука (WEBHOOK_WORKERS),
+# лимиты чатов действуют в каждом процессе отдельно
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "3"))
+OUTBOUND_GROUP_RATE = float(os.getenv("OUTBOUND_GROUP_RATE", str(20 / 60)))
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+OUTBOUND_MAX_CHATS = int(os.getenv("OUTBOUND_MAX_CHATS", "10000"))
+
+# Загрузка файлов в Telegram: размер части файла, которая читается за раз (в байтах),
+# максимум одновременных загрузок и количество потоков чтения файлов
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+UPLOAD_THREADS = int(os.getenv("UPLOAD_THREADS", "4"))
+
+# Поиск по материалам: файл индекса, количество результатов,
+# максимум символов текста и страниц, извлекаемых из одного документа
+SEARCH_INDEX_PATH = Path(os.getenv("SEARCH_INDEX_PATH", DATABASE_PATH.parent / "search_index.json"))
+SEARCH_RESULTS_LIMIT = int(os.getenv("SEARCH_RESULTS_LIMIT", "10"))
+SEARCH_MAX_TEXT_CHARS = int(os.getenv("SEARCH_MAX_TEXT_CHARS", "200000"))
+SEARCH_PDF_MAX_PAGES = int(os.getenv("SEARCH_PDF_MAX_PAGES", "50"))
+
+# Превью материалов (первая страница PDF, уменьшенные изображения): папка кэша превью,
+# количество процессов построения (0 - превью выключены), размер большей стороны в пикселях и качество JPEG
+PREVIEW_CACHE_DIR = Path(os.getenv("PREVIEW_CACHE_DIR", DATABASE_PATH.parent / "previews"))
+PREVIEW_WORKERS = int(os.getenv("PREVIEW_WORKERS", "2"))
+PREVIEW_MAX_SIZE = int(os.getenv("PREVIEW_MAX_SIZE", "1280"))
+PREVIEW_QUALITY = int(os.getenv("PREVIEW_QUALITY", "80"))
+
+# Инлайн-режим (@бот запрос): результатов на странице, максимум результатов на запрос,
+# размер и время жизни (в секундах) кэша результатов и время кэширования ответа на стороне Telegram
+INLINE_PAGE_SIZE = int(os.getenv("INLINE_PAGE_SIZE", "20"))
+INLINE_MAX_RESULTS = int(os.getenv("INLINE_MAX_RESULTS", "200"))
+INLINE_CACHE_SIZE = int(os.getenv("INLINE_CACHE_SIZE", "1000"))
+INLINE_CACHE_TTL = float(os.getenv("INLINE_CACHE_TTL", "60"))
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))
 
 # Инструкции для личного кабинета
 PROFILE_INSTRUCTIONS = {
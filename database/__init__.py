@@ -1,21 +1,43 @@
 from database.models import User, init_db, get_connection
+from database.connection_pool import ConnectionPool, get_pool, close_pool
+from database.user_cache import UserCache, user_cache
+from database.path_registry import PathRegistry, path_registry
+from database.fsm_storage import SQLiteStorage
 from database.db_manager import (
     set_user_language,
     get_user_language,
     set_user_faculty,
     get_user_faculty,
     get_user,
-    update_user_activity
+    update_user_activity,
+    flush_user_activity,
+    get_cached_file_id,
+    get_cached_file_ids,
+    save_file_id,
+    delete_file_id
 )
 
 # Экспортируем основные функции для работы с БД
 __all__ = [
     'User',
     'init_db',
+    'ConnectionPool',
+    'get_pool',
+    'close_pool',
+    'UserCache',
+    'user_cache',
+    'PathRegistry',
+    'path_registry',
+    'SQLiteStorage',
     'set_user_language',
     'get_user_language',
     'set_user_faculty',
     'get_user_faculty',
     'get_user',
-    'update_user_activity'
+    'update_user_activity',
+    'flush_user_activity',
+    'get_cached_file_id',
+    'get_cached_file_ids',
+    'save_file_id',
+    'delete_file_id'
 ]
\ No newline at end of file
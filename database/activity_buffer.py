@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from database.connection_pool import get_pool
+from config import ACTIVITY_FLUSH_INTERVAL, ACTIVITY_FLUSH_SIZE
+
+def _current_timestamp() -> str:
+    """
+    Возвращает текущее время в том же формате, что и CURRENT_TIMESTAMP в SQLite
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def _flush_activity_sync(items: List[Tuple[str, int]]) -> None:
+    """
+    Записывает накопленные отметки активности одной транзакцией
+
+    Аргументы:
+        items (List[Tuple[str, int]]): Пары (время активности, идентификатор пользователя)
+    """
+    with get_pool().connection() as conn:
+        conn.executemany(
+            """
+            UPDATE users
+            SET last_activity = ?
+            WHERE user_id = ?
+            """,
+            items
+        )
+
+class ActivityBuffer:
+    """
+    Буфер отложенной записи активности пользователей.
+    Отметки времени объединяются по user_id в памяти и записываются в базу
+    одной транзакцией по таймеру или при достижении порога размера.
+    """
+
+    def __init__(self, flush_interval: float = ACTIVITY_FLUSH_INTERVAL, max_size: int = ACTIVITY_FLUSH_SIZE):
+        """
+        Аргументы:
+            flush_interval (float): Интервал записи в базу в секундах
+            max_size (int): Количество пользователей в буфере, при котором запись начинается сразу
+        """
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending: Dict[int, str] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: int) -> None:
+        """
+        Отмечает активность пользователя (без обращения к базе данных)
+
+        Аргументы:
+            user_id (int): Идентификатор пользователя
+        """
+        self._pending[user_id] = _current_timestamp()
+
+        # При переполнении буфера записываем его, не дожидаясь таймера
+        if len(self._pending) >= self.max_size and (self._flush_task is None or self._flush_task.done()):
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                # Нет запущенного цикла событий, запись произойдет при следующем flush
+                pass
+
+    async def flush(self) -> int:
+        """
+        Записывает накопленную активность в базу данных
+
+        Возвращает:
+            int: Количество обновленных пользователей
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            items = [(timestamp, user_id) for user_id, timestamp in pending.items()]
+
+            try:
+                await asyncio.to_thread(_flush_activity_sync, items)
+            except Exception as e:
+                print(f"Error flushing user activity: {e}")
+                # Возвращаем записи в буфер, не затирая более свежие отметки
+                for user_id, timestamp in pending.items():
+                    self._pending.setdefault(user_id, timestamp)
+                return 0
+
+            return len(items)
+
+    async def _run(self) -> None:
+        """
+        Периодически записывает буфер в базу данных
+        """
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """
+        Запускает фоновую запись буфера
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую запись и сохраняет оставшиеся данные
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+# Общий буфер активности приложения
+activity_buffer = ActivityBuffer()
@@ -0,0 +1,174 @@
+import time
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from config import DATABASE_PATH, DB_POOL_SIZE, DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_BUSY_TIMEOUT
+
+# Сколько скомпилированных запросов хранит каждое соединение
+STATEMENT_CACHE_SIZE = 128
+
+# Функция, которая получает время ожидания соединения и время работы с ним (для метрик)
+_observer: Optional[Callable[[float, float], None]] = None
+
+def set_pool_observer(observer: Optional[Callable[[float, float], None]]) -> None:
+    """
+    Устанавливает функцию, которая вызывается после каждого использования соединения из пула
+
+    Аргументы:
+        observer (Optional[Callable[[float, float], None]]): Функция (время ожидания, время работы) в секундах
+    """
+    global _observer
+    _observer = observer
+
+def configure_connection(conn: sqlite3.Connection) -> None:
+    """
+    Настраивает соединение: WAL-журнал и параметры производительности
+
+    Аргументы:
+        conn (sqlite3.Connection): Соединение с базой данных
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = WAL")
+    # В режиме WAL NORMAL не делает fsync на каждый коммит, но сохраняет целостность базы
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    # Отрицательное значение задает размер кэша в килобайтах
+    cursor.execute(f"PRAGMA cache_size = -{int(DB_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT * 1000)}")
+    cursor.close()
+
+class ConnectionPool:
+    """
+    Ограниченный пул долгоживущих соединений с SQLite.
+    Соединения создаются по мере необходимости, но не больше max_size,
+    и переиспользуются между вызовами вместе с кэшем подготовленных запросов.
+    """
+
+    def __init__(self, db_path: str, max_size: int = DB_POOL_SIZE):
+        """
+        Аргументы:
+            db_path (str): Путь к файлу базы данных
+            max_size (int): Максимальное количество соединений в пуле
+        """
+        self.db_path = str(db_path)
+        self.max_size = max(1, max_size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """
+        Создает новое настроенное соединение
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        configure_connection(conn)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """
+        Берет свободное соединение из пула или создает новое, если лимит не достигнут
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._create_connection()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # Все соединения заняты, ждем освобождения
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """
+        Возвращает соединение в пул
+        """
+        if self._closed:
+            conn.close()
+            return
+
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Выдает соединение из пула на время блока with.
+        Транзакция фиксируется при успешном завершении блока и откатывается при ошибке.
+
+        Возвращает:
+            Iterator[sqlite3.Connection]: Соединение с базой данных
+        """
+        started = time.perf_counter()
+        conn = self._acquire()
+        acquired = time.perf_counter()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._release(conn)
+            if _observer is not None:
+                _observer(acquired - started, time.perf_counter() - acquired)
+
+    def close(self) -> None:
+        """
+        Закрывает все свободные соединения пула
+        """
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """
+    Получает общий пул соединений приложения
+
+    Возвращает:
+        ConnectionPool: Пул соединений с основной базой данных
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_PATH)
+    return _pool
+
+def close_pool() -> None:
+    """
+    Закрывает общий пул соединений (вызывается при остановке бота)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -1,8 +1,10 @@
-import sqlite3
 import asyncio
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
-from database.models import User, get_connection, init_db
+from database.models import User, init_db
+from database.connection_pool import get_pool
+from database.activity_buffer import activity_buffer
+from database.user_cache import user_cache, MISSING
 from config import DATABASE_PATH, DEFAULT_LANGUAGE
 
 # Инициализируем базу данных при импорте модуля
@@ -20,60 +22,45 @@ async def set_user_language(user_id: int, language: str) -> None:
         await asyncio.to_thread(_set_user_language_sync, user_id, language)
     except Exception as e:
         print(f"Error setting user language: {e}")
+        user_cache.invalidate(user_id)
+        return
+
+    # Обновляем профиль в кэше вслед за базой данных
+    user_cache.update(user_id, language=language)
 
 def _set_user_language_sync(user_id: int, language: str) -> None:
     """
     Синхронная версия функции set_user_language
     """
-    conn = get_connection(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        INSERT INTO users (user_id, language)
-        VALUES (?, ?)
-        ON CONFLICT(user_id) DO UPDATE SET 
-        language = ?,
-        last_activity = CURRENT_TIMESTAMP
-        """,
-        (user_id, language, language)
-    )
-
-    conn.commit()
-    conn.close()
+    with get_pool().connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO users (user_id, language)
+            VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET 
+            language = ?,
+            last_activity = CURRENT_TIMESTAMP
+            """,
+            (user_id, language, language)
+        )
 
 async def get_user_language(user_id: int) -> Optional[str]:
     """
-    Получает язык пользователя
+    Получает язык пользователя (из кэша профилей, если он там есть)
 
     Аргументы:
         user_id (int): Идентификатор пользователя
 
     Возвращает:
         Optional[str]: Код языка или None, если пользователь не найден
+            (DEFAULT_LANGUAGE при ошибке базы данных)
     """
     try:
-        return await asyncio.to_thread(_get_user_language_sync, user_id)
+        user = await _load_user(user_id)
     except Exception as e:
         print(f"Error getting user language: {e}")
         return DEFAULT_LANGUAGE
-
-def _get_user_language_sync(user_id: int) -> Optional[str]:
-    """
-    Синхронная версия функции get_user_language
-    """
-    conn = get_connection(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT language FROM users WHERE user_id = ?",
-        (user_id,)
-    )
-
-    result = cursor.fetchone()
-    conn.close()
-
-    return result[0] if result else None
+    return user.language if user else None
 
 async def set_user_faculty(user_id: int, faculty: Optional[str]) -> None:
     """
@@ -87,31 +74,31 @@ async def set_user_faculty(user_id: int, faculty: Optional[str]) -> None:
         await asyncio.to_thread(_set_user_faculty_sync, user_id, faculty)
     except Exception as e:
         print(f"Error setting user faculty: {e}")
+        user_cache.invalidate(user_id)
+        return
+
+    # Обновляем профиль в кэше вслед за базой данных
+    user_cache.update(user_id, faculty=faculty)
 
 def _set_user_faculty_sync(user_id: int, faculty: Optional[str]) -> None:
     """
     Синхронная версия функции set_user_faculty
     """
-    conn = get_connection(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        INSERT INTO users (user_id, faculty, language)
-        VALUES (?, ?, ?)
-        ON CONFLICT(user_id) DO UPDATE SET 
-        faculty = ?,
-        last_activity = CURRENT_TIMESTAMP
-        """,
-        (user_id, faculty, DEFAULT_LANGUAGE, faculty)
-    )
-
-    conn.commit()
-    conn.close()
+    with get_pool().connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO users (user_id, faculty, language)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET 
+            faculty = ?,
+            last_activity = CURRENT_TIMESTAMP
+            """,
+            (user_id, faculty, DEFAULT_LANGUAGE, faculty)
+        )
 
 async def get_user_faculty(user_id: int) -> Optional[str]:
     """
-    Получает факультет пользователя
+    Получает факультет пользователя (из кэша профилей, если он там есть)
 
     Аргументы:
         user_id (int): Идентификатор пользователя
@@ -119,28 +106,8 @@ async def get_user_faculty(user_id: int) -> Optional[str]:
     Возвращает:
         Optional[str]: Название факультета или None, если не выбран
     """
-    try:
-        return await asyncio.to_thread(_get_user_faculty_sync, user_id)
-    except Exception as e:
-        print(f"Error getting user faculty: {e}")
-        return None
-
-def _get_user_faculty_sync(user_id: int) -> Optional[str]:
-    """
-    Синхронная версия функции get_user_faculty
-    """
-    conn = get_connection(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT faculty FROM users WHERE user_id = ?",
-        (user_id,)
-    )
-
-    result = cursor.fetchone()
-    conn.close()
-
-    return result[0] if result else None
+    user = await get_user(user_id)
+    return user.faculty if user else None
 
 async def get_user(user_id: int) -> Optional[User]:
     """
@@ -153,25 +120,33 @@ async def get_user(user_id: int) -> Optional[User]:
         Optional[User]: Объект пользователя или None, если не найден
     """
     try:
-        return await asyncio.to_thread(_get_user_sync, user_id)
+        return await _load_user(user_id)
     except Exception as e:
         print(f"Error getting user: {e}")
         return None
 
-def _get_user_sync(user_id: int) -> Optional[User]:
+async def _load_user(user_id: int) -> Optional[User]:
     """
-    Синхронная версия функции get_user
+    Получает пользователя из кэша профилей или из базы; ошибки базы данных передаются вызывающему коду
     """
-    conn = get_connection(DATABASE_PATH)
-    cursor = conn.cursor()
+    cached = user_cache.get(user_id)
+    if cached is not MISSING:
+        return cached
 
-    cursor.execute(
-        "SELECT user_id, language, faculty, created_at, last_activity FROM users WHERE user_id = ?",
-        (user_id,)
-    )
+    generation = user_cache.generation
+    user = await asyncio.to_thread(_get_user_sync, user_id)
+    user_cache.put(user_id, user, generation)
+    return user
 
-    result = cursor.fetchone()
-    conn.close()
+def _get_user_sync(user_id: int) -> Optional[User]:
+    """
+    Синхронная версия функции get_user
+    """
+    with get_pool().connection() as conn:
+        result = conn.execute(
+            "SELECT user_id, language, faculty, created_at, last_activity FROM users WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
 
     if not result:
         return None
@@ -186,31 +161,139 @@ def _get_user_sync(user_id: int) -> Optional[User]:
 
 async def update_user_activity(user_id: int) -> None:
     """
-    Обновляет время последней активности пользователя
+    Обновляет время последней активности пользователя.
+    Запись откладывается: отметка попадает в буфер и сохраняется в базу пакетом
 
     Аргументы:
         user_id (int): Идентификатор пользователя
     """
+    activity_buffer.record(user_id)
+
+async def flush_user_activity() -> int:
+    """
+    Принудительно записывает накопленную активность пользователей в базу данных
+
+    Возвращает:
+        int: Количество обновленных пользователей
+    """
+    return await activity_buffer.flush()
+
+async def get_cached_file_id(path: str, size: int, mtime: float) -> Optional[str]:
+    """
+    Получает сохраненный file_id для файла, если файл не изменялся
+
+    Аргументы:
+        path (str): Путь к файлу
+        size (int): Текущий размер файла в байтах
+        mtime (float): Текущее время модификации файла
+
+    Возвращает:
+        Optional[str]: file_id или None, если запись отсутствует или устарела
+    """
     try:
-        await asyncio.to_thread(_update_user_activity_sync, user_id)
+        return await asyncio.to_thread(_get_cached_file_id_sync, path, size, mtime)
     except Exception as e:
-        print(f"Error updating user activity: {e}")
+        print(f"Error getting cached file_id: {e}")
+        return None
 
-def _update_user_activity_sync(user_id: int) -> None:
+def _get_cached_file_id_sync(path: str, size: int, mtime: float) -> Optional[str]:
     """
-    Синхронная версия функции update_user_activity
+    Синхронная версия функции get_cached_file_id
     """
-    conn = get_connection(DATABASE_PATH)
-    cursor = conn.cursor()
+    with get_pool().connection() as conn:
+        result = conn.execute(
+            "SELECT file_id FROM file_ids WHERE path = ? AND size = ? AND mtime = ?",
+            (path, size, mtime)
+        ).fetchone()
 
-    cursor.execute(
-        """
-        UPDATE users 
-        SET last_activity = CURRENT_TIMESTAMP
-        WHERE user_id = ?
-        """,
-        (user_id,)
-    )
+    return result[0] if result else None
+
+async def get_cached_file_ids(paths: List[str]) -> Dict[str, Tuple[int, float, str]]:
+    """
+    Получает сохраненные file_id для нескольких файлов одним запросом
+
+    Аргументы:
+        paths (List[str]): Пути к файлам
+
+    Возвращает:
+        Dict[str, Tuple[int, float, str]]: Путь -> (размер, mtime, file_id) на момент отправки файла
+    """
+    if not paths:
+        return {}
+
+    try:
+        return await asyncio.to_thread(_get_cached_file_ids_sync, paths)
+    except Exception as e:
+        print(f"Error getting cached file_ids: {e}")
+        return {}
+
+def _get_cached_file_ids_sync(paths: List[str]) -> Dict[str, Tuple[int, float, str]]:
+    """
+    Синхронная версия функции get_cached_file_ids
+    """
+    result = {}
+    with get_pool().connection() as conn:
+        # Ограничение SQLite на количество параметров в одном запросе
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT path, size, mtime, file_id FROM file_ids WHERE path IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for path, size, mtime, file_id in rows:
+                result[path] = (size, mtime, file_id)
+
+    return result
+
+async def save_file_id(path: str, size: int, mtime: float, file_id: str) -> None:
+    """
+    Сохраняет file_id, который Telegram вернул после отправки файла
+
+    Аргументы:
+        path (str): Путь к файлу
+        size (int): Размер файла в байтах на момент отправки
+        mtime (float): Время модификации файла на момент отправки
+        file_id (str): Идентификатор файла в Telegram
+    """
+    try:
+        await asyncio.to_thread(_save_file_id_sync, path, size, mtime, file_id)
+    except Exception as e:
+        print(f"Error saving file_id: {e}")
 
-    conn.commit()
-    conn.close()
+def _save_file_id_sync(path: str, size: int, mtime: float, file_id: str) -> None:
+    """
+    Синхронная версия функции save_file_id
+    """
+    with get_pool().connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO file_ids (path, size, mtime, file_id)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET 
+            size = ?,
+            mtime = ?,
+            file_id = ?,
+            updated_at = CURRENT_TIMESTAMP
+            """,
+            (path, size, mtime, file_id, size, mtime, file_id)
+        )
+
+async def delete_file_id(path: str) -> None:
+    """
+    Удаляет сохраненный file_id (например, если Telegram его больше не принимает)
+
+    Аргументы:
+        path (str): Путь к файлу
+    """
+    try:
+        await asyncio.to_thread(_delete_file_id_sync, path)
+    except Exception as e:
+        print(f"Error deleting file_id: {e}")
+
+def _delete_file_id_sync(path: str) -> None:
+    """
+    Синхронная версия функции delete_file_id
+    """
+    with get_pool().connection() as conn:
+        conn.execute("DELETE FROM file_ids WHERE path = ?", (path,))
@@ -0,0 +1,72 @@
+import json
+import asyncio
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType, KeyBuilder, DefaultKeyBuilder
+
+from database.connection_pool import get_pool
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище состояний FSM в SQLite.
+    Использует общий пул соединений, поэтому состояние видно всем процессам бота,
+    работающим с одним файлом базы данных.
+    """
+
+    def __init__(self, key_builder: Optional[KeyBuilder] = None):
+        """
+        Аргументы:
+            key_builder (Optional[KeyBuilder]): Построитель ключей записей (по умолчанию DefaultKeyBuilder)
+        """
+        self.key_builder = key_builder or DefaultKeyBuilder()
+
+    def _get_state_sync(self, key: str) -> Optional[str]:
+        with get_pool().connection() as conn:
+            row = conn.execute("SELECT state FROM fsm_states WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state_sync(self, key: str, state: Optional[str]) -> None:
+        with get_pool().connection() as conn:
+            if state is not None:
+                conn.execute('''
+                INSERT INTO fsm_states (key, state) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET state = excluded.state
+                ''', (key, state))
+            else:
+                # Сброшенное состояние не хранится, как и пустые данные
+                conn.execute("DELETE FROM fsm_states WHERE key = ?", (key,))
+
+    def _get_data_sync(self, key: str) -> Dict[str, Any]:
+        with get_pool().connection() as conn:
+            row = conn.execute("SELECT data FROM fsm_data WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _set_data_sync(self, key: str, data: Dict[str, Any]) -> None:
+        with get_pool().connection() as conn:
+            if data:
+                conn.execute('''
+                INSERT INTO fsm_data (key, data) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET data = excluded.data
+                ''', (key, json.dumps(data, ensure_ascii=False)))
+            else:
+                conn.execute("DELETE FROM fsm_data WHERE key = ?", (key,))
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        await asyncio.to_thread(self._set_state_sync, self.key_builder.build(key, "state"), value)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await asyncio.to_thread(self._get_state_sync, self.key_builder.build(key, "state"))
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, not {type(data).__name__}")
+        await asyncio.to_thread(self._set_data_sync, self.key_builder.build(key, "data"), dict(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._get_data_sync, self.key_builder.build(key, "data"))
+
+    async def close(self) -> None:
+        # Соединения принадлежат общему пулу и закрываются вместе с ним
+        pass
@@ -41,6 +41,39 @@ def init_db(db_path: str) -> None:
     )
     ''')
 
+    # Создаем таблицу для кэша file_id отправленных в Telegram файлов
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS file_ids (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        file_id TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Создаем таблицу коротких идентификаторов путей для callback_data
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS path_ids (
+        path_id TEXT PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE
+    )
+    ''')
+
+    # Создаем таблицы состояний и данных FSM (для SQLiteStorage)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS fsm_states (
+        key TEXT PRIMARY KEY,
+        state TEXT
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS fsm_data (
+        key TEXT PRIMARY KEY,
+        data TEXT NOT NULL
+    )
+    ''')
+
     conn.commit()
     conn.close()
 
@@ -0,0 +1,193 @@
+import os
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from database.connection_pool import get_pool
+from config import MATERIALS_FOLDER
+
+# Длина короткого идентификатора пути (в шестнадцатеричных символах)
+PATH_ID_LENGTH = 8
+
+def _to_stored_path(path: str) -> str:
+    """
+    Приводит путь к виду для хранения: пути внутри папки с материалами
+    хранятся относительно нее, чтобы идентификаторы не зависели от расположения папки,
+    а остальные пути - абсолютными (относительный путь читается как путь внутри папки с материалами)
+    """
+    path = os.path.normpath(path)
+    root = os.path.normpath(MATERIALS_FOLDER)
+    if path == root:
+        return "."
+    if path.startswith(root + os.sep):
+        return os.path.relpath(path, root)
+    return os.path.abspath(path)
+
+def _from_stored_path(stored: str) -> str:
+    """
+    Восстанавливает путь из вида для хранения
+    """
+    if os.path.isabs(stored):
+        return stored
+    return os.path.normpath(os.path.join(MATERIALS_FOLDER, stored))
+
+def _candidate_ids(stored: str) -> Iterable[str]:
+    """
+    Генерирует кандидатов в идентификаторы пути: сначала хеш самого пути,
+    а при коллизии - хеши пути с добавленным номером
+    """
+    yield hashlib.md5(stored.encode()).hexdigest()[:PATH_ID_LENGTH]
+
+    salt = 1
+    while True:
+        yield hashlib.md5(f"{stored}#{salt}".encode()).hexdigest()[:PATH_ID_LENGTH]
+        salt += 1
+
+class PathRegistry:
+    """
+    Постоянный реестр коротких идентификаторов путей для callback_data.
+    Идентификаторы хранятся в SQLite, поэтому переживают перезапуск и общие для
+    нескольких процессов бота; горячий слой в памяти отвечает на повторные запросы без базы.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, str] = {}
+        self._by_path: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, path_id: str, stored: str) -> None:
+        with self._lock:
+            self._by_id[path_id] = stored
+            self._by_path[stored] = path_id
+
+    def load(self) -> int:
+        """
+        Загружает все сохраненные идентификаторы в память (синхронно)
+
+        Возвращает:
+            int: Количество загруженных идентификаторов
+        """
+        with get_pool().connection() as conn:
+            rows = conn.execute("SELECT path_id, path FROM path_ids").fetchall()
+
+        for path_id, stored in rows:
+            self._remember(path_id, stored)
+
+        return len(rows)
+
+    def get_cached_id(self, path: str) -> Optional[str]:
+        """
+        Получает идентификатор пути из памяти
+
+        Аргументы:
+            path (str): Путь к файлу или директории
+
+        Возвращает:
+            Optional[str]: Идентификатор или None, если путь еще не зарегистрирован в этом процессе
+        """
+        return self._by_path.get(_to_stored_path(path))
+
+    def register_sync(self, paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Регистрирует пути и возвращает их идентификаторы (синхронно).
+        Для каждого нового пути проверяется, что идентификатор не занят другим путем
+
+        Аргументы:
+            paths (Iterable[str]): Пути к файлам и директориям
+
+        Возвращает:
+            Dict[str, str]: Соответствие путь -> идентификатор
+        """
+        result = {}
+        missing: List[str] = []
+
+        for path in paths:
+            path_id = self.get_cached_id(path)
+            if path_id:
+                result[path] = path_id
+            else:
+                missing.append(path)
+
+        if not missing:
+            return result
+
+        with get_pool().connection() as conn:
+            for path in missing:
+                stored = _to_stored_path(path)
+
+                # Путь мог быть зарегистрирован другим процессом
+                row = conn.execute("SELECT path_id FROM path_ids WHERE path = ?", (stored,)).fetchone()
+                if row:
+                    path_id = row[0]
+                else:
+                    for candidate in _candidate_ids(stored):
+                        conn.execute(
+                            "INSERT OR IGNORE INTO path_ids (path_id, path) VALUES (?, ?)",
+                            (candidate, stored)
+                        )
+                        owner = conn.execute(
+                            "SELECT path FROM path_ids WHERE path_id = ?", (candidate,)
+                        ).fetchone()
+                        if owner and owner[0] == stored:
+                            path_id = candidate
+                            break
+
+                self._remember(path_id, stored)
+                result[path] = path_id
+
+        return result
+
+    def lookup_sync(self, path_id: str) -> Optional[str]:
+        """
+        Получает путь по идентификатору из базы данных (синхронно)
+        """
+        with get_pool().connection() as conn:
+            row = conn.execute("SELECT path FROM path_ids WHERE path_id = ?", (path_id,)).fetchone()
+
+        if not row:
+            return None
+
+        self._remember(path_id, row[0])
+        return row[0]
+
+    async def register(self, paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Регистрирует пути и возвращает их идентификаторы
+
+        Аргументы:
+            paths (Iterable[str]): Пути к файлам и директориям
+
+        Возвращает:
+            Dict[str, str]: Соответствие путь -> идентификатор
+        """
+        paths = list(paths)
+
+        # Обращаемся к базе, только если есть незнакомые пути
+        if all(self.get_cached_id(path) for path in paths):
+            return {path: self.get_cached_id(path) for path in paths}
+
+        return await asyncio.to_thread(self.register_sync, paths)
+
+    async def get_path(self, path_id: str) -> Optional[str]:
+        """
+        Получает путь по идентификатору
+
+        Аргументы:
+            path_id (str): Идентификатор пути
+
+        Возвращает:
+            Optional[str]: Путь или None, если идентификатор неизвестен
+        """
+        stored = self._by_id.get(path_id)
+        if stored is None:
+            try:
+                stored = await asyncio.to_thread(self.lookup_sync, path_id)
+            except Exception as e:
+                print(f"Error looking up path id: {e}")
+                return None
+
+        return _from_stored_path(stored) if stored is not None else None
+
+# Общий реестр идентификаторов путей
+path_registry = PathRegistry()
@@ -0,0 +1,140 @@
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
+
+from database.models import User
+from config import USER_CACHE_SIZE, USER_CACHE_TTL
+
+# Маркер отсутствия записи в кэше (None означает, что пользователя нет в базе)
+MISSING = object()
+
+class UserCache:
+    """
+    Ограниченный LRU-кэш профилей пользователей со временем жизни записей.
+    Хранит и найденных пользователей, и отсутствие пользователя в базе,
+    чтобы новые пользователи тоже не вызывали запрос на каждое обновление.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        """
+        Аргументы:
+            max_size (int): Максимальное количество пользователей в кэше
+            ttl (float): Время жизни записи в секундах
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[float, Optional[User]]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """
+        Счетчик изменений: позволяет не сохранять в кэш данные,
+        прочитанные из базы до записи, которая произошла во время чтения
+        """
+        return self._generation
+
+    def get(self, user_id: int) -> Any:
+        """
+        Получает пользователя из кэша
+
+        Аргументы:
+            user_id (int): Идентификатор пользователя
+
+        Возвращает:
+            Any: Объект User, None (пользователя нет в базе) или MISSING, если записи нет в кэше
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, user: Optional[User], generation: Optional[int] = None) -> None:
+        """
+        Сохраняет пользователя в кэш
+
+        Аргументы:
+            user_id (int): Идентификатор пользователя
+            user (Optional[User]): Профиль пользователя или None, если его нет в базе
+            generation (Optional[int]): Значение generation до чтения из базы
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # Пока данные читались, профиль изменился, сохранять их нельзя
+                return
+
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def update(self, user_id: int, **fields: Any) -> None:
+        """
+        Обновляет поля профиля в кэше после записи в базу.
+        Если профиль не закэширован, запись просто сбрасывается
+
+        Аргументы:
+            user_id (int): Идентификатор пользователя
+            **fields: Новые значения полей профиля
+        """
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] is None:
+                self._entries.pop(user_id, None)
+                return
+
+            self._entries[user_id] = (time.monotonic() + self.ttl, replace(entry[1], **fields))
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Удаляет пользователя из кэша
+
+        Аргументы:
+            user_id (int): Идентификатор пользователя
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """
+        Очищает кэш
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Получает статистику кэша
+
+        Возвращает:
+            Dict[str, Any]: Количество записей, попаданий, промахов и доля попаданий
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+
+# Общий кэш профилей пользователей
+user_cache = UserCache()
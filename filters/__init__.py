@@ -0,0 +1,3 @@
+from filters.main_menu import MainMenuButton
+
+__all__ = ['MainMenuButton']
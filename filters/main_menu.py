@@ -0,0 +1,22 @@
+from aiogram.filters import Filter
+from aiogram.types import Message
+
+from keyboards.main_kb import MAIN_MENU_BUTTONS, resolve_main_menu_button
+
+class MainMenuButton(Filter):
+    """
+    Фильтр нажатия на кнопку главного меню.
+    Текст сообщения ищется в заранее построенном словаре кнопок на всех языках
+    """
+
+    def __init__(self, button_key: str):
+        """
+        Аргументы:
+            button_key (str): Ключ кнопки (например, "profile_button")
+        """
+        if button_key not in MAIN_MENU_BUTTONS:
+            raise ValueError(f"Unknown main menu button: {button_key}")
+        self.button_key = button_key
+
+    async def __call__(self, message: Message) -> bool:
+        return resolve_main_menu_button(message.text) == self.button_key
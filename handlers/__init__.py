@@ -4,6 +4,8 @@ from handlers.profile import setup_profile_handlers
 from handlers.learning import setup_learning_handlers
 from handlers.schedule import setup_schedule_handlers
 from handlers.channel import setup_channel_handlers
+from handlers.search import setup_search_handlers
+from handlers.inline import setup_inline_handlers
 
 def register_all_handlers(dp):
     """
@@ -16,6 +18,10 @@ def register_all_handlers(dp):
     setup_schedule_handlers(dp)
     setup_channel_handlers(dp)
 
+    # Текст запроса поиска обрабатывается после кнопок разделов, но раньше main_menu
+    setup_search_handlers(dp)
+    setup_inline_handlers(dp)
+
     # Регистрируем обработчик main_menu последним,
     # чтобы он обрабатывал только сообщения, которые не были обработаны другими обработчиками
     setup_main_menu_handlers(dp)
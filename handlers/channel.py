@@ -1,5 +1,8 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
+from aiogram.fsm.context import FSMContext
+from filters.main_menu import MainMenuButton
+from handlers.search import leave_search
 
 from keyboards.inline_kb import get_channel_keyboard
 from services.text_manager import get_text
@@ -7,16 +10,24 @@ from utils.emoji import add_emoji_to_text
 from config import INTERFACE_IMAGES_FOLDER, CHANNEL_LINK
 from utils.message_utils import send_message_with_image
 import os
+from typing import Optional
 from config import CHANNEL_LINK, DEFAULT_LANGUAGE
 
 # Создаем роутер для обработчиков канала
 router = Router()
 
-@router.message(F.text.startswith("📢"))
-async def channel_handler(message: Message, user_language: str = DEFAULT_LANGUAGE):
+@router.message(MainMenuButton("channel_button"))
+async def channel_handler(
+        message: Message,
+        user_language: str = DEFAULT_LANGUAGE,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
     Обработчик нажатия на кнопку "Наш канал"
     """
+    await leave_search(state, raw_state)
+
     # Формируем текст с приглашением подписаться на канал
     channel_text = get_text(user_language, "channel_text").format(channel_link=CHANNEL_LINK)
 
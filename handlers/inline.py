@@ -0,0 +1,62 @@
+from aiogram import Router
+from aiogram.types import InlineQuery, InlineQueryResultCachedDocument, InlineQueryResultCachedPhoto
+import html
+from typing import Optional
+
+from services.inline_search import find_inline_materials
+
+from config import DEFAULT_LANGUAGE, INLINE_PAGE_SIZE, INLINE_CACHE_TIME
+
+# Создаем роутер для обработчиков инлайн-режима
+router = Router()
+
+@router.inline_query()
+async def inline_search_handler(
+        inline_query: InlineQuery,
+        user_language: str = DEFAULT_LANGUAGE,
+        user_faculty: Optional[str] = None
+):
+    """
+    Обработчик инлайн-запросов (@бот запрос): отправляет найденные материалы по сохраненным file_id.
+    Результаты выдаются страницами, следующая страница запрашивается Telegram через offset
+    """
+    query = inline_query.query.strip()
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+
+    materials = await find_inline_materials(query, user_faculty) if query else []
+    page = materials[offset:offset + INLINE_PAGE_SIZE]
+
+    results = []
+    for material in page:
+        if material.is_image:
+            results.append(InlineQueryResultCachedPhoto(
+                id=material.result_id,
+                photo_file_id=material.file_id,
+                title=material.title,
+                description=material.description,
+                caption=html.escape(material.name)
+            ))
+        else:
+            results.append(InlineQueryResultCachedDocument(
+                id=material.result_id,
+                title=material.title,
+                document_file_id=material.file_id,
+                description=material.description,
+                caption=html.escape(material.name)
+            ))
+
+    next_offset = str(offset + INLINE_PAGE_SIZE) if offset + INLINE_PAGE_SIZE < len(materials) else ""
+
+    # Результаты зависят от факультета пользователя, поэтому Telegram не должен делиться ими между пользователями
+    await inline_query.answer(
+        results,
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=next_offset
+    )
+
+def setup_inline_handlers(dp):
+    """
+    Регистрирует обработчики для инлайн-режима
+    """
+    dp.include_router(router)
@@ -1,16 +1,23 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
+from aiogram.fsm.context import FSMContext
+from filters.main_menu import MainMenuButton
 import os
+import html
+from typing import Optional
 
-from keyboards.learning_kb import get_navigation_keyboard
-from keyboards.inline_kb import get_back_keyboard, get_after_file_keyboard
+from keyboards.learning_kb import get_navigation_keyboard, get_path_by_id
+from keyboards.inline_kb import get_back_keyboard, get_after_file_keyboard, get_preview_keyboard
 
-from database.db_manager import get_user_faculty, get_user_language
 from config import INTERFACE_IMAGES_FOLDER, MATERIALS_FOLDER
-from utils.message_utils import send_message_with_image
+from utils.message_utils import send_message_with_image, show_screen
 import os
 from services.text_manager import get_text
 from services.file_manager import get_directories, get_files, check_file_exists
+from services.file_id_cache import send_cached_file
+from services.previews import preview_cache
+from services.materials_index import materials_index
+from handlers.search import leave_search
 
 from utils.helpers import get_parent_path, format_path, is_image_file
 from utils.emoji import add_emoji_to_text
@@ -21,15 +28,21 @@ from config import MATERIALS_FOLDER, DEFAULT_LANGUAGE
 # Создаем роутер для обработчиков центра обучения
 router = Router()
 
-@router.message(F.text.startswith("📚"))
-async def learning_handler(message: Message, user_language: str = DEFAULT_LANGUAGE):
+@router.message(MainMenuButton("learning_center_button"))
+async def learning_handler(
+        message: Message,
+        user_language: str = DEFAULT_LANGUAGE,
+        user_faculty: Optional[str] = None,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
     Обработчик нажатия на кнопку "Центр обучения"
     """
-    user_id = message.from_user.id
+    await leave_search(state, raw_state)
 
-    # Получаем текущий факультет пользователя
-    faculty = await get_user_faculty(user_id)
+    # Текущий факультет пользователя загружен UserMiddleware
+    faculty = user_faculty
 
     if not faculty:
         # Если факультет не выбран, предлагаем пользователю сначала выбрать факультет
@@ -64,21 +77,31 @@ async def learning_handler(message: Message, user_language: str = DEFAULT_LANGUA
     )
 
 @router.callback_query(F.data.startswith("nav:"))
-async def navigate_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
+async def navigate_callback(
+        callback_query: CallbackQuery,
+        user_language: str = DEFAULT_LANGUAGE,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
     Обработчик навигации по папкам с материалами
     """
-    # Получаем идентификатор пути и восстанавливаем полный путь
-    path_id = callback_query.data.split(":")[1]
-    from keyboards.learning_kb import get_path_by_id
-    path = get_path_by_id(path_id)
+    await leave_search(state, raw_state)
+
+    # Получаем идентификатор пути (и номер страницы для больших папок) и восстанавливаем полный путь
+    parts = callback_query.data.split(":")
+    path_id = parts[1]
+    page = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
+    path = await get_path_by_id(path_id)
 
     if not path:
         await callback_query.answer("Путь не найден", show_alert=True)
         return
 
-    # Получаем родительский путь
+    # Получаем родительский путь (выше папки с материалами кнопка "Назад" не ведет)
     parent_path = get_parent_path(path)
+    if parent_path and not materials_index.contains(parent_path):
+        parent_path = None
 
     # Получаем имя текущей директории для отображения
     dir_name = os.path.basename(path) or path
@@ -100,15 +123,18 @@ async def navigate_callback(callback_query: CallbackQuery, user_language: str =
         text += f"\n\n{get_text(user_language, 'no_materials_found_in_semester')}"
 
     # Получаем клавиатуру для навигации
-    keyboard = await get_navigation_keyboard(user_language, path, parent_path)
+    keyboard = await get_navigation_keyboard(user_language, path, parent_path, page)
 
-    # Отвечаем на callback и обновляем сообщение
+    # Отвечаем на callback и обновляем сообщение на месте
+    await callback_query.answer()
+    await show_screen(callback_query.message, text, reply_markup=keyboard)
+
+@router.callback_query(F.data == "nav_page")
+async def navigation_page_callback(callback_query: CallbackQuery):
+    """
+    Обработчик нажатия на номер страницы в клавиатуре навигации (кнопка только показывает номер)
+    """
     await callback_query.answer()
-    await callback_query.message.delete()
-    await callback_query.message.answer(
-        text=text,
-        reply_markup=keyboard
-    )
 
 @router.callback_query(F.data.startswith("dl:"))
 async def download_file_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
@@ -117,8 +143,7 @@ async def download_file_callback(callback_query: CallbackQuery, user_language: s
     """
     # Получаем идентификатор пути и восстанавливаем полный путь к файлу
     path_id = callback_query.data.split(":")[1]
-    from keyboards.learning_kb import get_path_by_id
-    file_path = get_path_by_id(path_id)
+    file_path = await get_path_by_id(path_id)
 
     if not file_path:
         await callback_query.answer("Файл не найден", show_alert=True)
@@ -133,44 +158,110 @@ async def download_file_callback(callback_query: CallbackQuery, user_language: s
     loading_text = get_text(user_language, "loading_file")
     await callback_query.answer(loading_text)
 
+    await _send_file(callback_query.message, file_path, user_language)
+
+@router.callback_query(F.data.startswith("pv:"))
+async def preview_file_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
+    """
+    Обработчик превью файла: вместо всего документа отправляет первую страницу PDF
+    (или уменьшенное изображение) и количество страниц. Весь файл скачивается кнопкой под превью
+    """
+    path_id = callback_query.data.split(":")[1]
+    file_path = await get_path_by_id(path_id)
+
+    if not file_path:
+        await callback_query.answer("Файл не найден", show_alert=True)
+        return
+
+    if not await check_file_exists(file_path):
+        await callback_query.answer(get_text(user_language, "file_not_found"), show_alert=True)
+        return
+
+    await callback_query.answer(get_text(user_language, "loading_file"))
+
+    # Превью уже построено в фоне или строится сейчас в пуле процессов
+    preview = await preview_cache.get_preview(file_path)
+    if preview is None:
+        # Превью построить нельзя, отправляем файл целиком
+        await _send_file(callback_query.message, file_path, user_language)
+        return
+
+    caption = html.escape(os.path.basename(file_path))
+    if preview.pages:
+        caption += "\n" + get_text(user_language, "preview_pages").format(pages=preview.pages)
+    keyboard = get_preview_keyboard(user_language, path_id)
+
+    if preview.image_path is None:
+        await callback_query.message.answer(caption, reply_markup=keyboard)
+        return
+
+    async def send(file):
+        return await callback_query.message.answer_photo(photo=file, caption=caption, reply_markup=keyboard)
+
+    try:
+        # Превью загружается в Telegram один раз, дальше отправляется по file_id
+        await send_cached_file(preview.image_path, send)
+    except Exception as e:
+        await callback_query.message.answer(
+            text=f"{get_text(user_language, 'error_sending_file')}: {str(e)}",
+            reply_markup=get_back_keyboard(user_language, "back_to_materials")
+        )
+
+async def _send_file(message: Message, file_path: str, user_language: str) -> None:
+    """
+    Отправляет файл целиком: изображения - как фото, остальные файлы - как документ
+
+    Аргументы:
+        message (Message): Сообщение, в чат которого отправляется файл
+        file_path (str): Путь к файлу
+        user_language (str): Код языка пользователя
+    """
     # Получаем имя файла
     file_name = os.path.basename(file_path)
 
     try:
-        # Создаем объект FSInputFile для отправки
-        file = FSInputFile(file_path)
-
         # Проверяем, является ли файл изображением
         if is_image_file(file_name):
             # Отправляем файл как фото
-            await callback_query.message.answer_photo(
-                photo=file,
-                caption=file_name,
-                reply_markup=get_after_file_keyboard(user_language)
-            )
+            async def send(file):
+                return await message.answer_photo(
+                    photo=file,
+                    caption=file_name,
+                    reply_markup=get_after_file_keyboard(user_language)
+                )
         else:
             # Отправляем файл как документ
-            await callback_query.message.answer_document(
-                document=file,
-                caption=file_name,
-                reply_markup=get_after_file_keyboard(user_language)
-            )
+            async def send(file):
+                return await message.answer_document(
+                    document=file,
+                    caption=file_name,
+                    reply_markup=get_after_file_keyboard(user_language)
+                )
+
+        # Повторные отправки используют file_id, без повторной загрузки файла
+        await send_cached_file(file_path, send)
     except Exception as e:
         # В случае ошибки сообщаем пользователю
-        await callback_query.message.answer(
+        await message.answer(
             text=f"{get_text(user_language, 'error_sending_file')}: {str(e)}",
             reply_markup=get_back_keyboard(user_language, "back_to_materials")
         )
 
 @router.callback_query(F.data == "back_to_materials")
-async def back_to_materials_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
+async def back_to_materials_callback(
+        callback_query: CallbackQuery,
+        user_language: str = DEFAULT_LANGUAGE,
+        user_faculty: Optional[str] = None,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
-    Обработчик возврата к материалам после скачивания файла
+    Обработчик возврата к материалам после скачивания файла или с экрана поиска
     """
-    user_id = callback_query.from_user.id
+    await leave_search(state, raw_state)
 
-    # Получаем текущий факультет пользователя
-    faculty = await get_user_faculty(user_id)
+    # Текущий факультет пользователя загружен UserMiddleware
+    faculty = user_faculty
 
     if not faculty:
         # Если факультет не выбран, возвращаемся в главное меню
@@ -191,28 +282,9 @@ async def back_to_materials_callback(callback_query: CallbackQuery, user_languag
     # Получаем клавиатуру для навигации
     keyboard = await get_navigation_keyboard(user_language, faculty_path)
 
-    # Отвечаем на callback
+    # Отвечаем на callback и обновляем сообщение на месте
     await callback_query.answer()
-
-    try:
-        # Пробуем отредактировать текущее сообщение
-        await callback_query.message.edit_text(
-            text=text,
-            reply_markup=keyboard
-        )
-    except Exception:
-        # Если не получается отредактировать, удаляем текущее сообщение и отправляем новое
-        try:
-            await callback_query.message.delete()
-        except Exception:
-            # Если не удалось удалить, просто игнорируем ошибку
-            pass
-
-        # Отправляем новое сообщение
-        await callback_query.message.answer(
-            text=text,
-            reply_markup=keyboard
-        )
+    await show_screen(callback_query.message, text, reply_markup=keyboard)
 
 def setup_learning_handlers(dp):
     """
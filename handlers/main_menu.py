@@ -1,5 +1,6 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
+from aiogram.fsm.context import FSMContext
 from config import INTERFACE_IMAGES_FOLDER
 from utils.message_utils import send_message_with_image
 from keyboards.main_kb import get_main_keyboard
@@ -7,6 +8,9 @@ from services.text_manager import get_text
 from utils.emoji import add_emoji_to_text
 from config import UNKNOWN_COMMAND, DEFAULT_LANGUAGE
 import os
+from typing import Optional
+
+from handlers.search import leave_search
 
 # Создаем роутер для обработчиков главного меню
 router = Router()
@@ -16,45 +20,24 @@ async def process_main_menu(message: Message, user_language: str = DEFAULT_LANGU
     """
     Обработчик текстовых сообщений в главном меню
     """
-    text = message.text
-
-    # Получаем тексты кнопок на языке пользователя
-    profile_text = add_emoji_to_text("👤", get_text(user_language, "profile_button"))
-    learning_text = add_emoji_to_text("📚", get_text(user_language, "learning_center_button"))
-    schedule_text = add_emoji_to_text("📆", get_text(user_language, "schedule_button"))
-    channel_text = add_emoji_to_text("📢", get_text(user_language, "channel_button"))
-
-    # Проверяем, какая кнопка была нажата
-    if text == profile_text:
-        # Перенаправляем на обработчик профиля
-        from handlers.profile import profile_handler
-        return await profile_handler(message, user_language=user_language)
-
-    elif text == learning_text:
-        # Перенаправляем на обработчик центра обучения
-        from handlers.learning import learning_handler
-        return await learning_handler(message, user_language=user_language)
-
-    elif text == schedule_text:
-        # Перенаправляем на обработчик расписания
-        from handlers.schedule import schedule_handler
-        return await schedule_handler(message, user_language=user_language)
-
-    elif text == channel_text:
-        # Перенаправляем на обработчик канала
-        from handlers.channel import channel_handler
-        return await channel_handler(message, user_language=user_language)
-
-    else:
-        # Если сообщение не соответствует ни одной кнопке, отправляем сообщение о неизвестной команде
-        unknown_command_text = UNKNOWN_COMMAND.get(user_language)
-        await message.answer(unknown_command_text)
+    # Кнопки главного меню на любом языке обрабатываются роутерами разделов
+    # (фильтр MainMenuButton), поэтому сюда попадают только остальные сообщения:
+    # отправляем сообщение о неизвестной команде
+    unknown_command_text = UNKNOWN_COMMAND.get(user_language)
+    await message.answer(unknown_command_text)
 
 @router.callback_query(F.data == "back_to_main")
-async def back_to_main_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
+async def back_to_main_callback(
+        callback_query: CallbackQuery,
+        user_language: str = DEFAULT_LANGUAGE,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
     Обработчик возврата в главное меню из других разделов
     """
+    await leave_search(state, raw_state)
+
     # Получаем текст главного меню на языке пользователя
     main_menu_text = get_text(user_language, "main_menu_text")
 
@@ -75,10 +58,10 @@ async def back_to_main_callback(callback_query: CallbackQuery, user_language: st
         )
 
         # Отправляем изображение отдельным сообщением
-        photo = FSInputFile(image_path)
-        await callback_query.message.answer_photo(
-            photo=photo,
-            caption=main_menu_text,
+        await send_message_with_image(
+            message=callback_query.message,
+            text=main_menu_text,
+            image_path=image_path,
             reply_markup=main_keyboard
         )
     except Exception:
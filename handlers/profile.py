@@ -1,14 +1,18 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.fsm.context import FSMContext
+from filters.main_menu import MainMenuButton
+from handlers.search import leave_search
 
 from keyboards.profile_kb import get_language_settings_keyboard
 from keyboards.university_kb import get_university_selection_keyboard, get_faculty_selection_keyboard_with_selected
 from keyboards.main_kb import get_main_keyboard
 from config import INTERFACE_IMAGES_FOLDER
-from utils.message_utils import send_message_with_image
+from utils.message_utils import send_message_with_image, show_screen
 import os
-from database.db_manager import set_user_faculty, get_user_faculty, set_user_language
+from typing import Optional
+from database.db_manager import set_user_faculty, set_user_language
 
 from services.text_manager import get_text
 from services.file_manager import get_faculties, check_faculty_exists
@@ -19,11 +23,18 @@ from utils.emoji import add_emoji_to_text
 # Создаем роутер для обработчиков профиля
 router = Router()
 
-@router.message(F.text.startswith("👤"))
-async def profile_handler(message: Message, user_language: str = DEFAULT_LANGUAGE):
+@router.message(MainMenuButton("profile_button"))
+async def profile_handler(
+        message: Message,
+        user_language: str = DEFAULT_LANGUAGE,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
     Обработчик нажатия на кнопку "Личный кабинет"
     """
+    await leave_search(state, raw_state)
+
     user_id = message.from_user.id
 
     # Формируем текст профиля
@@ -47,12 +58,15 @@ async def profile_handler(message: Message, user_language: str = DEFAULT_LANGUAG
     )
 
 @router.callback_query(F.data.startswith("univ:"))
-async def university_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
+async def university_callback(
+        callback_query: CallbackQuery,
+        user_language: str = DEFAULT_LANGUAGE,
+        user_faculty: Optional[str] = None
+):
     """
     Обработчик выбора университета
     """
     university_shortcut = callback_query.data.split(":")[1]
-    user_id = callback_query.from_user.id
 
     # Получаем переведенное название университета
     university_name = get_text(user_language, f"univ_{university_shortcut}")
@@ -65,8 +79,8 @@ async def university_callback(callback_query: CallbackQuery, user_language: str
     # Отвечаем на callback
     await callback_query.answer(university_selected_text)
 
-    # Получаем текущий факультет пользователя
-    current_faculty = await get_user_faculty(user_id)
+    # Текущий факультет пользователя загружен UserMiddleware
+    current_faculty = user_faculty
 
     # Формируем текст сообщения для выбора факультета
     profile_text = PROFILE_INSTRUCTIONS.get(user_language, PROFILE_INSTRUCTIONS['en'])
@@ -78,28 +92,10 @@ async def university_callback(callback_query: CallbackQuery, user_language: str
     # Путь к изображению
     image_path = os.path.join(INTERFACE_IMAGES_FOLDER, "profile.png")
 
-    # Проверяем, есть ли у сообщения фото
-    if callback_query.message.photo:
-        try:
-            # Если это фото, пытаемся обновить подпись и клавиатуру
-            await callback_query.message.edit_caption(
-                caption=profile_text,
-                reply_markup=keyboard
-            )
-            return
-        except Exception as e:
-            print(f"Error editing caption: {e}")
-
-    try:
-        # Пробуем удалить предыдущее сообщение, если не удалось обновить подпись
-        await callback_query.message.delete()
-    except Exception as e:
-        print(f"Error deleting message: {e}")
-
-    # Отправляем новое сообщение с изображением
-    await send_message_with_image(
-        message=callback_query.message,
-        text=profile_text,
+    # Обновляем подпись и клавиатуру текущего сообщения (или отправляем новое, если это невозможно)
+    await show_screen(
+        callback_query.message,
+        profile_text,
         image_path=image_path,
         reply_markup=keyboard
     )
@@ -124,28 +120,10 @@ async def back_to_university_callback(callback_query: CallbackQuery, user_langua
     # Отвечаем на callback
     await callback_query.answer()
 
-    # Проверяем, есть ли у сообщения фото
-    if callback_query.message.photo:
-        try:
-            # Если это фото, пытаемся обновить подпись и клавиатуру
-            await callback_query.message.edit_caption(
-                caption=profile_text,
-                reply_markup=keyboard
-            )
-            return
-        except Exception as e:
-            print(f"Error editing caption: {e}")
-
-    try:
-        # Пробуем удалить предыдущее сообщение, если не удалось обновить подпись
-        await callback_query.message.delete()
-    except Exception as e:
-        print(f"Error deleting message: {e}")
-
-    # Отправляем новое сообщение с изображением
-    await send_message_with_image(
-        message=callback_query.message,
-        text=profile_text,
+    # Обновляем подпись и клавиатуру текущего сообщения (или отправляем новое, если это невозможно)
+    await show_screen(
+        callback_query.message,
+        profile_text,
         image_path=image_path,
         reply_markup=keyboard
     )
@@ -184,28 +162,10 @@ async def faculty_callback(callback_query: CallbackQuery, user_language: str = D
     # Путь к изображению
     image_path = os.path.join(INTERFACE_IMAGES_FOLDER, "profile.png")
 
-    # Проверяем, есть ли у сообщения фото
-    if callback_query.message.photo:
-        try:
-            # Если это фото, пытаемся обновить подпись и клавиатуру
-            await callback_query.message.edit_caption(
-                caption=profile_text,
-                reply_markup=keyboard
-            )
-            return
-        except Exception as e:
-            print(f"Error editing caption: {e}")
-
-    try:
-        # Пробуем удалить предыдущее сообщение, если не удалось обновить подпись
-        await callback_query.message.delete()
-    except Exception as e:
-        print(f"Error deleting message: {e}")
-
-    # Отправляем новое сообщение с изображением
-    await send_message_with_image(
-        message=callback_query.message,
-        text=profile_text,
+    # Обновляем подпись и клавиатуру текущего сообщения (или отправляем новое, если это невозможно)
+    await show_screen(
+        callback_query.message,
+        profile_text,
         image_path=image_path,
         reply_markup=keyboard
     )
@@ -227,26 +187,9 @@ async def open_language_settings_callback(callback_query: CallbackQuery, user_la
     # Получаем клавиатуру для выбора языка
     keyboard = get_language_settings_keyboard(user_language)
 
-    # Проверяем, есть ли у сообщения фото
-    if callback_query.message.photo:
-        try:
-            # Пробуем удалить предыдущее сообщение
-            await callback_query.message.delete()
-        except Exception as e:
-            print(f"Error deleting message: {e}")
-
-        # Отправляем новое текстовое сообщение
-        await callback_query.message.answer(
-            text=text,
-            reply_markup=keyboard
-        )
-    else:
-        # Отвечаем на callback и обновляем текстовое сообщение
-        await callback_query.answer()
-        await callback_query.message.edit_text(
-            text=text,
-            reply_markup=keyboard
-        )
+    # Отвечаем на callback и показываем настройки на месте текущего сообщения
+    await callback_query.answer()
+    await show_screen(callback_query.message, text, reply_markup=keyboard)
 
 @router.callback_query(F.data.startswith("change_language:"))
 async def change_language_callback(callback_query: CallbackQuery, user_language: str = DEFAULT_LANGUAGE):
@@ -305,19 +248,11 @@ async def back_to_profile_callback(callback_query: CallbackQuery, user_language:
     # Путь к изображению
     image_path = os.path.join(INTERFACE_IMAGES_FOLDER, "profile.png")
 
-    # Отвечаем на callback
+    # Отвечаем на callback и возвращаем профиль на месте текущего сообщения
     await callback_query.answer()
-
-    # Удаляем текущее сообщение и отправляем новое с изображением
-    try:
-        await callback_query.message.delete()
-    except Exception as e:
-        print(f"Error deleting message: {e}")
-
-    # Отправляем новое сообщение с изображением
-    await send_message_with_image(
-        message=callback_query.message,
-        text=profile_text,
+    await show_screen(
+        callback_query.message,
+        profile_text,
         image_path=image_path,
         reply_markup=keyboard
     )
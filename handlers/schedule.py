@@ -1,6 +1,10 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, FSInputFile
+from aiogram.fsm.context import FSMContext
+from filters.main_menu import MainMenuButton
+from handlers.search import leave_search
 import os
+from typing import Optional
 
 from keyboards.schedule_kb import get_schedule_keyboard
 from keyboards.inline_kb import get_back_keyboard
@@ -10,16 +14,23 @@ from utils.emoji import add_emoji_to_text
 
 from config import IMAGES_FOLDER, DEFAULT_LANGUAGE
 from config import INTERFACE_IMAGES_FOLDER, IMAGES_FOLDER
-from utils.message_utils import send_message_with_image
+from utils.message_utils import send_message_with_image, show_screen
 import os
 # Создаем роутер для обработчиков расписания
 router = Router()
 
-@router.message(F.text.startswith("📆"))
-async def schedule_handler(message: Message, user_language: str = DEFAULT_LANGUAGE):
+@router.message(MainMenuButton("schedule_button"))
+async def schedule_handler(
+        message: Message,
+        user_language: str = DEFAULT_LANGUAGE,
+        state: Optional[FSMContext] = None,
+        raw_state: Optional[str] = None
+):
     """
     Обработчик нажатия на кнопку "Расписание"
     """
+    await leave_search(state, raw_state)
+
     # Получаем текст для расписания
     schedule_text = get_text(user_language, "schedule_text")
 
@@ -54,48 +65,29 @@ async def schedule_type_callback(callback_query: CallbackQuery, user_language: s
     # Отвечаем на callback
     await callback_query.answer()
 
-    try:
-        # Проверяем существование файла
-        if not os.path.exists(image_path):
-            # Пытаемся удалить предыдущее сообщение
-            try:
-                await callback_query.message.delete()
-            except Exception as e:
-                print(f"Error deleting message: {e}")
-
-            # Отправляем сообщение об отсутствии изображения
-            await callback_query.message.answer(
-                text=f"{get_text(user_language, 'image_not_found')}",
-                reply_markup=get_back_keyboard(user_language, "back_to_schedule")
-            )
-            return
-
-        # Пытаемся удалить предыдущее сообщение
-        try:
-            await callback_query.message.delete()
-        except Exception as e:
-            print(f"Error deleting message: {e}")
-
-        # Создаем объект FSInputFile для изображения
-        photo = FSInputFile(image_path)
-
-        # Отправляем новое сообщение с изображением
-        await callback_query.message.answer_photo(
-            photo=photo,
-            caption=schedule_text,
+    # Проверяем существование файла
+    if not os.path.exists(image_path):
+        # Сообщаем об отсутствии изображения
+        await show_screen(
+            callback_query.message,
+            get_text(user_language, 'image_not_found'),
             reply_markup=get_back_keyboard(user_language, "back_to_schedule")
         )
+        return
 
+    try:
+        # Заменяем изображение в текущем сообщении; повторные показы используют file_id
+        await show_screen(
+            callback_query.message,
+            schedule_text,
+            image_path=image_path,
+            reply_markup=get_back_keyboard(user_language, "back_to_schedule")
+        )
     except Exception as e:
         # В случае ошибки сообщаем пользователю
-        # Пытаемся удалить предыдущее сообщение
-        try:
-            await callback_query.message.delete()
-        except Exception as delete_error:
-            print(f"Error deleting message: {delete_error}")
-
-        await callback_query.message.answer(
-            text=f"{get_text(user_language, 'error_sending_image')}: {str(e)}",
+        await show_screen(
+            callback_query.message,
+            f"{get_text(user_language, 'error_sending_image')}: {str(e)}",
             reply_markup=get_back_keyboard(user_language, "back_to_schedule")
         )
 
@@ -110,29 +102,17 @@ async def back_to_schedule_callback(callback_query: CallbackQuery, user_language
     # Получаем клавиатуру для выбора типа расписания
     keyboard = get_schedule_keyboard(user_language)
 
-    # Отвечаем на callback
-    await callback_query.answer()
+    # Путь к изображению
+    image_path = os.path.join(INTERFACE_IMAGES_FOLDER, "schedule.png")
 
-    try:
-        # Пробуем отредактировать текущее сообщение
-        await callback_query.message.edit_text(
-            text=schedule_text,
-            reply_markup=keyboard
-        )
-    except Exception:
-        # Если не получается отредактировать (например, если это фото),
-        # удаляем текущее сообщение и отправляем новое
-        try:
-            await callback_query.message.delete()
-        except Exception:
-            # Если не удалось удалить, просто игнорируем ошибку
-            pass
-
-        # Отправляем новое сообщение
-        await callback_query.message.answer(
-            text=schedule_text,
-            reply_markup=keyboard
-        )
+    # Отвечаем на callback и возвращаем экран расписания на месте текущего сообщения
+    await callback_query.answer()
+    await show_screen(
+        callback_query.message,
+        schedule_text,
+        image_path=image_path,
+        reply_markup=keyboard
+    )
 
 def setup_schedule_handlers(dp):
     """
@@ -0,0 +1,118 @@
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+import html
+import os
+from typing import Optional
+
+from keyboards.inline_kb import get_back_keyboard
+from keyboards.learning_kb import get_search_results_keyboard
+from services.search_index import search_index
+from services.text_manager import get_text
+from utils.message_utils import show_screen
+
+from config import MATERIALS_FOLDER, DEFAULT_LANGUAGE
+
+# Создаем роутер для обработчиков поиска по материалам
+router = Router()
+
+class SearchStates(StatesGroup):
+    """
+    Состояния поиска: ожидание текста запроса
+    """
+    waiting_for_query = State()
+
+async def leave_search(state: Optional[FSMContext], raw_state: Optional[str]) -> None:
+    """
+    Сбрасывает ожидание запроса поиска, когда пользователь уходит с экрана поиска
+    (кнопкой "Назад", навигацией по материалам или кнопками главного меню)
+
+    Аргументы:
+        state (Optional[FSMContext]): Состояние пользователя
+        raw_state (Optional[str]): Текущее состояние, уже прочитанное FSMContextMiddleware
+    """
+    if state is not None and raw_state == SearchStates.waiting_for_query.state:
+        await state.clear()
+
+async def send_search_results(message: Message, query: str, user_language: str, user_faculty: Optional[str]):
+    """
+    Ищет материалы и отправляет результаты с кнопками найденных папок и файлов
+
+    Аргументы:
+        message (Message): Сообщение пользователя с запросом
+        query (str): Текст запроса
+        user_language (str): Язык пользователя
+        user_faculty (Optional[str]): Факультет пользователя (поиск ведется по его материалам)
+    """
+    # Если факультет выбран, ищем только в его материалах
+    root = os.path.join(MATERIALS_FOLDER, user_faculty) if user_faculty else None
+    results = search_index.search(query, root=root)
+
+    escaped_query = html.escape(query)
+    if not results:
+        await message.answer(
+            get_text(user_language, "search_no_results", query=escaped_query),
+            reply_markup=await get_search_results_keyboard(user_language, [])
+        )
+        return
+
+    await message.answer(
+        get_text(user_language, "search_results", query=escaped_query),
+        reply_markup=await get_search_results_keyboard(user_language, results)
+    )
+
+@router.message(Command("search"))
+async def search_command(
+        message: Message,
+        command: CommandObject,
+        state: FSMContext,
+        user_language: str = DEFAULT_LANGUAGE,
+        user_faculty: Optional[str] = None
+):
+    """
+    Обработчик команды /search: с текстом запроса сразу ищет, без него - просит ввести запрос
+    """
+    query = (command.args or "").strip()
+
+    if not query:
+        await state.set_state(SearchStates.waiting_for_query)
+        await message.answer(get_text(user_language, "search_prompt"))
+        return
+
+    await state.clear()
+    await send_search_results(message, query, user_language, user_faculty)
+
+@router.callback_query(F.data == "search")
+async def search_callback(callback_query: CallbackQuery, state: FSMContext, user_language: str = DEFAULT_LANGUAGE):
+    """
+    Обработчик кнопки поиска: просит ввести запрос
+    """
+    await state.set_state(SearchStates.waiting_for_query)
+
+    await callback_query.answer()
+    await show_screen(
+        callback_query.message,
+        get_text(user_language, "search_prompt"),
+        reply_markup=get_back_keyboard(user_language, "back_to_materials")
+    )
+
+@router.message(SearchStates.waiting_for_query, F.text)
+async def search_query_handler(
+        message: Message,
+        state: FSMContext,
+        user_language: str = DEFAULT_LANGUAGE,
+        user_faculty: Optional[str] = None
+):
+    """
+    Обработчик текста запроса после команды /search или кнопки поиска
+    """
+    await state.clear()
+    await send_search_results(message, message.text.strip(), user_language, user_faculty)
+
+def setup_search_handlers(dp):
+    """
+    Регистрирует обработчики для поиска по материалам
+    """
+    dp.include_router(router)
@@ -69,3 +69,24 @@ def get_after_file_keyboard(language: str) -> InlineKeyboardMarkup:
     ])
 
     return keyboard
+
+def get_preview_keyboard(language: str, path_id: str) -> InlineKeyboardMarkup:
+    """
+    Создает инлайн-клавиатуру под превью файла
+
+    Аргументы:
+        language (str): Код языка (ru, en, ar)
+        path_id (str): Короткий идентификатор пути к файлу
+
+    Возвращает:
+        InlineKeyboardMarkup: Клавиатура с кнопками скачивания файла и возврата к материалам
+    """
+    download_text = add_emoji_to_text("📥", get_text(language, "download_file_button"))
+    back_text = add_emoji_to_text("🔙", get_text(language, "back_button"))
+
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=download_text, callback_data=f"dl:{path_id}")],
+        [InlineKeyboardButton(text=back_text, callback_data="back_to_materials")]
+    ])
+
+    return keyboard
@@ -1,16 +1,28 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from services.text_manager import get_text
+from services.text_manager import get_text, get_texts_version
 from services.file_manager import get_directories, get_files
 from utils.emoji import add_emoji_to_text
+from services.materials_index import materials_index
+from services.search_index import SearchResult
+from database.path_registry import path_registry
+from utils.helpers import natural_sort_key, is_previewable_file
+from services.previews import preview_cache
+from config import KEYBOARD_CACHE_SIZE, NAV_PAGE_SIZE
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import os
-import hashlib
-import re
 
-# Словарь для хранения соответствия хешей и путей
-_path_cache = {}
+# Кэш готовых клавиатур навигации: (язык, путь, родительский путь, страница) -> клавиатура
+_keyboard_cache: "OrderedDict[Tuple[str, str, Optional[str], int], InlineKeyboardMarkup]" = OrderedDict()
+# Кэш отсортированного содержимого папок: (язык, путь) -> [(отображаемое имя, путь, это папка)]
+_listing_cache: "OrderedDict[Tuple[str, str], List[Tuple[str, str, bool]]]" = OrderedDict()
+# Версии дерева материалов и переводов, для которых построены клавиатуры и списки в кэше
+_keyboard_cache_version = None
+# Статистика обращений к кэшу клавиатур
+_keyboard_cache_stats = {"hits": 0, "misses": 0}
 
-def get_path_id(path: str) -> str:
+async def get_path_id(path: str) -> str:
     """
     Создает короткий идентификатор для пути
 
@@ -20,15 +32,10 @@ def get_path_id(path: str) -> str:
     Возвращает:
         str: Короткий идентификатор пути
     """
-    # Создаем хеш пути
-    path_hash = hashlib.md5(path.encode()).hexdigest()[:8]
+    path_ids = await path_registry.register([path])
+    return path_ids[path]
 
-    # Сохраняем соответствие в кэше
-    _path_cache[path_hash] = path
-
-    return path_hash
-
-def get_path_by_id(path_id: str) -> str:
+async def get_path_by_id(path_id: str) -> str:
     """
     Получает полный путь по идентификатору
 
@@ -38,86 +45,154 @@ def get_path_by_id(path_id: str) -> str:
     Возвращает:
         str: Полный путь или пустую строку, если идентификатор не найден
     """
-    return _path_cache.get(path_id, "")
+    return await path_registry.get_path(path_id) or ""
 
 def smart_sort_key(text):
     """
-    Умная функция сортировки, которая сначала ищет и сортирует по числу,
-    а затем по алфавиту.
+    Ключ сортировки отображаемых имен папок и файлов (естественная сортировка, см. natural_sort_key).
+    Для элементов индекса материалов ключ вычисляется один раз при сканировании
 
     Аргументы:
         text (str): Текст для сортировки
 
     Возвращает:
-        tuple: Кортеж (есть_ли_число, число_или_0, текст_в_нижнем_регистре)
+        tuple: Ключ сортировки
     """
-    # Ищем числа в тексте
-    numbers = re.findall(r'\d+', text)
+    return natural_sort_key(text)
 
-    # Если найдено хотя бы одно число, используем первое для сортировки
-    if numbers:
-        # Преобразуем найденное число в int
-        number = int(numbers[0])
-        # Возвращаем кортеж для сортировки (True = есть число, число, текст в нижнем регистре)
-        return (True, number, text.lower())
-    else:
-        # Если числа нет, помещаем элемент после тех, где есть числа
-        # (False = нет числа, 0 = нулевое число, текст в нижнем регистре)
-        return (False, 0, text.lower())
+def _file_callback_data(file_path: str, path_id: str) -> str:
+    """
+    Данные кнопки файла: PDF и изображения сначала открываются как превью (pv:),
+    остальные файлы сразу отправляются целиком (dl:)
+    """
+    if preview_cache.enabled and is_previewable_file(file_path):
+        return f"pv:{path_id}"
+    return f"dl:{path_id}"
 
-async def get_navigation_keyboard(
-        language: str,
-        current_path: str,
-        parent_path: str = None
-) -> InlineKeyboardMarkup:
+def _check_cache_version() -> bool:
+    """
+    Сбрасывает кэши клавиатур и списков, если дерево материалов или переводы изменились
+
+    Возвращает:
+        bool: True, если кэшами можно пользоваться
+    """
+    global _keyboard_cache_version
+
+    if not materials_index.ready:
+        return False
+
+    version = _get_cache_version()
+    if _keyboard_cache_version != version:
+        # Дерево материалов или переводы изменились, все клавиатуры и списки устарели
+        _keyboard_cache.clear()
+        _listing_cache.clear()
+        _keyboard_cache_version = version
+    return True
+
+def _get_cached_keyboard(key: Tuple[str, str, Optional[str], int]) -> Optional[InlineKeyboardMarkup]:
+    """
+    Получает клавиатуру из кэша, если дерево материалов и переводы не изменились с момента ее построения
+    """
+    if not _check_cache_version():
+        return None
+
+    keyboard = _keyboard_cache.get(key)
+    if keyboard is not None:
+        _keyboard_cache.move_to_end(key)
+    return keyboard
+
+def get_keyboard_cache_stats() -> Dict[str, float]:
+    """
+    Получает статистику кэша клавиатур навигации
+
+    Возвращает:
+        Dict[str, float]: Размер кэша, количество попаданий и промахов и доля попаданий
     """
-    Создает инлайн-клавиатуру для навигации по файловой системе с умной сортировкой
+    total = _keyboard_cache_stats["hits"] + _keyboard_cache_stats["misses"]
+    return {
+        "size": len(_keyboard_cache),
+        **_keyboard_cache_stats,
+        "hit_ratio": _keyboard_cache_stats["hits"] / total if total else 0.0
+    }
+
+def _get_cache_version() -> Tuple[int, int]:
+    """
+    Получает текущую версию данных, из которых строятся клавиатуры
+    """
+    return materials_index.version, get_texts_version()
+
+def _save_keyboard(key: Tuple[str, str, Optional[str], int], keyboard: InlineKeyboardMarkup, version: Tuple[int, int]) -> None:
+    """
+    Сохраняет клавиатуру в кэш, вытесняя самые старые записи
+    """
+    if not materials_index.ready or version != _keyboard_cache_version:
+        return
+
+    _keyboard_cache[key] = keyboard
+    _keyboard_cache.move_to_end(key)
+
+    while len(_keyboard_cache) > KEYBOARD_CACHE_SIZE:
+        _keyboard_cache.popitem(last=False)
+
+def clear_keyboard_cache() -> None:
+    """
+    Очищает кэш клавиатур навигации и отсортированных списков папок
+    """
+    _keyboard_cache.clear()
+    _listing_cache.clear()
+
+async def _get_sorted_listing(language: str, current_path: str) -> List[Tuple[str, str, bool]]:
+    """
+    Получает содержимое папки, отсортированное для отображения: сначала папки, затем файлы.
+    Список сортируется один раз и хранится в кэше, страницы клавиатуры нарезаются из него
 
     Аргументы:
         language (str): Код языка (ru, en, ar)
-        current_path (str): Текущий путь в файловой системе
-        parent_path (str, optional): Родительский путь для кнопки "Назад"
+        current_path (str): Путь к папке
 
     Возвращает:
-        InlineKeyboardMarkup: Клавиатура с кнопками для навигации
+        List[Tuple[str, str, bool]]: Кортежи (отображаемое имя, путь, это папка)
     """
-    # Создаем билдер для клавиатуры
-    builder = InlineKeyboardBuilder()
-
-    # Получаем список папок в текущей директории
-    directories = await get_directories(current_path)
+    key = (language, os.path.normpath(current_path))
+    cacheable = _check_cache_version()
+    version = _keyboard_cache_version
+
+    if cacheable:
+        listing = _listing_cache.get(key)
+        if listing is not None:
+            _listing_cache.move_to_end(key)
+            return listing
+
+    # Готовые ключи сортировки берем из индекса материалов, чтобы не вычислять их при каждом построении
+    index_listing = materials_index.get_listing(current_path) if materials_index.ready else None
+    if index_listing is not None:
+        directories = [(entry.name, entry.sort_key) for entry in index_listing.directories]
+        files = [(entry.name, entry.sort_key) for entry in index_listing.files]
+    else:
+        directories = [(name, None) for name in await get_directories(current_path)]
+        files = [(name, None) for name in await get_files(current_path)]
 
-    # Создаем список пар (отображаемое имя, путь) для сортировки папок
+    # Создаем список (отображаемое имя, путь, это папка, ключ сортировки) для папок
     dir_pairs = []
-    for directory in directories:
+    for directory, sort_key in directories:
         dir_path = os.path.join(current_path, directory)
-        dir_name = directory
 
         # Пытаемся найти перевод для названия директории
-        dir_key = f"dir_{dir_name.replace(' ', '_').lower()}"
-        dir_text = get_text(language, dir_key, default=dir_name)
-
-        dir_pairs.append((dir_text, dir_path, dir_name))
-
-    # Умная сортировка папок
-    dir_pairs.sort(key=lambda x: smart_sort_key(x[0]))
+        dir_key = f"dir_{directory.replace(' ', '_').lower()}"
+        dir_text = get_text(language, dir_key, default=directory)
 
-    # Добавляем кнопки папок в отсортированном порядке
-    for dir_text, dir_path, dir_name in dir_pairs:
-        # Создаем короткий идентификатор для пути
-        dir_path_id = get_path_id(dir_path)
+        # Для переведенного названия ключ вычисляется заново (один раз на язык, дальше список берется из кэша)
+        if sort_key is None or dir_text != directory:
+            sort_key = smart_sort_key(dir_text)
 
-        button_text = add_emoji_to_text("📁", dir_text)
-        builder.row(
-            InlineKeyboardButton(text=button_text, callback_data=f"nav:{dir_path_id}")
-        )
+        dir_pairs.append((dir_text, dir_path, True, sort_key))
 
-    # Получаем список файлов в текущей директории
-    files = await get_files(current_path)
+    # Естественная сортировка папок
+    dir_pairs.sort(key=lambda x: x[3])
 
-    # Создаем список пар (отображаемое имя, путь) для сортировки файлов
+    # Создаем список (отображаемое имя, путь, это папка, ключ сортировки) для файлов
     file_pairs = []
-    for file in files:
+    for file, sort_key in files:
         file_path = os.path.join(current_path, file)
         file_name = os.path.splitext(file)[0]  # Имя файла без расширения
 
@@ -125,35 +200,156 @@ async def get_navigation_keyboard(
         file_key = f"file_{file_name.replace(' ', '_').lower()}"
         file_text = get_text(language, file_key, default=file)
 
-        file_pairs.append((file_text, file_path, file))
+        if sort_key is None or file_text != file:
+            sort_key = smart_sort_key(file_text)
 
-    # Умная сортировка файлов
-    file_pairs.sort(key=lambda x: smart_sort_key(x[0]))
+        file_pairs.append((file_text, file_path, False, sort_key))
 
-    # Добавляем кнопки файлов в отсортированном порядке
-    for file_text, file_path, file in file_pairs:
-        # Создаем короткий идентификатор для пути к файлу
-        file_path_id = get_path_id(file_path)
+    # Естественная сортировка файлов
+    file_pairs.sort(key=lambda x: x[3])
+
+    listing = [pair[:3] for pair in dir_pairs + file_pairs]
+
+    if cacheable and version == _keyboard_cache_version:
+        _listing_cache[key] = listing
+        while len(_listing_cache) > KEYBOARD_CACHE_SIZE:
+            _listing_cache.popitem(last=False)
+
+    return listing
+
+async def get_navigation_keyboard(
+        language: str,
+        current_path: str,
+        parent_path: str = None,
+        page: int = 0
+) -> InlineKeyboardMarkup:
+    """
+    Создает инлайн-клавиатуру для навигации по файловой системе с умной сортировкой.
+    Большие папки разбиваются на страницы по NAV_PAGE_SIZE элементов
+
+    Аргументы:
+        language (str): Код языка (ru, en, ar)
+        current_path (str): Текущий путь в файловой системе
+        parent_path (str, optional): Родительский путь для кнопки "Назад"
+        page (int): Номер страницы (с нуля)
+
+    Возвращает:
+        InlineKeyboardMarkup: Клавиатура с кнопками для навигации
+    """
+    # Повторный просмотр папки не требует перестроения клавиатуры
+    cache_key = (language, os.path.normpath(current_path), parent_path, page)
+    keyboard = _get_cached_keyboard(cache_key)
+    if keyboard is not None:
+        _keyboard_cache_stats["hits"] += 1
+        return keyboard
+    _keyboard_cache_stats["misses"] += 1
+    version = _get_cache_version()
+
+    # Создаем билдер для клавиатуры
+    builder = InlineKeyboardBuilder()
+
+    # Отсортированное содержимое папки (из кэша, если папку уже открывали)
+    listing = await _get_sorted_listing(language, current_path)
+
+    # Номер страницы из старой кнопки может оказаться больше числа страниц, если папка уменьшилась
+    pages = max(1, (len(listing) + NAV_PAGE_SIZE - 1) // NAV_PAGE_SIZE)
+    page = min(max(page, 0), pages - 1)
+    page_items = listing[page * NAV_PAGE_SIZE:(page + 1) * NAV_PAGE_SIZE]
+
+    # Получаем короткие идентификаторы только для путей текущей страницы одним запросом
+    paths = [item[1] for item in page_items]
+    if parent_path:
+        paths.append(parent_path)
+    if pages > 1:
+        paths.append(current_path)
+    path_ids = await path_registry.register(paths)
+
+    # Добавляем кнопки папок и файлов в отсортированном порядке
+    for item_text, item_path, is_dir in page_items:
+        # Короткий идентификатор для пути
+        item_path_id = path_ids[item_path]
+
+        if is_dir:
+            button_text = add_emoji_to_text("📁", item_text)
+            callback_data = f"nav:{item_path_id}"
+        else:
+            button_text = add_emoji_to_text("📄", item_text)
+            callback_data = _file_callback_data(item_path, item_path_id)
 
-        button_text = add_emoji_to_text("📄", file_text)
         builder.row(
-            InlineKeyboardButton(text=button_text, callback_data=f"dl:{file_path_id}")
+            InlineKeyboardButton(text=button_text, callback_data=callback_data)
         )
 
+    # Переключение страниц: номер страницы передается в callback_data (nav:<id>:<страница>)
+    if pages > 1:
+        current_path_id = path_ids[current_path]
+        buttons = []
+        if page > 0:
+            buttons.append(InlineKeyboardButton(text="◀️", callback_data=f"nav:{current_path_id}:{page - 1}"))
+        buttons.append(InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data="nav_page"))
+        if page < pages - 1:
+            buttons.append(InlineKeyboardButton(text="▶️", callback_data=f"nav:{current_path_id}:{page + 1}"))
+        builder.row(*buttons)
+
     # Добавляем кнопку "Назад", если есть родительский путь
     if parent_path:
-        # Создаем короткий идентификатор для родительского пути
-        parent_path_id = get_path_id(parent_path)
+        # Короткий идентификатор для родительского пути
+        parent_path_id = path_ids[parent_path]
 
         back_text = add_emoji_to_text("🔙", get_text(language, "back_button"))
         builder.row(
             InlineKeyboardButton(text=back_text, callback_data=f"nav:{parent_path_id}")
         )
     else:
+        # В корневой директории факультета добавляем кнопку поиска по материалам
+        search_text = add_emoji_to_text("🔍", get_text(language, "search_button"))
+        builder.row(
+            InlineKeyboardButton(text=search_text, callback_data="search")
+        )
+
         # Если это корневая директория, добавляем кнопку для возврата в главное меню
         back_to_main_text = add_emoji_to_text("🏠", get_text(language, "back_to_main_menu"))
         builder.row(
             InlineKeyboardButton(text=back_to_main_text, callback_data="back_to_main")
         )
 
+    keyboard = builder.as_markup()
+    _save_keyboard(cache_key, keyboard, version)
+
+    return keyboard
+
+async def get_search_results_keyboard(language: str, results: List[SearchResult]) -> InlineKeyboardMarkup:
+    """
+    Создает инлайн-клавиатуру с результатами поиска по материалам
+
+    Аргументы:
+        language (str): Код языка (ru, en, ar)
+        results (List[SearchResult]): Найденные папки и файлы
+
+    Возвращает:
+        InlineKeyboardMarkup: Клавиатура с кнопками найденных папок и файлов, нового поиска и возврата
+    """
+    builder = InlineKeyboardBuilder()
+
+    # Получаем короткие идентификаторы для всех путей одним запросом
+    path_ids = await path_registry.register([result.path for result in results])
+
+    for result in results:
+        if result.is_dir:
+            dir_key = f"dir_{result.name.replace(' ', '_').lower()}"
+            button_text = add_emoji_to_text("📁", get_text(language, dir_key, default=result.name))
+            callback_data = f"nav:{path_ids[result.path]}"
+        else:
+            file_key = f"file_{os.path.splitext(result.name)[0].replace(' ', '_').lower()}"
+            button_text = add_emoji_to_text("📄", get_text(language, file_key, default=result.name))
+            callback_data = _file_callback_data(result.path, path_ids[result.path])
+
+        builder.row(InlineKeyboardButton(text=button_text, callback_data=callback_data))
+
+    search_text = add_emoji_to_text("🔍", get_text(language, "search_button"))
+    builder.row(InlineKeyboardButton(text=search_text, callback_data="search"))
+
+    back_text = add_emoji_to_text("🔙", get_text(language, "back_button"))
+    builder.row(InlineKeyboardButton(text=back_text, callback_data="back_to_materials"))
+
     return builder.as_markup()
@@ -1,8 +1,71 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
-from services.text_manager import get_text
+from typing import Dict, Optional
+
+from services.text_manager import get_text, get_languages, get_texts_version
 from utils.emoji import add_emoji_to_text
 
+# Кнопки главного меню: ключ перевода -> эмодзи
+MAIN_MENU_BUTTONS = {
+    "profile_button": "👤",
+    "learning_center_button": "📚",
+    "schedule_button": "📆",
+    "channel_button": "📢"
+}
+
+# Обратный словарь: текст кнопки на любом языке -> ключ кнопки
+_button_map: Dict[str, str] = {}
+# Версия переводов, для которой построен обратный словарь
+_button_map_version = None
+
+def get_main_menu_button_text(language: str, button_key: str) -> str:
+    """
+    Получает текст кнопки главного меню вместе с эмодзи
+
+    Аргументы:
+        language (str): Код языка (ru, en, ar)
+        button_key (str): Ключ кнопки (например, "profile_button")
+
+    Возвращает:
+        str: Текст кнопки
+    """
+    return add_emoji_to_text(MAIN_MENU_BUTTONS[button_key], get_text(language, button_key))
+
+def get_main_menu_button_map() -> Dict[str, str]:
+    """
+    Получает обратный словарь текстов кнопок главного меню на всех языках.
+    Словарь перестраивается только после перезагрузки переводов
+
+    Возвращает:
+        Dict[str, str]: Текст кнопки -> ключ кнопки
+    """
+    global _button_map, _button_map_version
+
+    version = get_texts_version()
+    if _button_map_version != version:
+        _button_map = {
+            get_main_menu_button_text(language, button_key): button_key
+            for language in get_languages()
+            for button_key in MAIN_MENU_BUTTONS
+        }
+        _button_map_version = version
+
+    return _button_map
+
+def resolve_main_menu_button(text: Optional[str]) -> Optional[str]:
+    """
+    Определяет, какая кнопка главного меню была нажата
+
+    Аргументы:
+        text (Optional[str]): Текст сообщения
+
+    Возвращает:
+        Optional[str]: Ключ кнопки или None, если текст не является кнопкой меню
+    """
+    if not text:
+        return None
+    return get_main_menu_button_map().get(text)
+
 def get_main_keyboard(language: str) -> ReplyKeyboardMarkup:
     """
     Создает основную клавиатуру главного меню с переведенными кнопками
@@ -17,10 +80,10 @@ def get_main_keyboard(language: str) -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
 
     # Получаем переведенные тексты для кнопок
-    profile_text = add_emoji_to_text("👤", get_text(language, "profile_button"))
-    learning_text = add_emoji_to_text("📚", get_text(language, "learning_center_button"))
-    schedule_text = add_emoji_to_text("📆", get_text(language, "schedule_button"))
-    channel_text = add_emoji_to_text("📢", get_text(language, "channel_button"))
+    profile_text = get_main_menu_button_text(language, "profile_button")
+    learning_text = get_main_menu_button_text(language, "learning_center_button")
+    schedule_text = get_main_menu_button_text(language, "schedule_button")
+    channel_text = get_main_menu_button_text(language, "channel_button")
 
     # Добавляем кнопки в строки
     builder.row(
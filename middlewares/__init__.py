@@ -1,11 +1,22 @@
-from middlewares.i18n import I18nMiddleware
+from middlewares.user import UserMiddleware
+from middlewares.ordering import UserOrderingMiddleware, update_ordering
+from middlewares.metrics import MetricsMiddleware
 
 def setup_middleware(dp):
     """
     Устанавливает middleware для диспетчера
     """
+    # Обновления одного пользователя обрабатываются по очереди, разных пользователей - параллельно
+    dp.update.outer_middleware(update_ordering)
+
     # Устанавливаем middleware для всех типов сообщений
-    dp.message.middleware(I18nMiddleware())
-    dp.callback_query.middleware(I18nMiddleware())
+    dp.message.middleware(UserMiddleware())
+    dp.callback_query.middleware(UserMiddleware())
+    dp.inline_query.middleware(UserMiddleware())
+
+    # Измеряем время работы обработчиков
+    dp.message.middleware(MetricsMiddleware())
+    dp.callback_query.middleware(MetricsMiddleware())
+    dp.inline_query.middleware(MetricsMiddleware())
 
-__all__ = ['setup_middleware']
+__all__ = ['setup_middleware', 'UserMiddleware', 'UserOrderingMiddleware', 'update_ordering', 'MetricsMiddleware']
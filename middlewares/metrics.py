@@ -0,0 +1,47 @@
+import time
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, CallbackQuery
+
+from services.metrics import HANDLER_SECONDS, HANDLER_ERRORS
+
+def _get_prefix(event: TelegramObject) -> str:
+    """
+    Определяет вид события для метрик: префикс callback_data (nav:, dl:, schedule: ...) или тип события
+    """
+    if isinstance(event, CallbackQuery):
+        data = event.data or ""
+        return data.split(":", 1)[0] + ":" if ":" in data else data
+    return type(event).__name__.lower()
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Middleware, которое измеряет время работы обработчиков.
+    Метрики разделяются по модулю обработчика (роутеру), имени обработчика и префиксу callback_data
+    """
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        """
+        Обработчик для всех типов событий
+        """
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        labels = {
+            "router": getattr(callback, "__module__", "unknown").rsplit(".", 1)[-1],
+            "handler": getattr(callback, "__name__", "unknown"),
+            "prefix": _get_prefix(event)
+        }
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(**labels)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - started, **labels)
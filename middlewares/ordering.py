@@ -0,0 +1,167 @@
+import time
+import asyncio
+from contextlib import nullcontext
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from database.db_manager import get_user
+from services.text_manager import get_text
+from config import UPDATE_CONCURRENCY, UPDATE_USER_PENDING_LIMIT, UPDATE_USER_QUEUE_LIMIT, DEFAULT_LANGUAGE
+
+# Обновления, которые можно отбросить при длинной очереди пользователя: повторные нажатия кнопок
+# и inline-запросы (Telegram присылает новый запрос при каждом изменении текста)
+SHEDDABLE_UPDATES = ("callback_query", "inline_query")
+
+class _UserQueue:
+    """
+    Очередь обновлений одного пользователя
+    """
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        # asyncio.Lock отдает блокировку ожидающим в порядке очереди
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+class UserOrderingMiddleware(BaseMiddleware):
+    """
+    Внешний middleware обновлений: обновления разных пользователей обрабатываются
+    параллельно (не больше max_concurrency одновременно), а обновления одного пользователя -
+    строго по очереди, в порядке поступления.
+    Если у пользователя в очереди max_pending_per_user обновлений, новые нажатия кнопок и inline-запросы
+    отбрасываются (на нажатия отправляется пустой ответ, чтобы у пользователя не висели часики),
+    а сообщения ждут своей очереди. Сообщения отбрасываются только после max_queued_per_user обновлений
+    в очереди, и пользователь получает уведомление, что сообщение пропущено.
+
+    Порядок соблюдается только внутри одного процесса: при WEBHOOK_WORKERS больше 1 обновления
+    одного пользователя могут попасть в разные процессы и обрабатываться одновременно.
+    """
+
+    def __init__(
+            self,
+            max_concurrency: int = UPDATE_CONCURRENCY,
+            max_pending_per_user: int = UPDATE_USER_PENDING_LIMIT,
+            max_queued_per_user: int = UPDATE_USER_QUEUE_LIMIT
+    ):
+        """
+        Аргументы:
+            max_concurrency (int): Максимальное количество одновременно обрабатываемых обновлений
+            max_pending_per_user (int): Длина очереди пользователя, после которой отбрасываются
+                нажатия кнопок и inline-запросы
+            max_queued_per_user (int): Длина очереди пользователя, после которой отбрасываются все обновления
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending_per_user = max(1, max_pending_per_user)
+        self.max_queued_per_user = max(self.max_pending_per_user, max_queued_per_user)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._queues: Dict[int, _UserQueue] = {}
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.processed = 0
+        self.dropped = 0
+        # Тип обновления -> количество отброшенных
+        self.dropped_by_type: Dict[str, int] = {}
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        """
+        Обработчик для всех обновлений
+        """
+        from_user = data.get("event_from_user")
+
+        # Обновления без пользователя не нужно упорядочивать
+        queue = None
+        if from_user is not None:
+            queue = self._queues.get(from_user.id)
+            if queue is None:
+                queue = self._queues[from_user.id] = _UserQueue()
+
+            update_type = getattr(event, "event_type", "unknown")
+            limit = self.max_pending_per_user if update_type in SHEDDABLE_UPDATES else self.max_queued_per_user
+            if queue.pending >= limit:
+                # Пользователь отправляет обновления быстрее, чем они обрабатываются (например, много нажатий подряд)
+                self.dropped += 1
+                self.dropped_by_type[update_type] = self.dropped_by_type.get(update_type, 0) + 1
+                await self._notify_dropped(event, data)
+                return None
+
+            queue.pending += 1
+
+        started = time.monotonic()
+        self.waiting += 1
+        waiting = True
+        try:
+            # Сначала дожидаемся своей очереди у пользователя, затем общего свободного места
+            async with queue.lock if queue is not None else nullcontext(), self._semaphore:
+                self.waiting -= 1
+                waiting = False
+
+                wait_time = time.monotonic() - started
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+
+                self.in_flight += 1
+                try:
+                    return await handler(event, data)
+                finally:
+                    self.in_flight -= 1
+                    self.processed += 1
+        finally:
+            if waiting:
+                self.waiting -= 1
+            if queue is not None:
+                queue.pending -= 1
+                if queue.pending == 0:
+                    self._queues.pop(from_user.id, None)
+
+    @staticmethod
+    async def _notify_dropped(event: TelegramObject, data: Dict[str, Any]) -> None:
+        """
+        Отвечает на отброшенное нажатие кнопки пустым ответом, а об отброшенном сообщении сообщает пользователю
+        """
+        bot = data.get("bot")
+        if bot is None:
+            return
+
+        callback_query = getattr(event, "callback_query", None)
+        message = getattr(event, "message", None)
+        try:
+            if callback_query is not None:
+                await bot.answer_callback_query(callback_query.id)
+            elif message is not None:
+                # Профиль пользователя, который отправляет много сообщений, обычно уже в кэше
+                user = await get_user(data["event_from_user"].id)
+                language = (user.language if user else None) or DEFAULT_LANGUAGE
+                await bot.send_message(message.chat.id, get_text(language, "update_skipped"))
+        except Exception as e:
+            print(f"Error notifying about dropped update: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Получает статистику обработки обновлений
+
+        Возвращает:
+            Dict[str, Any]: Количество обрабатываемых и ожидающих обновлений, время ожидания
+                и отброшенные обновления (всего и по типам, например dropped_callback_query)
+        """
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "users": len(self._queues),
+            "processed": self.processed,
+            "dropped": self.dropped,
+            **{f"dropped_{update_type}": count for update_type, count in self.dropped_by_type.items()},
+            "wait_time_avg": self.wait_time_total / self.processed if self.processed else 0.0,
+            "wait_time_max": self.wait_time_max
+        }
+
+# Общий middleware упорядочивания обновлений
+update_ordering = UserOrderingMiddleware()
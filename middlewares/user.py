@@ -0,0 +1,43 @@
+from typing import Callable, Dict, Any, Awaitable
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from database.db_manager import get_user
+from database.activity_buffer import activity_buffer
+from config import DEFAULT_LANGUAGE
+
+class UserMiddleware(BaseMiddleware):
+    """
+    Middleware, которое один раз за обновление загружает профиль пользователя,
+    передает в обработчики язык, факультет и сам профиль и отмечает активность пользователя
+    """
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        """
+        Обработчик для всех типов событий
+        """
+        # Получаем пользователя, от которого пришло событие
+        from_user = data.get("event_from_user") or getattr(event, "from_user", None)
+        if from_user is None:
+            # Если не удалось определить пользователя, пропускаем обработку
+            return await handler(event, data)
+
+        # Загружаем профиль пользователя (обычно из кэша, без обращения к базе)
+        user = await get_user(from_user.id)
+
+        # Добавляем данные пользователя в data
+        data['user'] = user
+        data['user_language'] = (user.language if user else None) or DEFAULT_LANGUAGE
+        data['user_faculty'] = user.faculty if user else None
+
+        # Отмечаем активность: запись в базу выполняется позже, пакетом, вне обработки события
+        if user is not None:
+            activity_buffer.record(from_user.id)
+
+        # Продолжаем обработку события
+        return await handler(event, data)
@@ -0,0 +1,135 @@
+import os
+import hashlib
+from typing import Optional, Tuple
+
+# Функции модуля выполняются в отдельных процессах (ProcessPoolExecutor). Модуль лежит вне пакетов бота:
+# при импорте services процесс загрузил бы весь бот и открыл базу данных, а здесь
+# импортируются только библиотеки для работы с изображениями и PDF
+from PIL import Image
+
+try:
+    import pypdfium2
+except ImportError:
+    # Без pypdfium2 первая страница PDF не рисуется, используется ее самое большое изображение (для сканов)
+    pypdfium2 = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# Размер части файла, которая читается за раз при вычислении хэша
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_hash(path: str) -> str:
+    """
+    Вычисляет хэш содержимого файла (одинаковые файлы в разных папках получают одно превью)
+
+    Аргументы:
+        path (str): Путь к файлу
+
+    Возвращает:
+        str: Хэш содержимого в шестнадцатеричном виде
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _render_pdf(path: str, max_size: int) -> Tuple[Optional[Image.Image], int]:
+    """
+    Рисует первую страницу PDF и считает страницы
+
+    Возвращает:
+        Tuple[Optional[Image.Image], int]: Изображение первой страницы (или None) и количество страниц
+    """
+    if pypdfium2 is not None:
+        document = pypdfium2.PdfDocument(path)
+        try:
+            pages = len(document)
+            if not pages:
+                return None, 0
+
+            page = document[0]
+            try:
+                width, height = page.get_size()
+                # Масштаб 1 соответствует 72 точкам на дюйм; рисуем сразу в нужном размере
+                scale = max_size / max(width, height, 1)
+                image = page.render(scale=scale).to_pil()
+            finally:
+                page.close()
+            return image, pages
+        finally:
+            document.close()
+
+    if PdfReader is None:
+        return None, 0
+
+    reader = PdfReader(path)
+    pages = len(reader.pages)
+    if not pages:
+        return None, 0
+
+    image = None
+    try:
+        images = [item.image for item in reader.pages[0].images]
+        images = [item for item in images if item is not None]
+        if images:
+            image = max(images, key=lambda item: item.width * item.height)
+    except Exception:
+        # Изображения в некоторых PDF не декодируются; количество страниц все равно известно
+        image = None
+    return image, pages
+
+def _open_image(path: str, max_size: int) -> Image.Image:
+    """
+    Открывает изображение; JPEG сразу декодируется в уменьшенном виде
+    """
+    image = Image.open(path)
+    image.draft("RGB", (max_size, max_size))
+    image.load()
+    return image
+
+def render_preview(
+        path: str,
+        image_path: str,
+        max_size: int,
+        quality: int
+) -> Tuple[int, bool]:
+    """
+    Строит превью файла: первую страницу PDF или уменьшенное изображение, сохраненное в JPEG
+
+    Аргументы:
+        path (str): Путь к PDF или изображению
+        image_path (str): Куда сохранить превью
+        max_size (int): Максимальный размер большей стороны превью в пикселях
+        quality (int): Качество JPEG
+
+    Возвращает:
+        Tuple[int, bool]: Количество страниц и True, если превью сохранено
+    """
+    if path.lower().endswith(".pdf"):
+        image, pages = _render_pdf(path, max_size)
+    else:
+        image, pages = _open_image(path, max_size), 1
+
+    if image is None:
+        return pages, False
+
+    image.thumbnail((max_size, max_size))
+    if image.mode != "RGB":
+        # Прозрачные области заливаем белым, как они выглядят на странице
+        background = Image.new("RGB", image.size, "white")
+        converted = image.convert("RGBA")
+        background.paste(converted, mask=converted.getchannel("A"))
+        image = background
+
+    # Сохраняем через временный файл, чтобы не оставить недописанное превью
+    temp_path = f"{image_path}.{os.getpid()}.tmp"
+    image.save(temp_path, "JPEG", quality=quality, optimize=True)
+    os.replace(temp_path, image_path)
+    return pages, True
@@ -0,0 +1,62 @@
+"""
+Сборка оптимизированных вариантов изображений интерфейса и расписаний.
+
+Для каждого изображения из INTERFACE_IMAGES_FOLDER и IMAGES_FOLDER собираются варианты в JPEG и WebP
+с большей стороной не больше заданных размеров (по умолчанию IMAGE_VARIANT_SIZE - размер фото в Telegram).
+Варианты и manifest.json (исходник -> варианты, их размеры и хэши) записываются в IMAGE_VARIANTS_DIR;
+бот при запуске читает manifest.json и отправляет вместо исходника вариант формата IMAGE_VARIANT_FORMAT.
+Неизменившиеся изображения не пересобираются.
+
+Пример запуска:
+    python scripts/build_images.py
+    python scripts/build_images.py --sizes 1280,2560 --formats jpeg
+"""
+import os
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build optimized variants of interface and schedule images")
+    parser.add_argument("--sizes", help="comma-separated maximum sizes of the longer side, px "
+                                        "(default: IMAGE_VARIANT_SIZE)")
+    parser.add_argument("--formats", default="jpeg,webp", help="comma-separated variant formats: jpeg, webp")
+    args = parser.parse_args()
+
+    # Пути в config относительны корня проекта, как и при запуске бота
+    os.chdir(ROOT_DIR)
+    sys.path.insert(0, str(ROOT_DIR))
+
+    from config import IMAGE_VARIANTS_DIR, IMAGE_VARIANT_SIZE
+    from services.image_registry import get_registered_images
+    from services.image_variants import build_image_variants
+
+    sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else [IMAGE_VARIANT_SIZE]
+    formats = [image_format.strip() for image_format in args.formats.split(",")]
+
+    sources = asyncio.run(get_registered_images())
+    images = build_image_variants(sources, IMAGE_VARIANTS_DIR, sizes, formats)
+
+    total_source = 0
+    total_variants = {}
+    for image in images:
+        total_source += image["size"]
+        variants = ", ".join(
+            f"{variant['format']} {variant['width']}x{variant['height']} {variant['bytes'] / 1024:.0f} KB"
+            for variant in image["variants"]
+        )
+        print(f"{image['source']:<40}{image['size'] / 1024:>8.0f} KB -> {variants}")
+        for variant in image["variants"]:
+            key = (variant["format"], variant["max_size"])
+            total_variants[key] = total_variants.get(key, 0) + variant["bytes"]
+
+    print(f"\n{len(images)} images, {total_source / 1024 / 1024:.1f} MB")
+    for (image_format, max_size), total in sorted(total_variants.items()):
+        print(f"{image_format} {max_size}: {total / 1024 / 1024:.2f} MB ({total / total_source:.0%} of the originals)")
+    print(f"Manifest: {os.path.join(IMAGE_VARIANTS_DIR, 'manifest.json')}")
+
+if __name__ == "__main__":
+    main()
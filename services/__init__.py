@@ -7,9 +7,66 @@ from services.file_manager import (
     get_file_info
 )
 
+from services.materials_index import (
+    MaterialsIndex,
+    MaterialEntry,
+    DirectoryListing,
+    materials_index
+)
+
+from services.search_index import (
+    SearchIndex,
+    SearchResult,
+    search_index
+)
+
+from services.file_streaming import (
+    StreamingFile,
+    upload_slot
+)
+
+from services.file_id_cache import (
+    send_cached_file,
+    get_file_id,
+    get_file_ids,
+    remember_file_id,
+    forget_file_id
+)
+
+from services.previews import (
+    Preview,
+    PreviewCache,
+    preview_cache
+)
+
+from services.inline_search import (
+    InlineMaterial,
+    find_inline_materials
+)
+
+from services.image_registry import (
+    get_registered_images,
+    warm_up_images
+)
+
+from services.image_variants import (
+    load_image_variants,
+    resolve_image,
+    build_image_variants
+)
+
+from services.outbound import (
+    TokenBucket,
+    OutboundScheduler,
+    outbound_scheduler
+)
+
 from services.text_manager import (
     get_text,
-    get_all_texts
+    get_all_texts,
+    get_languages,
+    get_texts_version,
+    reload_texts
 )
 
 __all__ = [
@@ -19,6 +76,36 @@ __all__ = [
     'check_faculty_exists',
     'check_file_exists',
     'get_file_info',
+    'MaterialsIndex',
+    'MaterialEntry',
+    'DirectoryListing',
+    'materials_index',
+    'SearchIndex',
+    'SearchResult',
+    'search_index',
+    'StreamingFile',
+    'upload_slot',
+    'send_cached_file',
+    'get_file_id',
+    'get_file_ids',
+    'remember_file_id',
+    'forget_file_id',
+    'Preview',
+    'PreviewCache',
+    'preview_cache',
+    'InlineMaterial',
+    'find_inline_materials',
+    'get_registered_images',
+    'warm_up_images',
+    'load_image_variants',
+    'resolve_image',
+    'build_image_variants',
+    'TokenBucket',
+    'OutboundScheduler',
+    'outbound_scheduler',
     'get_text',
-    'get_all_texts'
+    'get_all_texts',
+    'get_languages',
+    'get_texts_version',
+    'reload_texts'
 ]
@@ -0,0 +1,245 @@
+import os
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InputFile, Message
+
+from database.db_manager import get_cached_file_id, get_cached_file_ids, save_file_id, delete_file_id
+from services.file_streaming import StreamingFile, upload_slot
+
+# Фрагменты ошибок Telegram, означающих, что сохраненный file_id больше не действует
+# (остальные ошибки, например "message is not modified", не связаны с file_id)
+STALE_FILE_ID_ERRORS = (
+    "wrong file identifier",
+    "file reference expired",
+    "wrong remote file id",
+    "failed to get http url content"
+)
+
+# Горячий слой кэша: путь -> (размер, время модификации, file_id)
+_file_id_cache: Dict[str, Tuple[int, float, str]] = {}
+
+# Статистика обращений к кэшу: найдено в памяти, найдено в базе, не найдено
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+def _is_stale_file_id_error(error: TelegramBadRequest) -> bool:
+    """
+    Проверяет, что Telegram отклонил запрос из-за недействительного file_id
+
+    Аргументы:
+        error (TelegramBadRequest): Ошибка Telegram
+
+    Возвращает:
+        bool: True, если file_id нужно забыть и загрузить файл заново
+    """
+    message = str(error.message).lower()
+    return any(fragment in message for fragment in STALE_FILE_ID_ERRORS)
+
+def _normalize_path(file_path: str) -> str:
+    """
+    Приводит путь к единому виду, чтобы один и тот же файл имел один ключ в кэше
+    """
+    return os.path.normcase(os.path.abspath(file_path))
+
+def _stat_file_sync(file_path: str) -> Optional[Tuple[int, float]]:
+    """
+    Получает размер и время модификации файла
+
+    Аргументы:
+        file_path (str): Путь к файлу
+
+    Возвращает:
+        Optional[Tuple[int, float]]: Кортеж (размер, mtime) или None, если файла нет
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    return stat.st_size, stat.st_mtime
+
+def extract_file_id(message: Message) -> Optional[str]:
+    """
+    Извлекает file_id из сообщения, которое вернул Telegram после отправки файла
+
+    Аргументы:
+        message (Message): Отправленное сообщение
+
+    Возвращает:
+        Optional[str]: file_id или None, если в сообщении нет файла
+    """
+    if message is None:
+        return None
+
+    if message.photo:
+        # Берем самый большой вариант фотографии
+        return message.photo[-1].file_id
+
+    for media in (message.document, message.video, message.audio, message.animation):
+        if media is not None:
+            return media.file_id
+
+    return None
+
+async def get_file_id(file_path: str) -> Optional[str]:
+    """
+    Получает актуальный file_id для файла
+
+    Аргументы:
+        file_path (str): Путь к файлу
+
+    Возвращает:
+        Optional[str]: file_id или None, если файл еще не отправлялся или изменился
+    """
+    key = _normalize_path(file_path)
+    stat = await asyncio.to_thread(_stat_file_sync, key)
+    if stat is None:
+        return None
+
+    return await _lookup(key, *stat)
+
+async def _lookup(key: str, size: int, mtime: float) -> Optional[str]:
+    """
+    Ищет file_id сначала в памяти, затем в базе данных
+    """
+    cached = _file_id_cache.get(key)
+    if cached is not None:
+        if cached[0] == size and cached[1] == mtime:
+            _stats["memory_hits"] += 1
+            return cached[2]
+        # Файл на диске изменился, запись в памяти устарела
+        del _file_id_cache[key]
+
+    file_id = await get_cached_file_id(key, size, mtime)
+    if file_id:
+        _stats["db_hits"] += 1
+        _file_id_cache[key] = (size, mtime, file_id)
+    else:
+        _stats["misses"] += 1
+
+    return file_id
+
+async def get_file_ids(files: Iterable[Tuple[str, int, float]]) -> Dict[str, str]:
+    """
+    Получает актуальные file_id для нескольких файлов, размер и время модификации которых уже известны
+    (например, из индекса материалов). Файлы, которых нет в памяти, ищутся в базе одним запросом
+
+    Аргументы:
+        files (Iterable[Tuple[str, int, float]]): Кортежи (путь, размер, mtime)
+
+    Возвращает:
+        Dict[str, str]: Путь (в том виде, в котором передан) -> file_id, только для файлов с актуальным file_id
+    """
+    result = {}
+    missing = {}
+
+    for file_path, size, mtime in files:
+        key = _normalize_path(file_path)
+        cached = _file_id_cache.get(key)
+        if cached is not None and cached[0] == size and cached[1] == mtime:
+            _stats["memory_hits"] += 1
+            result[file_path] = cached[2]
+        else:
+            missing[key] = (file_path, size, mtime)
+
+    if missing:
+        stored = await get_cached_file_ids(list(missing))
+        for key, (file_path, size, mtime) in missing.items():
+            row = stored.get(key)
+            if row is not None and row[0] == size and row[1] == mtime:
+                _stats["db_hits"] += 1
+                _file_id_cache[key] = row
+                result[file_path] = row[2]
+            else:
+                _stats["misses"] += 1
+
+    return result
+
+def get_file_id_cache_stats() -> Dict[str, float]:
+    """
+    Получает статистику кэша file_id
+
+    Возвращает:
+        Dict[str, float]: Размер кэша в памяти, количество попаданий и промахов и доля попаданий
+    """
+    hits = _stats["memory_hits"] + _stats["db_hits"]
+    total = hits + _stats["misses"]
+    return {
+        "size": len(_file_id_cache),
+        **_stats,
+        "hit_ratio": hits / total if total else 0.0
+    }
+
+async def remember_file_id(file_path: str, file_id: str, stat: Optional[Tuple[int, float]] = None) -> None:
+    """
+    Сохраняет file_id для файла в памяти и в базе данных
+
+    Аргументы:
+        file_path (str): Путь к файлу
+        file_id (str): Идентификатор файла в Telegram
+        stat (Optional[Tuple[int, float]]): Размер и mtime файла на момент отправки
+    """
+    key = _normalize_path(file_path)
+    if stat is None:
+        stat = await asyncio.to_thread(_stat_file_sync, key)
+        if stat is None:
+            return
+
+    size, mtime = stat
+    _file_id_cache[key] = (size, mtime, file_id)
+    await save_file_id(key, size, mtime, file_id)
+
+async def forget_file_id(file_path: str) -> None:
+    """
+    Удаляет file_id файла из кэша
+
+    Аргументы:
+        file_path (str): Путь к файлу
+    """
+    key = _normalize_path(file_path)
+    _file_id_cache.pop(key, None)
+    await delete_file_id(key)
+
+async def send_cached_file(
+        file_path: str,
+        send: Callable[[Union[str, InputFile]], Awaitable[Message]]
+) -> Message:
+    """
+    Отправляет файл, используя сохраненный file_id, если он есть.
+    При первой отправке загружает файл и запоминает file_id, который вернул Telegram.
+    Если Telegram отклоняет сохраненный file_id как недействительный, файл загружается заново;
+    остальные ошибки Telegram передаются вызывающему коду.
+
+    Аргументы:
+        file_path (str): Путь к файлу
+        send (Callable): Функция отправки, принимающая file_id или InputFile
+
+    Возвращает:
+        Message: Отправленное сообщение
+    """
+    key = _normalize_path(file_path)
+    stat = await asyncio.to_thread(_stat_file_sync, key)
+
+    if stat is not None:
+        file_id = await _lookup(key, *stat)
+        if file_id:
+            try:
+                return await send(file_id)
+            except TelegramBadRequest as e:
+                if not _is_stale_file_id_error(e):
+                    # Ошибка не связана с file_id (например, сообщение нельзя изменить): повторная загрузка не поможет
+                    raise
+                # Telegram больше не принимает этот file_id, загружаем файл заново
+                print(f"Cached file_id rejected for '{key}': {e}")
+                await forget_file_id(key)
+
+    # Загрузка читает файл частями; количество одновременных загрузок ограничено
+    async with upload_slot():
+        message = await send(StreamingFile(file_path))
+
+    new_file_id = extract_file_id(message)
+    if new_file_id and stat is not None:
+        await remember_file_id(key, new_file_id, stat)
+
+    return message
@@ -3,6 +3,7 @@ import asyncio
 from typing import List, Optional
 
 from config import MATERIALS_FOLDER
+from services.materials_index import materials_index
 
 async def get_directories(path: str) -> List[str]:
     """
@@ -14,6 +15,11 @@ async def get_directories(path: str) -> List[str]:
     Возвращает:
         List[str]: Список имен подпапок
     """
+    # Папки с материалами берем из индекса, без обращения к файловой системе
+    if materials_index.ready and materials_index.contains(path):
+        listing = materials_index.get_listing(path)
+        return listing.directory_names if listing else []
+
     try:
         # Запускаем синхронный код в отдельном потоке через ThreadPoolExecutor
         result = await asyncio.to_thread(_get_directories_sync, path)
@@ -47,6 +53,11 @@ async def get_files(path: str) -> List[str]:
     Возвращает:
         List[str]: Список имен файлов
     """
+    # Файлы с материалами берем из индекса, без обращения к файловой системе
+    if materials_index.ready and materials_index.contains(path):
+        listing = materials_index.get_listing(path)
+        return listing.file_names if listing else []
+
     try:
         # Запускаем синхронный код в отдельном потоке через ThreadPoolExecutor
         result = await asyncio.to_thread(_get_files_sync, path)
@@ -0,0 +1,159 @@
+import os
+import mmap
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncGenerator, AsyncIterator, Dict, Optional, Union
+
+from aiogram.types import FSInputFile
+
+from config import UPLOAD_CHUNK_SIZE, UPLOAD_CONCURRENCY, UPLOAD_THREADS
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+# Отдельный пул потоков для чтения загружаемых файлов, чтобы большие загрузки
+# не занимали общий пул asyncio.to_thread (проверки файлов, база данных)
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Ограничение одновременных загрузок файлов в Telegram
+_upload_semaphore = asyncio.Semaphore(max(1, UPLOAD_CONCURRENCY))
+
+# Статистика загрузок: выполняются сейчас, ожидают очереди, завершено, прочитано байт
+_stats = {"active": 0, "waiting": 0, "uploads": 0, "bytes_read": 0}
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Получает пул потоков для чтения файлов, создавая его при первом обращении
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, UPLOAD_THREADS), thread_name_prefix="upload")
+    return _executor
+
+class _MappedFile:
+    """
+    Файл, отображенный в память только для чтения.
+    Прочитанные части сразу освобождаются из памяти процесса (остаются только в кэше ОС),
+    поэтому загрузка большого файла не увеличивает потребление памяти ботом
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            # Пустой файл нельзя отобразить в память
+            if self.size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    self._map.madvise(mmap.MADV_SEQUENTIAL)
+        except Exception:
+            self._file.close()
+            raise
+
+    def read(self, offset: int, size: int) -> bytes:
+        """
+        Читает часть файла
+
+        Аргументы:
+            offset (int): Смещение от начала файла
+            size (int): Максимальный размер части
+
+        Возвращает:
+            bytes: Прочитанные данные (пустые, если файл закончился)
+        """
+        if self._map is None or offset >= self.size:
+            return b""
+
+        end = min(offset + size, self.size)
+        chunk = self._map[offset:end]
+
+        if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            # Смещение для madvise должно быть выровнено по размеру страницы
+            start = offset - offset % mmap.PAGESIZE
+            self._map.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+        return chunk
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+class StreamingFile(FSInputFile):
+    """
+    Файл с диска для загрузки в Telegram.
+    Читается частями фиксированного размера через mmap в отдельном пуле потоков,
+    поэтому на одну загрузку в памяти находится не больше одной части файла
+    """
+
+    def __init__(
+            self,
+            path: Union[str, Path],
+            filename: Optional[str] = None,
+            chunk_size: int = UPLOAD_CHUNK_SIZE
+    ):
+        """
+        Аргументы:
+            path (Union[str, Path]): Путь к файлу
+            filename (Optional[str]): Имя файла для Telegram (по умолчанию - имя файла на диске)
+            chunk_size (int): Размер части файла в байтах
+        """
+        super().__init__(path, filename=filename, chunk_size=chunk_size)
+
+    async def read(self, bot: "Bot") -> AsyncGenerator[bytes, None]:
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+
+        mapped = await loop.run_in_executor(executor, _MappedFile, self.path)
+        try:
+            offset = 0
+            while True:
+                chunk = await loop.run_in_executor(executor, mapped.read, offset, self.chunk_size)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                _stats["bytes_read"] += len(chunk)
+                yield chunk
+        finally:
+            mapped.close()
+
+@asynccontextmanager
+async def upload_slot() -> AsyncIterator[None]:
+    """
+    Ждет свободного места среди одновременных загрузок и занимает его на время блока
+    """
+    _stats["waiting"] += 1
+    try:
+        await _upload_semaphore.acquire()
+    finally:
+        _stats["waiting"] -= 1
+
+    _stats["active"] += 1
+    try:
+        yield
+    finally:
+        _stats["active"] -= 1
+        _stats["uploads"] += 1
+        _upload_semaphore.release()
+
+def get_upload_stats() -> Dict[str, int]:
+    """
+    Получает статистику загрузок файлов
+
+    Возвращает:
+        Dict[str, int]: Количество выполняющихся, ожидающих и завершенных загрузок и объем прочитанных данных
+    """
+    return dict(_stats)
+
+def shutdown_upload_executor() -> None:
+    """
+    Останавливает пул потоков чтения файлов
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,81 @@
+import os
+import asyncio
+from typing import List, Union
+
+from aiogram import Bot
+
+from config import INTERFACE_IMAGES_FOLDER, IMAGES_FOLDER
+from services.file_id_cache import get_file_id, remember_file_id, extract_file_id
+from services.file_streaming import StreamingFile, upload_slot
+from services.image_variants import resolve_image
+from utils.helpers import is_image_file
+
+# Папки с изображениями интерфейса и расписаний, которые бот отправляет постоянно
+IMAGE_FOLDERS = [INTERFACE_IMAGES_FOLDER, IMAGES_FOLDER]
+
+def _list_images_sync() -> List[str]:
+    """
+    Синхронно собирает список изображений интерфейса и расписаний
+    """
+    images = []
+    for folder in IMAGE_FOLDERS:
+        if not os.path.isdir(folder):
+            continue
+
+        for item in sorted(os.listdir(folder)):
+            item_path = os.path.join(folder, item)
+            if is_image_file(item) and os.path.isfile(item_path):
+                images.append(item_path)
+
+    return images
+
+async def get_registered_images() -> List[str]:
+    """
+    Получает список всех изображений, которые хранятся в реестре
+
+    Возвращает:
+        List[str]: Пути к изображениям интерфейса и расписаний
+    """
+    return await asyncio.to_thread(_list_images_sync)
+
+async def warm_up_images(bot: Bot, chat_id: Union[int, str]) -> int:
+    """
+    Заранее загружает изображения в Telegram и сохраняет их file_id,
+    чтобы первые пользователи не ждали загрузки картинок.
+    Служебные сообщения удаляются сразу после загрузки.
+
+    Аргументы:
+        bot (Bot): Экземпляр бота
+        chat_id (Union[int, str]): Служебный чат, в который загружаются изображения
+
+    Возвращает:
+        int: Количество загруженных изображений
+    """
+    uploaded = 0
+
+    for source_path in await get_registered_images():
+        # Загружаем тот же вариант изображения, который потом отправляется пользователям
+        image_path = resolve_image(source_path)
+
+        # Изображения с актуальным file_id загружать не нужно
+        if await get_file_id(image_path):
+            continue
+
+        try:
+            async with upload_slot():
+                message = await bot.send_photo(chat_id=chat_id, photo=StreamingFile(image_path))
+        except Exception as e:
+            print(f"Error warming up image '{image_path}': {e}")
+            continue
+
+        file_id = extract_file_id(message)
+        if file_id:
+            await remember_file_id(image_path, file_id)
+            uploaded += 1
+
+        try:
+            await bot.delete_message(chat_id=chat_id, message_id=message.message_id)
+        except Exception as e:
+            print(f"Error deleting warm-up message: {e}")
+
+    return uploaded
@@ -0,0 +1,230 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, Iterable, List, Tuple
+
+from PIL import Image
+
+from config import IMAGE_VARIANTS_DIR, IMAGE_VARIANT_FORMAT, IMAGE_VARIANT_SIZE
+
+# Версия формата файла со списком вариантов
+MANIFEST_FORMAT = 1
+
+# Расширения и параметры сохранения для форматов вариантов
+VARIANT_FORMATS = {
+    "jpeg": ("jpg", {"quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("webp", {"quality": 80, "method": 6})
+}
+
+# Исходное изображение -> варианты: (формат, максимальный размер) -> путь
+_variants: Dict[str, Dict[Tuple[str, int], str]] = {}
+
+def _manifest_path(variants_dir: str) -> str:
+    return os.path.join(variants_dir, "manifest.json")
+
+def _file_hash(path: str) -> str:
+    """
+    Вычисляет хэш содержимого файла
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_manifest(variants_dir: str) -> Dict[str, Any]:
+    """
+    Читает список вариантов; при отсутствии или другой версии формата возвращает пустой список
+    """
+    try:
+        with open(_manifest_path(variants_dir), "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error loading image variants manifest: {e}")
+        return {}
+
+    if data.get("format") != MANIFEST_FORMAT:
+        return {}
+    return data.get("images", {})
+
+def load_image_variants(variants_dir: str = IMAGE_VARIANTS_DIR) -> int:
+    """
+    Загружает список оптимизированных вариантов изображений (синхронно, вызывается при запуске).
+    Варианты изображений, которые изменились после сборки (по хэшу содержимого),
+    не используются до следующей сборки
+
+    Аргументы:
+        variants_dir (str): Папка с вариантами и файлом manifest.json
+
+    Возвращает:
+        int: Количество изображений, для которых будут отправляться варианты
+    """
+    _variants.clear()
+
+    for source, image in _read_manifest(variants_dir).items():
+        try:
+            # Время модификации после клонирования репозитория другое, поэтому сравниваем содержимое
+            changed = os.path.getsize(source) != image["size"] or _file_hash(source) != image["hash"]
+        except OSError:
+            continue
+
+        if changed:
+            print(f"Image '{source}' changed after building variants, sending the original")
+            continue
+
+        variants = {}
+        for variant in image["variants"]:
+            variant_path = os.path.join(variants_dir, variant["path"])
+            if os.path.isfile(variant_path):
+                variants[(variant["format"], variant["max_size"])] = variant_path
+
+        if variants:
+            _variants[os.path.normpath(source)] = variants
+
+    return len(_variants)
+
+def resolve_image(image_path: str, image_format: str = IMAGE_VARIANT_FORMAT, max_size: int = IMAGE_VARIANT_SIZE) -> str:
+    """
+    Подбирает для изображения оптимизированный вариант нужного формата:
+    самый большой вариант не больше max_size, а если таких нет - самый маленький
+
+    Аргументы:
+        image_path (str): Путь к исходному изображению
+        image_format (str): Формат варианта (jpeg или webp)
+        max_size (int): Максимальный размер большей стороны в пикселях
+
+    Возвращает:
+        str: Путь к варианту или исходный путь, если варианта нет
+    """
+    variants = _variants.get(os.path.normpath(image_path))
+    if variants is None:
+        return image_path
+
+    sizes = sorted(size for variant_format, size in variants if variant_format == image_format)
+    if not sizes:
+        return image_path
+
+    fitting = [size for size in sizes if size <= max_size]
+    return variants[(image_format, fitting[-1] if fitting else sizes[0])]
+
+def get_image_variants_stats() -> Dict[str, int]:
+    """
+    Получает статистику вариантов изображений
+
+    Возвращает:
+        Dict[str, int]: Количество изображений с вариантами и общее количество вариантов
+    """
+    return {
+        "images": len(_variants),
+        "variants": sum(len(variants) for variants in _variants.values())
+    }
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """
+    Убирает прозрачность: прозрачные области заливаются белым
+    """
+    if image.mode == "RGB":
+        # Копия нужна, так как исходник закрывается после чтения
+        return image.copy()
+
+    converted = image.convert("RGBA")
+    background = Image.new("RGB", converted.size, "white")
+    background.paste(converted, mask=converted.getchannel("A"))
+    return background
+
+def build_image_variants(
+        sources: Iterable[str],
+        variants_dir: str = IMAGE_VARIANTS_DIR,
+        sizes: Iterable[int] = (IMAGE_VARIANT_SIZE,),
+        formats: Iterable[str] = tuple(VARIANT_FORMATS)
+) -> List[Dict[str, Any]]:
+    """
+    Собирает оптимизированные варианты изображений и записывает manifest.json.
+    Изображения, которые не изменились с прошлой сборки, не пересобираются; устаревшие варианты удаляются
+
+    Аргументы:
+        sources (Iterable[str]): Пути к исходным изображениям
+        variants_dir (str): Папка для вариантов
+        sizes (Iterable[int]): Максимальные размеры большей стороны вариантов в пикселях
+        formats (Iterable[str]): Форматы вариантов (jpeg, webp)
+
+    Возвращает:
+        List[Dict[str, Any]]: Для каждого изображения: путь, размер исходника и варианты
+    """
+    sizes = sorted(set(sizes))
+    formats = list(formats)
+    for image_format in formats:
+        if image_format not in VARIANT_FORMATS:
+            raise ValueError(f"Unsupported image variant format: {image_format}")
+
+    os.makedirs(variants_dir, exist_ok=True)
+    previous = _read_manifest(variants_dir)
+    images = {}
+
+    for source in sources:
+        source = os.path.normpath(source)
+        source_hash = _file_hash(source)
+
+        old = previous.get(source)
+        if (old is not None and old["hash"] == source_hash
+                and {(v["format"], v["max_size"]) for v in old["variants"]} == {(f, s) for f in formats for s in sizes}
+                and all(os.path.isfile(os.path.join(variants_dir, v["path"])) for v in old["variants"])):
+            # Исходник не изменился, варианты уже собраны
+            images[source] = old
+            continue
+
+        with Image.open(source) as original:
+            original.load()
+            image = _flatten(original)
+
+        name = os.path.splitext(os.path.basename(source))[0]
+        folder = os.path.basename(os.path.dirname(source))
+
+        variants = []
+        for max_size in sizes:
+            resized = image.copy()
+            resized.thumbnail((max_size, max_size), Image.LANCZOS)
+
+            for image_format in formats:
+                extension, options = VARIANT_FORMATS[image_format]
+                # Хэш исходника в имени: после изменения картинки у варианта новый путь и новый file_id
+                relative = os.path.join(folder, f"{name}.{max_size}.{source_hash[:8]}.{extension}")
+                variant_path = os.path.join(variants_dir, relative)
+                os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+                resized.save(variant_path, image_format.upper(), **options)
+
+                variants.append({
+                    "path": relative,
+                    "format": image_format,
+                    "max_size": max_size,
+                    "width": resized.width,
+                    "height": resized.height,
+                    "bytes": os.path.getsize(variant_path),
+                    "hash": _file_hash(variant_path)
+                })
+
+        images[source] = {
+            "hash": source_hash,
+            "size": os.path.getsize(source),
+            "width": image.width,
+            "height": image.height,
+            "variants": variants
+        }
+
+    # Удаляем варианты, которых больше нет в списке (старые версии и удаленные изображения)
+    used = {os.path.normpath(v["path"]) for image in images.values() for v in image["variants"]}
+    for directory, _, files in os.walk(variants_dir):
+        for file in files:
+            relative = os.path.normpath(os.path.relpath(os.path.join(directory, file), variants_dir))
+            if relative != "manifest.json" and relative not in used:
+                os.remove(os.path.join(variants_dir, relative))
+
+    manifest_path = _manifest_path(variants_dir)
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump({"format": MANIFEST_FORMAT, "images": images}, file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+
+    return [{"source": source, **image} for source, image in images.items()]
@@ -0,0 +1,110 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config import MATERIALS_FOLDER, INLINE_MAX_RESULTS, INLINE_CACHE_SIZE, INLINE_CACHE_TTL
+from database.path_registry import path_registry
+from services.file_id_cache import get_file_ids
+from services.search_index import search_index
+from utils.helpers import is_image_file
+from utils.stemmer import normalize_text, tokenize
+
+@dataclass
+class InlineMaterial:
+    """
+    Материал, который можно отправить из инлайн-режима по сохраненному file_id
+
+    Атрибуты:
+        result_id (str): Идентификатор результата (короткий идентификатор пути)
+        name (str): Имя файла
+        title (str): Заголовок результата (имя файла без расширения)
+        description (str): Папка, в которой лежит файл
+        file_id (str): Идентификатор файла в Telegram
+        is_image (bool): True, если файл отправлялся как фото
+    """
+    result_id: str
+    name: str
+    title: str
+    description: str
+    file_id: str
+    is_image: bool
+
+# Кэш результатов: (нормализованный запрос, факультет) -> (время, версия поискового индекса, материалы)
+_inline_cache: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, int, List[InlineMaterial]]]" = OrderedDict()
+# Статистика обращений к кэшу результатов
+_inline_cache_stats = {"hits": 0, "misses": 0}
+
+def _cache_key(query: str, faculty: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Ключ кэша: одинаковые по словам запросы ("Анатомия  лекция" и "анатомия лекция") используют одну запись
+    """
+    return " ".join(tokenize(normalize_text(query))), faculty
+
+async def find_inline_materials(query: str, faculty: Optional[str] = None) -> List[InlineMaterial]:
+    """
+    Ищет материалы для инлайн-режима. В результаты попадают только файлы,
+    которые уже отправлялись и имеют актуальный file_id (инлайн-режим не может загружать файлы)
+
+    Аргументы:
+        query (str): Текст запроса
+        faculty (Optional[str]): Факультет пользователя (поиск ведется по его материалам)
+
+    Возвращает:
+        List[InlineMaterial]: Все найденные материалы в порядке убывания релевантности
+    """
+    key = _cache_key(query, faculty)
+    cached = _inline_cache.get(key)
+    if cached is not None:
+        created, version, materials = cached
+        if version == search_index.version and time.monotonic() - created < INLINE_CACHE_TTL:
+            _inline_cache.move_to_end(key)
+            _inline_cache_stats["hits"] += 1
+            return materials
+        del _inline_cache[key]
+
+    _inline_cache_stats["misses"] += 1
+    version = search_index.version
+
+    root = os.path.join(MATERIALS_FOLDER, faculty) if faculty else MATERIALS_FOLDER
+    results = [
+        result for result in search_index.search(query, root=root, limit=INLINE_MAX_RESULTS)
+        if not result.is_dir
+    ]
+
+    file_ids = await get_file_ids((result.path, result.size, result.mtime) for result in results)
+    results = [result for result in results if result.path in file_ids]
+    path_ids = await path_registry.register([result.path for result in results])
+
+    materials = []
+    for result in results:
+        folder = os.path.relpath(os.path.dirname(result.path), root)
+        materials.append(InlineMaterial(
+            result_id=path_ids[result.path],
+            name=result.name,
+            title=os.path.splitext(result.name)[0],
+            description="" if folder == os.curdir else folder.replace(os.sep, " / "),
+            file_id=file_ids[result.path],
+            is_image=is_image_file(result.name)
+        ))
+
+    _inline_cache[key] = (time.monotonic(), version, materials)
+    while len(_inline_cache) > INLINE_CACHE_SIZE:
+        _inline_cache.popitem(last=False)
+
+    return materials
+
+def get_inline_cache_stats() -> Dict[str, float]:
+    """
+    Получает статистику кэша результатов инлайн-режима
+
+    Возвращает:
+        Dict[str, float]: Размер кэша, количество попаданий и промахов и доля попаданий
+    """
+    total = _inline_cache_stats["hits"] + _inline_cache_stats["misses"]
+    return {
+        "size": len(_inline_cache),
+        **_inline_cache_stats,
+        "hit_ratio": _inline_cache_stats["hits"] / total if total else 0.0
+    }
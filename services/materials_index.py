@@ -0,0 +1,370 @@
+import os
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import MATERIALS_FOLDER, MATERIALS_POLL_INTERVAL, MATERIALS_FILE_CHECK_INTERVAL
+from services.metrics import MATERIALS_REFRESH_SECONDS
+from utils.helpers import natural_sort_key
+
+@dataclass
+class MaterialEntry:
+    """
+    Элемент дерева материалов (папка или файл)
+
+    Атрибуты:
+        name (str): Имя папки или файла
+        path (str): Путь к папке или файлу
+        is_dir (bool): True, если это папка
+        size (int): Размер файла в байтах (0 для папок)
+        mtime (float): Время последней модификации
+        sort_key (Tuple): Ключ естественной сортировки имени (вычисляется один раз при сканировании)
+    """
+    name: str
+    path: str
+    is_dir: bool
+    size: int = 0
+    mtime: float = 0.0
+    sort_key: Tuple = ()
+
+@dataclass
+class DirectoryListing:
+    """
+    Содержимое одной папки с материалами
+
+    Атрибуты:
+        path (str): Путь к папке
+        mtime (float): Время модификации папки на момент сканирования
+        directories (List[MaterialEntry]): Подпапки, отсортированные по имени
+        files (List[MaterialEntry]): Файлы, отсортированные по имени
+        entries (Dict[str, MaterialEntry]): Подпапки и файлы по имени (строится при создании)
+    """
+    path: str
+    mtime: float
+    directories: List[MaterialEntry] = field(default_factory=list)
+    files: List[MaterialEntry] = field(default_factory=list)
+    entries: Dict[str, MaterialEntry] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.entries = {entry.name: entry for entry in self.directories + self.files}
+
+    @property
+    def directory_names(self) -> List[str]:
+        return [entry.name for entry in self.directories]
+
+    @property
+    def file_names(self) -> List[str]:
+        return [entry.name for entry in self.files]
+
+def _normalize(path: str) -> str:
+    """
+    Приводит путь к виду, который используется как ключ в индексе
+    """
+    return os.path.normpath(path)
+
+def _scan_directory(path: str) -> Optional[DirectoryListing]:
+    """
+    Сканирует одну папку через os.scandir (без отдельного stat на каждый элемент, где это возможно)
+
+    Аргументы:
+        path (str): Путь к папке
+
+    Возвращает:
+        Optional[DirectoryListing]: Содержимое папки или None, если папка недоступна
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+        directories = []
+        files = []
+
+        with os.scandir(path) as iterator:
+            for item in iterator:
+                if item.name.startswith('.'):
+                    continue
+
+                item_path = os.path.join(path, item.name)
+                try:
+                    if item.is_dir():
+                        directories.append(MaterialEntry(item.name, item_path, True, sort_key=natural_sort_key(item.name)))
+                    elif item.is_file():
+                        stat = item.stat()
+                        files.append(MaterialEntry(
+                            item.name, item_path, False, stat.st_size, stat.st_mtime, natural_sort_key(item.name)
+                        ))
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    directories.sort(key=lambda entry: entry.name)
+    files.sort(key=lambda entry: entry.name)
+
+    return DirectoryListing(path, mtime, directories, files)
+
+def _files_changed(listing: DirectoryListing) -> bool:
+    """
+    Проверяет, изменились ли размер или время модификации файлов папки с момента сканирования
+
+    Аргументы:
+        listing (DirectoryListing): Содержимое папки из индекса
+
+    Возвращает:
+        bool: True, если хотя бы один файл изменился или пропал
+    """
+    for entry in listing.files:
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return True
+        if stat.st_size != entry.size or stat.st_mtime != entry.mtime:
+            return True
+    return False
+
+class MaterialsIndex:
+    """
+    Индекс дерева материалов в памяти.
+    Строится один раз при запуске и обновляется по изменению времени модификации папок,
+    поэтому получение содержимого папки не обращается к файловой системе.
+    Файлы, перезаписанные на месте, находит более редкая полная проверка файлов.
+    """
+
+    def __init__(
+            self,
+            root: str = MATERIALS_FOLDER,
+            poll_interval: float = MATERIALS_POLL_INTERVAL,
+            file_check_interval: float = MATERIALS_FILE_CHECK_INTERVAL
+    ):
+        """
+        Аргументы:
+            root (str): Корневая папка с материалами
+            poll_interval (float): Интервал проверки изменений в секундах
+            file_check_interval (float): Интервал полной проверки файлов в секундах (0 - не проверять)
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.file_check_interval = file_check_interval
+        # Время последней полной проверки файлов (по time.monotonic)
+        self._files_checked_at = 0.0
+        # Версия увеличивается при каждом изменении дерева
+        self.version = 0
+        self._listings: Dict[str, DirectoryListing] = {}
+        self._ready = False
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """
+        True, если индекс уже построен
+        """
+        return self._ready
+
+    def contains(self, path: str) -> bool:
+        """
+        Проверяет, относится ли путь к дереву материалов
+
+        Аргументы:
+            path (str): Путь к папке или файлу
+
+        Возвращает:
+            bool: True, если путь находится внутри корневой папки
+        """
+        root = _normalize(self.root)
+        path = _normalize(path)
+        return path == root or path.startswith(root + os.sep)
+
+    def get_listing(self, path: str) -> Optional[DirectoryListing]:
+        """
+        Получает содержимое папки из индекса
+
+        Аргументы:
+            path (str): Путь к папке
+
+        Возвращает:
+            Optional[DirectoryListing]: Содержимое папки или None, если такой папки нет
+        """
+        return self._listings.get(_normalize(path))
+
+    def get_entry(self, path: str) -> Optional[MaterialEntry]:
+        """
+        Получает элемент дерева (папку или файл) по пути
+
+        Аргументы:
+            path (str): Путь к папке или файлу
+
+        Возвращает:
+            Optional[MaterialEntry]: Элемент дерева или None, если он не найден
+        """
+        parent = self.get_listing(os.path.dirname(_normalize(path)))
+        if parent is None:
+            return None
+
+        return parent.entries.get(os.path.basename(_normalize(path)))
+
+    def iter_listings(self) -> List[DirectoryListing]:
+        """
+        Получает содержимое всех проиндексированных папок
+
+        Возвращает:
+            List[DirectoryListing]: Список папок индекса
+        """
+        return list(self._listings.values())
+
+    def _scan_tree(self, path: str, listings: Dict[str, DirectoryListing]) -> None:
+        """
+        Рекурсивно сканирует поддерево и добавляет его папки в listings
+        """
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            listing = _scan_directory(current)
+            if listing is None:
+                continue
+
+            listings[_normalize(current)] = listing
+            stack.extend(entry.path for entry in listing.directories)
+
+    def build(self) -> None:
+        """
+        Полностью строит индекс (синхронно)
+        """
+        listings: Dict[str, DirectoryListing] = {}
+        with MATERIALS_REFRESH_SECONDS.time(kind="build"):
+            self._scan_tree(self.root, listings)
+
+        with self._lock:
+            self._listings = listings
+            self.version += 1
+            self._ready = True
+        self._files_checked_at = time.monotonic()
+
+    def refresh(self) -> bool:
+        """
+        Проверяет время модификации проиндексированных папок и пересканирует только изменившиеся.
+        Новые подпапки сканируются целиком, удаленные убираются из индекса вместе с поддеревом.
+        Раз в file_check_interval секунд проверяются и размер и время модификации всех файлов
+
+        Возвращает:
+            bool: True, если дерево изменилось
+        """
+        if not self._ready:
+            self.build()
+            return True
+
+        check_files = (self.file_check_interval > 0
+                       and time.monotonic() - self._files_checked_at >= self.file_check_interval)
+
+        with MATERIALS_REFRESH_SECONDS.time(kind="files" if check_files else "refresh"):
+            changed = self._refresh(check_files)
+
+        if check_files:
+            self._files_checked_at = time.monotonic()
+        return changed
+
+    def _refresh(self, check_files: bool) -> bool:
+        listings = dict(self._listings)
+        changed = False
+
+        for key, listing in list(listings.items()):
+            if key not in listings:
+                # Папка уже удалена вместе с родителем
+                continue
+
+            try:
+                mtime = os.stat(listing.path).st_mtime
+            except OSError:
+                mtime = None
+
+            # Перезапись файла на месте не меняет время модификации папки, поэтому файлы проверяются отдельно
+            if mtime is not None and mtime == listing.mtime and not (check_files and _files_changed(listing)):
+                continue
+
+            changed = True
+            dropped = self._drop_subtree(key, listings)
+
+            if mtime is None:
+                continue
+
+            new_listing = _scan_directory(listing.path)
+            if new_listing is None:
+                continue
+
+            listings[key] = new_listing
+            for entry in new_listing.directories:
+                entry_key = _normalize(entry.path)
+                if entry_key in dropped:
+                    # Подпапка существовала раньше: восстанавливаем ее поддерево без сканирования
+                    self._restore_subtree(entry_key, dropped, listings)
+                elif entry_key not in listings:
+                    self._scan_tree(entry.path, listings)
+
+        if changed:
+            with self._lock:
+                self._listings = listings
+                self.version += 1
+
+        return changed
+
+    def _drop_subtree(self, key: str, listings: Dict[str, DirectoryListing]) -> Dict[str, DirectoryListing]:
+        """
+        Удаляет папку и все вложенные папки из listings
+
+        Возвращает:
+            Dict[str, DirectoryListing]: Удаленные папки
+        """
+        prefix = key + os.sep
+        dropped = {}
+        for other in [k for k in listings if k == key or k.startswith(prefix)]:
+            dropped[other] = listings.pop(other)
+        return dropped
+
+    def _restore_subtree(
+            self,
+            key: str,
+            dropped: Dict[str, DirectoryListing],
+            listings: Dict[str, DirectoryListing]
+    ) -> None:
+        """
+        Возвращает в listings ранее удаленное поддерево
+        """
+        prefix = key + os.sep
+        for other, listing in dropped.items():
+            if other == key or other.startswith(prefix):
+                listings[other] = listing
+
+    async def _run(self) -> None:
+        """
+        Периодически проверяет изменения в дереве материалов
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"Error refreshing materials index: {e}")
+
+    async def start(self) -> None:
+        """
+        Строит индекс и запускает фоновую проверку изменений
+        """
+        await asyncio.to_thread(self.build)
+
+        if self.poll_interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую проверку изменений
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Общий индекс материалов приложения
+materials_index = MaterialsIndex()
@@ -0,0 +1,319 @@
+import os
+import time
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import BufferedInputFile, FSInputFile, InputMedia
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+# Префикс имен всех метрик бота
+METRICS_PREFIX = "lsp_bot"
+
+# Границы корзин гистограмм времени выполнения, в секундах
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """
+    Форматирует метки метрики в формате Prometheus
+    """
+    parts = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(labelnames, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """
+    Базовый класс метрики с метками
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.collect()
+
+class Counter(_Metric):
+    """
+    Счетчик, который только увеличивается
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(_Metric):
+    """
+    Текущее значение. Если задана функция, значения вычисляются при каждом чтении метрик
+    """
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def collect(self) -> List[str]:
+        if self._function is not None:
+            items = list(self._function().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram(_Metric):
+    """
+    Гистограмма значений (обычно времени выполнения) с накопительными корзинами
+    """
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Iterable[str] = (),
+            buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Метки -> (количество значений в каждой корзине, сумма, количество)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def time(self, **labels: Any) -> "_Timer":
+        """
+        Контекстный менеджер, который измеряет время выполнения блока
+        """
+        return _Timer(self, labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+class MetricsRegistry:
+    """
+    Реестр метрик приложения
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Регистрирует метрику; повторная регистрация с тем же именем возвращает существующую
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def register_stats(self, name: str, stats: Callable[[], Dict[str, Any]], documentation: str) -> None:
+        """
+        Публикует числовые значения словаря статистики (например, UserCache.stats())
+        как метрику <name>_stats с меткой stat=<ключ>
+
+        Аргументы:
+            name (str): Имя источника статистики
+            stats (Callable[[], Dict[str, Any]]): Функция, возвращающая статистику
+            documentation (str): Описание источника
+        """
+        def values() -> Dict[Tuple[str, ...], float]:
+            try:
+                data = stats()
+            except Exception as e:
+                print(f"Error collecting '{name}' stats: {e}")
+                return {}
+            return {
+                (key,): value for key, value in data.items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+
+        self.register(Gauge(f"{name}_stats", documentation, ("stat",), values))
+
+    def render(self) -> str:
+        """
+        Формирует текст со всеми метриками в формате Prometheus
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Общий реестр метрик
+registry = MetricsRegistry()
+
+# Время обработки обновлений по обработчикам
+HANDLER_SECONDS = registry.register(Histogram(
+    "handler_seconds", "Update handler latency", ("router", "handler", "prefix")
+))
+HANDLER_ERRORS = registry.register(Counter(
+    "handler_errors_total", "Update handler exceptions", ("router", "handler", "prefix")
+))
+
+# Запросы к SQLite: ожидание свободного соединения и время работы с соединением
+DB_WAIT_SECONDS = registry.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled SQLite connection"
+))
+DB_SECONDS = registry.register(Histogram(
+    "db_query_seconds", "Time a pooled SQLite connection was held (queries and commit)"
+))
+
+# Запросы к Telegram Bot API
+API_SECONDS = registry.register(Histogram(
+    "telegram_api_seconds", "Telegram Bot API request latency", ("method",)
+))
+API_ERRORS = registry.register(Counter(
+    "telegram_api_errors_total", "Telegram Bot API request errors", ("method", "error")
+))
+UPLOADED_BYTES = registry.register(Counter(
+    "uploaded_bytes_total", "Bytes uploaded to Telegram", ("method",)
+))
+
+# Время обновления индекса материалов (обход файловой системы)
+MATERIALS_REFRESH_SECONDS = registry.register(Histogram(
+    "materials_index_refresh_seconds", "Materials index scan duration", ("kind",)
+))
+
+def _input_file_size(value: Any) -> int:
+    """
+    Определяет размер загружаемого файла
+    """
+    if isinstance(value, FSInputFile):
+        try:
+            return os.path.getsize(value.path)
+        except OSError:
+            return 0
+    if isinstance(value, BufferedInputFile):
+        return len(value.data)
+    if isinstance(value, InputMedia):
+        return _input_file_size(value.media)
+    return 0
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Middleware сессии бота, которое измеряет время запросов к Telegram и объем загруженных файлов
+    """
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: "Bot",
+            method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+
+        uploaded = sum(_input_file_size(value) for value in method.__dict__.values())
+        if uploaded:
+            UPLOADED_BYTES.inc(uploaded, method=api_method)
+
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            API_ERRORS.inc(method=api_method, error=type(e).__name__)
+            raise
+        finally:
+            API_SECONDS.observe(time.perf_counter() - started, method=api_method)
+
+async def _metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """
+    Запускает HTTP-сервер, который отдает метрики по адресу /metrics
+
+    Аргументы:
+        host (str): Адрес, на котором слушает сервер
+        port (int): Порт сервера
+
+    Возвращает:
+        web.AppRunner: Запущенный сервер (для остановки через cleanup)
+    """
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host=host, port=port).start()
+    print(f"Metrics are served on http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,233 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from config import (
+    BOT_MODE,
+    WEBHOOK_WORKERS,
+    OUTBOUND_GLOBAL_RATE,
+    OUTBOUND_CHAT_RATE,
+    OUTBOUND_CHAT_BURST,
+    OUTBOUND_GROUP_RATE,
+    OUTBOUND_MAX_RETRIES,
+    OUTBOUND_MAX_CHATS
+)
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+# Методы, которые Telegram ограничивает по частоте: отправка и изменение сообщений.
+# Остальные запросы (удаление сообщений, ответы на callback) отправляются без очереди,
+# поэтому удаление старого сообщения перед отправкой нового не тратит лимит чата
+PACED_METHOD_PREFIXES = ("send", "copy", "forward", "edit")
+
+# Методы с такими префиксами, которые не создают сообщений
+UNPACED_METHODS = frozenset({"sendChatAction"})
+
+class TokenBucket:
+    """
+    Ведро токенов: пропускает не больше rate запросов в секунду
+    с возможностью короткого всплеска до capacity запросов.
+    Ожидающие запросы обслуживаются в порядке очереди
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Аргументы:
+            rate (float): Количество запросов в секунду
+            capacity (float): Максимальный всплеск запросов
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # Время, до которого Telegram попросил не отправлять запросы
+        self.blocked_until = 0.0
+        # Количество запросов, ожидающих токен
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def idle(self) -> bool:
+        """
+        True, если никто не ждет и ведро полностью восстановилось
+        """
+        now = time.monotonic()
+        self._refill(now)
+        return self.waiting == 0 and self.tokens >= self.capacity and self.blocked_until <= now
+
+    async def acquire(self) -> None:
+        """
+        Ждет, пока можно будет отправить запрос, и забирает токен
+        """
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    delay = self.blocked_until - now
+                    if delay <= 0:
+                        if self.tokens >= 1:
+                            self.tokens -= 1
+                            return
+                        delay = (1 - self.tokens) / self.rate
+
+                    await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+    def block(self, seconds: float) -> None:
+        """
+        Приостанавливает отправку на указанное время (после TelegramRetryAfter)
+
+        Аргументы:
+            seconds (float): Время паузы в секундах
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Планировщик исходящих запросов к Telegram (middleware сессии бота).
+    Ограничивает общую частоту отправки и частоту отправки в каждый чат,
+    а при TelegramRetryAfter приостанавливает чат на указанное время и повторяет запрос.
+    """
+
+    def __init__(
+            self,
+            global_rate: float = OUTBOUND_GLOBAL_RATE,
+            chat_rate: float = OUTBOUND_CHAT_RATE,
+            chat_burst: float = OUTBOUND_CHAT_BURST,
+            group_rate: float = OUTBOUND_GROUP_RATE,
+            max_retries: int = OUTBOUND_MAX_RETRIES,
+            max_chats: int = OUTBOUND_MAX_CHATS
+    ):
+        """
+        Аргументы:
+            global_rate (float): Общее количество сообщений в секунду
+            chat_rate (float): Количество сообщений в секунду в один личный чат
+            chat_burst (float): Допустимый всплеск сообщений в один чат
+            group_rate (float): Количество сообщений в секунду в одну группу
+            max_retries (int): Сколько раз повторять запрос после TelegramRetryAfter
+            max_chats (int): Сколько ведер чатов хранить одновременно
+        """
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self._chat_buckets: "OrderedDict[Any, TokenBucket]" = OrderedDict()
+
+        self.pending = 0
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+
+    def _get_chat_bucket(self, chat_id: Any) -> TokenBucket:
+        """
+        Получает ведро чата, создавая его при первом обращении
+        """
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is not None:
+            self._chat_buckets.move_to_end(chat_id)
+            return bucket
+
+        # Группы (отрицательный chat_id) Telegram ограничивает сильнее, чем личные чаты
+        is_group = isinstance(chat_id, str) or chat_id < 0
+        rate = self.group_rate if is_group else self.chat_rate
+        bucket = TokenBucket(rate, 1 if is_group else self.chat_burst)
+        self._chat_buckets[chat_id] = bucket
+
+        # Убираем самые давние ведра, которые уже не влияют на отправку
+        if len(self._chat_buckets) > self.max_chats:
+            for other in list(self._chat_buckets)[:len(self._chat_buckets) - self.max_chats]:
+                if self._chat_buckets[other].idle:
+                    del self._chat_buckets[other]
+
+        return bucket
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: "Bot",
+            method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        paced = api_method.startswith(PACED_METHOD_PREFIXES) and api_method not in UNPACED_METHODS
+        chat_id = getattr(method, "chat_id", None) if paced else None
+
+        attempt = 0
+        while True:
+            chat_bucket = self._get_chat_bucket(chat_id) if chat_id is not None else None
+
+            if paced:
+                self.pending += 1
+                try:
+                    # Сначала ждем очереди чата, чтобы не занимать общий лимит раньше времени
+                    if chat_bucket is not None:
+                        await chat_bucket.acquire()
+                    await self.global_bucket.acquire()
+                finally:
+                    self.pending -= 1
+
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.failed += 1
+                    raise
+
+                attempt += 1
+                self.retries += 1
+                print(f"Flood control on {api_method}, retrying in {e.retry_after} s")
+
+                if paced:
+                    # Повтор снова встанет в очередь и дождется окончания паузы
+                    (chat_bucket or self.global_bucket).block(e.retry_after)
+                else:
+                    await asyncio.sleep(e.retry_after)
+                continue
+
+            if paced:
+                self.sent += 1
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Получает статистику очереди отправки
+
+        Возвращает:
+            Dict[str, Any]: Глубина очереди, количество отправленных запросов, повторов и ошибок
+        """
+        return {
+            "queue_depth": self.pending,
+            "global_waiting": self.global_bucket.waiting,
+            "chats": len(self._chat_buckets),
+            "sent": self.sent,
+            "retries": self.retries,
+            "failed": self.failed
+        }
+
+def _process_global_rate() -> float:
+    """
+    Общий лимит бота на процесс: при нескольких процессах вебхука OUTBOUND_GLOBAL_RATE делится между ними,
+    чтобы вместе они не превышали лимит Telegram
+    """
+    workers = WEBHOOK_WORKERS if BOT_MODE == "webhook" else 1
+    return OUTBOUND_GLOBAL_RATE / max(workers, 1)
+
+# Общий планировщик исходящих запросов
+outbound_scheduler = OutboundScheduler(global_rate=_process_global_rate())
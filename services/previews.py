@@ -0,0 +1,443 @@
+import os
+import json
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    MATERIALS_POLL_INTERVAL,
+    PREVIEW_CACHE_DIR,
+    PREVIEW_WORKERS,
+    PREVIEW_MAX_SIZE,
+    PREVIEW_QUALITY
+)
+from services.materials_index import MaterialsIndex, materials_index
+from preview_render import file_hash, render_preview, pypdfium2
+from utils.helpers import is_previewable_file
+
+# Версия формата файла со списком превью
+MANIFEST_FORMAT = 1
+
+# Через сколько построенных превью сохранять список на диск во время большого обновления
+SAVE_EVERY = 100
+
+@dataclass
+class Preview:
+    """
+    Превью материала
+
+    Атрибуты:
+        image_path (Optional[str]): Путь к JPEG с первой страницей или уменьшенным изображением
+            (None, если изображение построить не удалось)
+        pages (int): Количество страниц (1 для изображений, 0 если неизвестно)
+    """
+    image_path: Optional[str]
+    pages: int
+
+def _stat_file_sync(path: str) -> Optional[Tuple[int, float]]:
+    """
+    Получает размер и время модификации файла или None, если файла нет
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime
+
+class PreviewCache:
+    """
+    Превью PDF и изображений из дерева материалов: первая страница (или уменьшенное изображение) в JPEG
+    и количество страниц. Превью строятся в пуле процессов в фоне после запуска и при изменении материалов,
+    а для еще не обработанных файлов - по запросу. Превью хранятся на диске под хэшем содержимого,
+    поэтому одинаковые файлы в разных папках используют одно превью, а перезапуск не требует их перестроения.
+    При нескольких процессах вебхука превью строит только первый процесс, остальные читают его список с диска.
+    """
+
+    def __init__(
+            self,
+            cache_dir: str = str(PREVIEW_CACHE_DIR),
+            materials: MaterialsIndex = materials_index,
+            workers: int = PREVIEW_WORKERS,
+            poll_interval: float = MATERIALS_POLL_INTERVAL,
+            max_size: int = PREVIEW_MAX_SIZE,
+            quality: int = PREVIEW_QUALITY
+    ):
+        """
+        Аргументы:
+            cache_dir (str): Папка для превью и списка обработанных файлов
+            materials (MaterialsIndex): Индекс дерева материалов
+            workers (int): Количество процессов построения превью (0 - превью выключены)
+            poll_interval (float): Интервал проверки изменений дерева материалов в секундах
+            max_size (int): Максимальный размер большей стороны превью в пикселях
+            quality (int): Качество JPEG
+        """
+        self.cache_dir = cache_dir
+        self.materials = materials
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_size = max_size
+        self.quality = quality
+        # Версия дерева материалов, с которой синхронизированы превью
+        self.synced_version: Optional[int] = None
+        # Строит ли этот процесс превью (иначе только читает список, сохраненный другим процессом)
+        self.building = True
+        # Размер и время модификации загруженного списка
+        self._manifest_stat: Optional[Tuple[int, float]] = None
+
+        # Путь к файлу -> (размер, время модификации, хэш содержимого)
+        self._files: Dict[str, Tuple[int, float, str]] = {}
+        # Хэш содержимого -> (количество страниц, есть ли изображение)
+        self._previews: Dict[str, Tuple[int, bool]] = {}
+        # Файлы, превью которых строится сейчас (повторные запросы ждут то же построение)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._update_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._built_since_save = 0
+
+        self._stats = {"hits": 0, "misses": 0, "rendered": 0, "reused": 0, "failed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, "manifest.json")
+
+    def _image_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.jpg")
+
+    def _preview(self, digest: str) -> Preview:
+        pages, has_image = self._previews[digest]
+        return Preview(self._image_path(digest) if has_image else None, pages)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Создает пул процессов при первом использовании
+        """
+        if self._executor is None:
+            # Как и процессы вебхука, запускаем процессы через spawn: fork не безопасен при работающих потоках
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _build(self, path: str, size: int, mtime: float) -> Preview:
+        """
+        Вычисляет хэш файла и строит превью, если для такого содержимого его еще нет
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        digest = await loop.run_in_executor(executor, file_hash, path)
+        known = self._previews.get(digest)
+
+        if known is not None and (not known[1] or os.path.exists(self._image_path(digest))):
+            self._stats["reused"] += 1
+        else:
+            try:
+                self._previews[digest] = await loop.run_in_executor(
+                    executor, render_preview, path, self._image_path(digest), self.max_size, self.quality
+                )
+                self._stats["rendered"] += 1
+            except Exception as e:
+                # Поврежденный файл не обрабатывается повторно, пока он не изменится
+                print(f"Error rendering preview for '{path}': {e}")
+                self._previews[digest] = (0, False)
+                self._stats["failed"] += 1
+
+        self._files[path] = (size, mtime, digest)
+        self._built_since_save += 1
+        return self._preview(digest)
+
+    async def _process(self, path: str, size: int, mtime: float) -> Preview:
+        """
+        Строит превью файла; одновременные запросы одного файла ждут одно построение
+        """
+        future = self._pending.get(path)
+        if future is None:
+            future = asyncio.ensure_future(self._build(path, size, mtime))
+            self._pending[path] = future
+            future.add_done_callback(lambda _: self._pending.pop(path, None))
+        # Отмена одного ожидающего не должна прерывать построение для остальных
+        return await asyncio.shield(future)
+
+    def _cached_digest(self, path: str, stat: Tuple[int, float]) -> Optional[str]:
+        """
+        Получает хэш файла, если для его текущего содержимого уже есть превью
+        """
+        cached = self._files.get(path)
+        if cached is not None and cached[:2] == stat and cached[2] in self._previews:
+            return cached[2]
+        return None
+
+    async def get_preview(self, file_path: str) -> Optional[Preview]:
+        """
+        Получает превью файла, при необходимости строит его
+
+        Аргументы:
+            file_path (str): Путь к PDF или изображению
+
+        Возвращает:
+            Optional[Preview]: Превью или None, если превью выключены, файл не поддерживается или недоступен
+                (или превью еще не построил процесс, который их строит)
+        """
+        if not self.enabled or not is_previewable_file(file_path):
+            return None
+
+        path = os.path.normpath(file_path)
+        entry = self.materials.get_entry(path) if self.materials.ready else None
+        if entry is not None:
+            stat = (entry.size, entry.mtime)
+        else:
+            stat = await asyncio.to_thread(_stat_file_sync, path)
+            if stat is None:
+                return None
+
+        digest = self._cached_digest(path, stat)
+        if digest is None and not self.building and await self.reload():
+            # Превью могло появиться в списке процесса, который их строит
+            digest = self._cached_digest(path, stat)
+        if digest is not None:
+            self._stats["hits"] += 1
+            return self._preview(digest)
+
+        self._stats["misses"] += 1
+        if not self.building:
+            return None
+        try:
+            return await self._process(path, *stat)
+        except Exception as e:
+            print(f"Error building preview for '{path}': {e}")
+            return None
+
+    def _read_manifest_sync(self) -> Optional[Tuple[Tuple[int, float], Dict, Dict]]:
+        """
+        Читает список обработанных файлов с диска
+
+        Возвращает:
+            Optional[Tuple[Tuple[int, float], Dict, Dict]]: Размер и время модификации списка, файлы и превью
+                или None, если списка нет или он другой версии
+        """
+        stat = _stat_file_sync(self.manifest_path)
+        if stat is None:
+            return None
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading preview manifest: {e}")
+            return None
+
+        if data.get("format") != MANIFEST_FORMAT or data.get("max_size") != self.max_size:
+            return None
+
+        files = {path: (size, mtime, digest) for path, size, mtime, digest in data.get("files", [])}
+        previews = {digest: (pages, has_image) for digest, (pages, has_image) in data.get("previews", {}).items()}
+        return stat, files, previews
+
+    def load_sync(self) -> bool:
+        """
+        Загружает список обработанных файлов с диска и создает папку для превью
+
+        Возвращает:
+            bool: True, если список загружен
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        manifest = self._read_manifest_sync()
+        if manifest is None:
+            return False
+
+        self._manifest_stat, self._files, self._previews = manifest
+        return True
+
+    async def reload(self) -> bool:
+        """
+        Загружает список обработанных файлов заново, если другой процесс сохранил его после прошлой загрузки
+
+        Возвращает:
+            bool: True, если список загружен заново
+        """
+        stat = await asyncio.to_thread(_stat_file_sync, self.manifest_path)
+        if stat is None or stat == self._manifest_stat:
+            return False
+
+        # Список читается в отдельном потоке, а подменяется в цикле событий, чтобы не мешать запросам
+        manifest = await asyncio.to_thread(self._read_manifest_sync)
+        if manifest is None:
+            return False
+
+        self._manifest_stat, self._files, self._previews = manifest
+        return True
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "format": MANIFEST_FORMAT,
+            "max_size": self.max_size,
+            "files": [[path, size, mtime, digest] for path, (size, mtime, digest) in self._files.items()],
+            "previews": {digest: [pages, has_image] for digest, (pages, has_image) in self._previews.items()}
+        }
+
+    def _save_snapshot_sync(self, snapshot: Dict[str, Any], orphans: List[str]) -> None:
+        """
+        Записывает список на диск (через временный файл) и удаляет превью, которые больше не используются
+        """
+        # У каждого процесса свой временный файл
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, self.manifest_path)
+
+        for digest in orphans:
+            try:
+                os.remove(self._image_path(digest))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error removing preview '{digest}': {e}")
+
+    async def _save(self, collect_orphans: bool = False) -> None:
+        """
+        Сохраняет список обработанных файлов; после полного обновления удаляет неиспользуемые превью
+        """
+        orphans = []
+        if collect_orphans:
+            used = {digest for _, _, digest in self._files.values()}
+            orphans = [digest for digest in self._previews if digest not in used]
+            for digest in orphans:
+                del self._previews[digest]
+
+        self._built_since_save = 0
+        try:
+            await asyncio.to_thread(self._save_snapshot_sync, self._snapshot(), orphans)
+        except Exception as e:
+            print(f"Error saving preview manifest: {e}")
+
+    async def update(self) -> bool:
+        """
+        Строит превью для новых и изменившихся файлов дерева материалов
+
+        Возвращает:
+            bool: True, если список превью изменился
+        """
+        async with self._update_lock:
+            if (not self.enabled or not self.building or not self.materials.ready
+                    or self.synced_version == self.materials.version):
+                return False
+
+            version = self.materials.version
+            current = {}
+            for listing in self.materials.iter_listings():
+                for entry in listing.files:
+                    if is_previewable_file(entry.name):
+                        current[os.path.normpath(entry.path)] = entry
+
+            removed = [path for path in self._files if path not in current]
+            for path in removed:
+                del self._files[path]
+
+            changed = [
+                (path, entry) for path, entry in current.items()
+                if self._files.get(path, ())[:2] != (entry.size, entry.mtime)
+            ]
+
+            # В пул процессов передается не больше двух файлов на процесс, остальные ждут своей очереди
+            semaphore = asyncio.Semaphore(self.workers * 2)
+
+            async def process(path, entry):
+                async with semaphore:
+                    try:
+                        await self._process(path, entry.size, entry.mtime)
+                    except Exception as e:
+                        print(f"Error building preview for '{path}': {e}")
+                        return
+
+                    if self._built_since_save >= SAVE_EVERY:
+                        # Промежуточное сохранение: после перезапуска уже построенные превью не строятся заново
+                        await self._save()
+
+            await asyncio.gather(*(process(path, entry) for path, entry in changed))
+
+            self.synced_version = version
+            if not removed and not changed:
+                return False
+
+            await self._save(collect_orphans=True)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Получает статистику превью
+
+        Возвращает:
+            Dict[str, Any]: Количество файлов и превью, построения в работе, попадания, промахи и ошибки
+        """
+        return {
+            "files": len(self._files),
+            "previews": len(self._previews),
+            "pending": len(self._pending),
+            **self._stats,
+            "pdf_render": int(pypdfium2 is not None)
+        }
+
+    async def _run(self) -> None:
+        """
+        Строит превью по дереву материалов и затем периодически обрабатывает его изменения
+        (или только перечитывает список превью, если их строит другой процесс)
+        """
+        while True:
+            try:
+                if self.building:
+                    await self.update()
+                else:
+                    await self.reload()
+            except Exception as e:
+                print(f"Error updating previews: {e}")
+
+            if self.poll_interval <= 0:
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self, build: bool = True) -> None:
+        """
+        Загружает список готовых превью и запускает построение недостающих в фоне
+
+        Аргументы:
+            build (bool): Строить превью в этом процессе. При нескольких процессах вебхука превью строит один процесс
+                (пул процессов и удаление неиспользуемых превью не дублируются), остальные перечитывают его список
+        """
+        if not self.enabled:
+            return
+
+        self.building = build
+        await asyncio.to_thread(self.load_sync)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновое построение превью и пул процессов
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Общий кэш превью приложения
+preview_cache = PreviewCache()
@@ -0,0 +1,591 @@
+import os
+import json
+import math
+import time
+import asyncio
+import bisect
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (
+    MATERIALS_POLL_INTERVAL,
+    SEARCH_INDEX_PATH,
+    SEARCH_RESULTS_LIMIT,
+    SEARCH_MAX_TEXT_CHARS,
+    SEARCH_PDF_MAX_PAGES
+)
+from services.materials_index import MaterialsIndex, MaterialEntry, materials_index
+from utils.stemmer import STEMMER_VERSION, stem, tokenize
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    # Без pypdf ищем только по именам файлов и папок
+    PdfReader = None
+
+# Версия формата файла индекса
+INDEX_FORMAT = 1
+
+# Веса слов: из имени элемента, из имен родительских папок и из текста документа
+NAME_WEIGHT = 5.0
+FOLDER_WEIGHT = 1.0
+CONTENT_WEIGHT = 0.2
+
+# Вес совпадения по началу основы (например, "анат" -> "анатомическ") относительно точного совпадения
+PREFIX_MATCH_FACTOR = 0.7
+# Максимум основ, подходящих по началу, для одного слова запроса
+MAX_PREFIX_EXPANSIONS = 100
+
+# Минимальная доля триграмм запроса, которые должны встретиться в имени при нечетком поиске
+FUZZY_MIN_SIMILARITY = 0.5
+
+# Расширения текстовых файлов, содержимое которых читается целиком
+TEXT_EXTENSIONS = (".txt", ".md")
+
+@dataclass
+class SearchResult:
+    """
+    Найденный элемент дерева материалов
+
+    Атрибуты:
+        path (str): Путь к папке или файлу
+        name (str): Имя папки или файла
+        is_dir (bool): True, если это папка
+        score (float): Релевантность
+        size (int): Размер файла в байтах на момент индексации (0 для папок)
+        mtime (float): Время модификации файла на момент индексации
+    """
+    path: str
+    name: str
+    is_dir: bool
+    score: float
+    size: int = 0
+    mtime: float = 0.0
+
+class _Document:
+    """
+    Проиндексированный элемент: параметры файла на момент индексации и веса его слов
+    """
+    __slots__ = ("path", "is_dir", "size", "mtime", "terms")
+
+    def __init__(self, path: str, is_dir: bool, size: int, mtime: float, terms: Dict[str, float]):
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime = mtime
+        self.terms = terms
+
+def _extract_text(path: str, max_chars: int = SEARCH_MAX_TEXT_CHARS, max_pages: int = SEARCH_PDF_MAX_PAGES) -> str:
+    """
+    Извлекает текст документа для индексации
+
+    Аргументы:
+        path (str): Путь к файлу
+        max_chars (int): Максимум извлекаемых символов
+        max_pages (int): Максимум страниц PDF
+
+    Возвращает:
+        str: Текст документа (пустая строка, если формат не поддерживается или файл не читается)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension in TEXT_EXTENSIONS:
+            with open(path, "r", encoding="utf-8", errors="ignore") as file:
+                return file.read(max_chars)
+
+        if extension == ".pdf" and PdfReader is not None:
+            reader = PdfReader(path)
+            parts = []
+            length = 0
+            for page in reader.pages[:max_pages]:
+                text = page.extract_text() or ""
+                parts.append(text)
+                length += len(text)
+                if length >= max_chars:
+                    break
+            return "\n".join(parts)[:max_chars]
+    except Exception as e:
+        print(f"Error extracting text from '{path}': {e}")
+
+    return ""
+
+def _display_name(path: str, is_dir: bool) -> str:
+    """
+    Имя элемента для поиска: имя папки или имя файла без расширения
+    """
+    name = os.path.basename(path)
+    return name if is_dir else os.path.splitext(name)[0]
+
+def _name_trigrams(text: str) -> Set[str]:
+    """
+    Разбивает слова текста на триграммы (с границами слов, чтобы начало и конец слова весили больше)
+    """
+    trigrams = set()
+    for token in tokenize(text):
+        padded = f" {token} "
+        trigrams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return trigrams
+
+def _add_terms(terms: Dict[str, float], text: str, weight: float) -> None:
+    """
+    Добавляет слова текста к весам документа
+    """
+    for token in tokenize(text):
+        term = stem(token)
+        terms[term] = terms.get(term, 0.0) + weight
+
+class SearchIndex:
+    """
+    Инвертированный индекс для поиска по материалам.
+    Индексирует имена файлов и папок (с учетом имен родительских папок) и текст документов,
+    слова приводятся к основе для русского и английского языков.
+    Для имен дополнительно строится триграммный индекс, по которому ищутся имена с опечатками.
+    Индекс сохраняется на диск и при изменении дерева материалов обновляется частично:
+    заново обрабатываются только новые и изменившиеся файлы.
+    При нескольких процессах вебхука индекс обновляет только первый процесс, остальные перечитывают его с диска.
+    """
+
+    def __init__(
+            self,
+            index_path: str = str(SEARCH_INDEX_PATH),
+            materials: MaterialsIndex = materials_index,
+            poll_interval: float = MATERIALS_POLL_INTERVAL
+    ):
+        """
+        Аргументы:
+            index_path (str): Путь к файлу индекса
+            materials (MaterialsIndex): Индекс дерева материалов
+            poll_interval (float): Интервал проверки изменений дерева материалов в секундах
+        """
+        self.index_path = index_path
+        self.materials = materials
+        self.poll_interval = poll_interval
+        # Версия увеличивается при каждом изменении индекса
+        self.version = 0
+        # Версия дерева материалов, с которой индекс синхронизирован
+        self.synced_version: Optional[int] = None
+
+        self._documents: Dict[str, _Document] = {}
+        # Основа слова -> путь -> вес
+        self._postings: Dict[str, Dict[str, float]] = {}
+        # Триграмма имени -> пути элементов, в имени которых она встречается
+        self._trigrams: Dict[str, Set[str]] = {}
+        # Отсортированные основы для поиска по началу слова (строятся при первом запросе после изменений)
+        self._sorted_terms: Optional[List[str]] = None
+        self._update_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Обновляет ли этот процесс индекс (иначе только читает индекс, сохраненный другим процессом)
+        self.building = True
+        # Время модификации загруженного файла индекса
+        self._loaded_mtime: Optional[float] = None
+
+        self.queries = 0
+        self.query_time_total = 0.0
+
+    @property
+    def root(self) -> str:
+        return os.path.normpath(self.materials.root)
+
+    def _add(self, document: _Document) -> None:
+        self._documents[document.path] = document
+        for term, weight in document.terms.items():
+            self._postings.setdefault(term, {})[document.path] = weight
+        for trigram in _name_trigrams(_display_name(document.path, document.is_dir)):
+            self._trigrams.setdefault(trigram, set()).add(document.path)
+
+    def _remove(self, path: str) -> None:
+        document = self._documents.pop(path, None)
+        if document is None:
+            return
+
+        for term in document.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(path, None)
+            if not postings:
+                del self._postings[term]
+
+        for trigram in _name_trigrams(_display_name(path, document.is_dir)):
+            paths = self._trigrams.get(trigram)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if not paths:
+                del self._trigrams[trigram]
+
+    def _document_terms(self, entry: MaterialEntry) -> Dict[str, float]:
+        """
+        Вычисляет веса слов элемента дерева (выполняется в отдельном потоке, так как читает файл)
+        """
+        terms: Dict[str, float] = {}
+
+        _add_terms(terms, _display_name(entry.path, entry.is_dir), NAME_WEIGHT)
+
+        relative = os.path.relpath(os.path.dirname(entry.path), self.root)
+        if relative != os.curdir:
+            _add_terms(terms, relative.replace(os.sep, " "), FOLDER_WEIGHT)
+
+        if not entry.is_dir:
+            content: Dict[str, float] = {}
+            _add_terms(content, _extract_text(entry.path), 1.0)
+            for term, count in content.items():
+                # Частые слова документа важнее, но не пропорционально количеству повторов
+                terms[term] = terms.get(term, 0.0) + CONTENT_WEIGHT * (1 + math.log(count))
+
+        return {term: round(weight, 3) for term, weight in terms.items()}
+
+    def _collect_changes(self) -> Tuple[int, List[str], List[_Document]]:
+        """
+        Сравнивает индекс с деревом материалов и готовит документы для новых и изменившихся элементов
+
+        Возвращает:
+            Tuple[int, List[str], List[_Document]]: Версия дерева, удаленные пути и новые документы
+        """
+        version = self.materials.version
+        current: Dict[str, MaterialEntry] = {}
+        for listing in self.materials.iter_listings():
+            for entry in listing.directories + listing.files:
+                current[os.path.normpath(entry.path)] = entry
+
+        documents = dict(self._documents)
+        removed = [path for path in documents if path not in current]
+
+        changed = []
+        for path, entry in current.items():
+            document = documents.get(path)
+            if document is not None and document.size == entry.size and document.mtime == entry.mtime:
+                continue
+            changed.append(_Document(path, entry.is_dir, entry.size, entry.mtime, self._document_terms(entry)))
+
+        return version, removed, changed
+
+    def _apply(self, version: int, removed: Iterable[str], changed: Iterable[_Document]) -> bool:
+        """
+        Применяет изменения к индексу (в потоке цикла событий, чтобы не мешать запросам)
+
+        Возвращает:
+            bool: True, если индекс изменился
+        """
+        modified = False
+        for path in removed:
+            self._remove(path)
+            modified = True
+        for document in changed:
+            self._remove(document.path)
+            self._add(document)
+            modified = True
+
+        self.synced_version = version
+        if modified:
+            self._sorted_terms = None
+            self.version += 1
+        return modified
+
+    def _index_mtime_sync(self) -> Optional[float]:
+        try:
+            return os.stat(self.index_path).st_mtime
+        except OSError:
+            return None
+
+    def _read_sync(self) -> Optional[Tuple[float, "SearchIndex"]]:
+        """
+        Читает индекс с диска в новый экземпляр. Индекс другой версии формата, стемминга или корневой папки не читается
+
+        Возвращает:
+            Optional[Tuple[float, SearchIndex]]: Время модификации файла и прочитанный индекс
+                или None, если индекс не прочитан
+        """
+        index_mtime = self._index_mtime_sync()
+        if index_mtime is None:
+            return None
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error loading search index: {e}")
+            return None
+
+        if (data.get("format") != INDEX_FORMAT or data.get("stemmer") != STEMMER_VERSION
+                or data.get("root") != self.root):
+            return None
+
+        loaded = SearchIndex(self.index_path, self.materials, self.poll_interval)
+        for path, is_dir, size, mtime, terms in data.get("documents", []):
+            loaded._add(_Document(path, is_dir, size, mtime, terms))
+        return index_mtime, loaded
+
+    def _take(self, mtime: float, loaded: "SearchIndex") -> None:
+        """
+        Подменяет содержимое индекса прочитанным с диска
+        """
+        self._documents = loaded._documents
+        self._postings = loaded._postings
+        self._trigrams = loaded._trigrams
+        self._loaded_mtime = mtime
+        self._sorted_terms = None
+        self.version += 1
+
+    def load_sync(self) -> bool:
+        """
+        Загружает индекс с диска. Индекс другой версии формата, стемминга или корневой папки не загружается
+
+        Возвращает:
+            bool: True, если индекс загружен
+        """
+        result = self._read_sync()
+        if result is None:
+            return False
+
+        self._take(*result)
+        return True
+
+    async def reload(self) -> bool:
+        """
+        Загружает индекс заново, если другой процесс сохранил его после прошлой загрузки
+
+        Возвращает:
+            bool: True, если индекс загружен заново
+        """
+        mtime = await asyncio.to_thread(self._index_mtime_sync)
+        if mtime is None or mtime == self._loaded_mtime:
+            return False
+
+        # Индекс читается в отдельном потоке, а подменяется в цикле событий, чтобы не мешать запросам
+        result = await asyncio.to_thread(self._read_sync)
+        if result is None:
+            return False
+
+        self._take(*result)
+        return True
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "format": INDEX_FORMAT,
+            "stemmer": STEMMER_VERSION,
+            "root": self.root,
+            "documents": [
+                [document.path, document.is_dir, document.size, document.mtime, document.terms]
+                for document in self._documents.values()
+            ]
+        }
+
+    def _save_snapshot_sync(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Записывает индекс на диск (через временный файл, чтобы не оставить поврежденный индекс)
+        """
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # У каждого процесса свой временный файл
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, self.index_path)
+
+    async def update(self) -> bool:
+        """
+        Синхронизирует индекс с деревом материалов и сохраняет его, если он изменился
+
+        Возвращает:
+            bool: True, если индекс изменился
+        """
+        async with self._update_lock:
+            if not self.building or not self.materials.ready or self.synced_version == self.materials.version:
+                return False
+
+            version, removed, changed = await asyncio.to_thread(self._collect_changes)
+            if not self._apply(version, removed, changed):
+                return False
+
+            try:
+                await asyncio.to_thread(self._save_snapshot_sync, self._snapshot())
+            except Exception as e:
+                print(f"Error saving search index: {e}")
+            return True
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """
+        Находит основы, подходящие под слово запроса: точное совпадение основы
+        и основы, которые начинаются с нее (для незаконченных слов)
+
+        Возвращает:
+            Dict[str, float]: Основа -> множитель веса
+        """
+        term = stem(token)
+        expansions = {term: 1.0} if term in self._postings else {}
+
+        if len(term) >= 3 and not term.isdigit():
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+
+            start = bisect.bisect_left(self._sorted_terms, term)
+            for other in self._sorted_terms[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not other.startswith(term):
+                    break
+                expansions.setdefault(other, PREFIX_MATCH_FACTOR)
+
+        return expansions
+
+    def _term_scores(self, tokens: List[str]) -> Dict[str, float]:
+        """
+        Находит элементы, содержащие все слова запроса, и суммирует веса слов
+        """
+        scores: Optional[Dict[str, float]] = None
+        for token in tokens:
+            token_scores: Dict[str, float] = {}
+            for term, factor in self._expand(token).items():
+                for path, weight in self._postings[term].items():
+                    score = weight * factor
+                    if score > token_scores.get(path, 0.0):
+                        token_scores[path] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {path: score + token_scores[path] for path, score in scores.items() if path in token_scores}
+
+            if not scores:
+                return {}
+
+        return scores or {}
+
+    def _fuzzy_scores(self, query: str) -> Dict[str, float]:
+        """
+        Нечеткий поиск по именам через триграммы: находит имена с опечатками
+        и имена, в которых слово запроса является частью другого слова
+        """
+        query_trigrams = _name_trigrams(query)
+        if not query_trigrams:
+            return {}
+
+        counts: Dict[str, int] = {}
+        for trigram in query_trigrams:
+            for path in self._trigrams.get(trigram, ()):
+                counts[path] = counts.get(path, 0) + 1
+
+        scores = {}
+        for path, count in counts.items():
+            similarity = count / len(query_trigrams)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scores[path] = NAME_WEIGHT * similarity
+        return scores
+
+    def search(
+            self,
+            query: str,
+            root: Optional[str] = None,
+            limit: int = SEARCH_RESULTS_LIMIT,
+            fuzzy: bool = True
+    ) -> List[SearchResult]:
+        """
+        Ищет файлы и папки, содержащие все слова запроса.
+        Если таких нет, ищет похожие имена (по совпадающим триграммам)
+
+        Аргументы:
+            query (str): Текст запроса
+            root (Optional[str]): Искать только внутри этой папки (например, папки факультета)
+            limit (int): Максимум результатов
+            fuzzy (bool): Использовать нечеткий поиск, если точных совпадений нет
+
+        Возвращает:
+            List[SearchResult]: Результаты в порядке убывания релевантности
+        """
+        started = time.perf_counter()
+        try:
+            tokens = list(dict.fromkeys(tokenize(query)))
+            if not tokens:
+                return []
+
+            prefix = os.path.normpath(root) + os.sep if root is not None else None
+
+            def within_root(scores: Dict[str, float]) -> Dict[str, float]:
+                if prefix is None:
+                    return scores
+                return {path: score for path, score in scores.items() if path.startswith(prefix)}
+
+            scores = within_root(self._term_scores(tokens))
+            if not scores and fuzzy:
+                scores = within_root(self._fuzzy_scores(query))
+
+            # При равной релевантности выше элементы с более коротким путем (ближе к началу дерева)
+            best = sorted(scores.items(), key=lambda item: (-item[1], len(item[0]), item[0]))[:limit]
+            results = []
+            for path, score in best:
+                document = self._documents[path]
+                results.append(SearchResult(
+                    path, os.path.basename(path), document.is_dir, score, document.size, document.mtime
+                ))
+            return results
+        finally:
+            self.queries += 1
+            self.query_time_total += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Получает статистику поискового индекса
+
+        Возвращает:
+            Dict[str, Any]: Количество документов и основ, версия индекса, количество и среднее время запросов
+        """
+        return {
+            "documents": len(self._documents),
+            "terms": len(self._postings),
+            "trigrams": len(self._trigrams),
+            "version": self.version,
+            "pdf_text": int(PdfReader is not None),
+            "queries": self.queries,
+            "query_time_avg": self.query_time_total / self.queries if self.queries else 0.0
+        }
+
+    async def _run(self) -> None:
+        """
+        Обновляет индекс по дереву материалов и затем периодически применяет его изменения
+        (или только перечитывает индекс, если его обновляет другой процесс)
+        """
+        while True:
+            try:
+                if self.building:
+                    await self.update()
+                else:
+                    await self.reload()
+            except Exception as e:
+                print(f"Error updating search index: {e}")
+
+            if self.poll_interval <= 0:
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self, build: bool = True) -> None:
+        """
+        Загружает сохраненный индекс и запускает его обновление в фоне
+        (первое обновление после запуска может извлекать текст из многих документов)
+
+        Аргументы:
+            build (bool): Обновлять индекс в этом процессе. При нескольких процессах вебхука индекс обновляет
+                один процесс, остальные перечитывают сохраненный им файл
+        """
+        self.building = build
+        await asyncio.to_thread(self.load_sync)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновое обновление индекса
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Общий поисковый индекс приложения
+search_index = SearchIndex()
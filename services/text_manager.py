@@ -1,47 +1,160 @@
 import json
 import os
-from typing import Dict, Any, Optional
+import asyncio
+from string import Formatter
+from typing import Dict, Any, Optional, List, FrozenSet
 
-from config import TEXTS_DIR
+from config import TEXTS_DIR, TEXTS_RELOAD_INTERVAL
 
-# Кэш для хранения загруженных файлов переводов
-_translations_cache = {}
+# Язык, на который выполняется откат, если перевод не найден
+FALLBACK_LANGUAGE = 'en'
 
-def _load_language_file(language: str) -> Dict[str, Any]:
+class TranslationCatalog:
+    """
+    Скомпилированный каталог переводов.
+    Для каждого языка заранее объединяет переводы с запасным языком,
+    находит отсутствующие ключи и шаблоны, которым нужно форматирование
     """
-    Загружает файл с переводами для указанного языка
-
-    Аргументы:
-        language (str): Код языка (ru, en, ar)
 
-    Возвращает:
-        Dict[str, Any]: Словарь с переводами
+    def __init__(self, raw: Dict[str, Dict[str, Any]], mtimes: Dict[str, float], version: int):
+        """
+        Аргументы:
+            raw (Dict[str, Dict[str, Any]]): Исходные переводы по языкам
+            mtimes (Dict[str, float]): Время модификации файлов переводов
+            version (int): Номер версии каталога
+        """
+        self.raw = raw
+        self.mtimes = mtimes
+        self.version = version
+
+        fallback = raw.get(FALLBACK_LANGUAGE, {})
+
+        # Переводы по языкам с уже подставленными значениями запасного языка
+        self.texts: Dict[str, Dict[str, Any]] = {}
+        # Отсутствующие в языке ключи, которые есть в запасном языке
+        self.missing: Dict[str, List[str]] = {}
+
+        for language, translations in raw.items():
+            merged = dict(fallback)
+            merged.update(translations)
+            self.texts[language] = merged
+            self.missing[language] = sorted(key for key in fallback if key not in translations)
+
+        # Ключи, тексты которых являются шаблонами для форматирования
+        self.templates: Dict[str, FrozenSet[str]] = {
+            language: frozenset(key for key, text in texts.items() if _is_template(key, text))
+            for language, texts in self.texts.items()
+        }
+
+    def get_texts(self, language: str) -> Dict[str, Any]:
+        """
+        Получает переводы языка с учетом отката на запасной язык
+        """
+        texts = self.texts.get(language)
+        if texts is None:
+            texts = self.texts.get(FALLBACK_LANGUAGE, {})
+        return texts
+
+def _is_template(key: str, text: Any) -> bool:
+    """
+    Разбирает шаблон и проверяет, нужно ли его форматировать
     """
-    # Если переводы уже загружены в кэш, возвращаем их
-    if language in _translations_cache:
-        return _translations_cache[language]
+    if not isinstance(text, str) or ('{' not in text and '}' not in text):
+        return False
 
     try:
-        # Формируем путь к файлу с переводами
-        file_path = os.path.join(TEXTS_DIR, f"{language}.json")
+        list(Formatter().parse(text))
+    except ValueError as e:
+        print(f"Invalid format template '{key}': {e}")
 
-        # Проверяем существование файла
-        if not os.path.exists(file_path):
-            print(f"Translation file for language '{language}' not found: {file_path}")
-            return {}
+    return True
 
+# Текущий каталог переводов; заменяется целиком при перезагрузке
+_catalog: Optional[TranslationCatalog] = None
+_catalog_version = 0
+
+def _texts_files() -> Dict[str, str]:
+    """
+    Находит файлы переводов: код языка -> путь к файлу
+    """
+    files = {}
+    try:
+        for item in os.listdir(TEXTS_DIR):
+            if item.endswith('.json'):
+                files[item[:-len('.json')]] = os.path.join(TEXTS_DIR, item)
+    except OSError as e:
+        print(f"Error listing translation files: {e}")
+    return files
+
+def _load_language_file(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Загружает файл с переводами
+
+    Аргументы:
+        file_path (str): Путь к файлу с переводами
+
+    Возвращает:
+        Optional[Dict[str, Any]]: Словарь с переводами или None, если файл не удалось прочитать
+    """
+    try:
         # Загружаем и разбираем JSON
         with open(file_path, 'r', encoding='utf-8') as file:
-            translations = json.load(file)
+            return json.load(file)
+    except Exception as e:
+        print(f"Error loading translations from '{file_path}': {e}")
+        return None
+
+def _texts_mtimes() -> Dict[str, float]:
+    """
+    Получает время модификации файлов переводов
+    """
+    mtimes = {}
+    for file_path in _texts_files().values():
+        try:
+            mtimes[file_path] = os.path.getmtime(file_path)
+        except OSError:
+            continue
+    return mtimes
 
-        # Сохраняем переводы в кэш
-        _translations_cache[language] = translations
+def reload_texts() -> TranslationCatalog:
+    """
+    Заново собирает каталог переводов из файлов и атомарно заменяет текущий
 
-        return translations
+    Возвращает:
+        TranslationCatalog: Новый каталог переводов
+    """
+    global _catalog, _catalog_version
 
-    except Exception as e:
-        print(f"Error loading translations for '{language}': {e}")
-        return {}
+    mtimes = _texts_mtimes()
+    raw = {}
+    for language, file_path in _texts_files().items():
+        translations = _load_language_file(file_path)
+        if translations is None:
+            # Файл поврежден (например, сохранен не до конца): оставляем предыдущую версию
+            translations = _catalog.raw.get(language, {}) if _catalog is not None else {}
+        raw[language] = translations
+
+    _catalog_version += 1
+    catalog = TranslationCatalog(raw, mtimes, _catalog_version)
+
+    for language, missing in catalog.missing.items():
+        if missing:
+            print(f"Translation '{language}' is missing {len(missing)} keys: {', '.join(missing)}")
+
+    _catalog = catalog
+    return catalog
+
+def get_catalog() -> TranslationCatalog:
+    """
+    Получает текущий каталог переводов, собирая его при первом обращении
+
+    Возвращает:
+        TranslationCatalog: Каталог переводов
+    """
+    catalog = _catalog
+    if catalog is None:
+        catalog = reload_texts()
+    return catalog
 
 def get_text(language: str, key: str, default: Optional[str] = None, **kwargs) -> str:
     """
@@ -56,24 +169,17 @@ def get_text(language: str, key: str, default: Optional[str] = None, **kwargs) -
     Возвращает:
         str: Переведенный текст
     """
-    # Загружаем переводы для указанного языка
-    translations = _load_language_file(language)
-
-    # Получаем текст по ключу
-    text = translations.get(key)
+    catalog = get_catalog()
 
-    # Если текст не найден и указан язык отличный от английского,
-    # пробуем получить текст на английском
-    if text is None and language != 'en':
-        en_translations = _load_language_file('en')
-        text = en_translations.get(key)
+    # Откат на английский уже учтен при сборке каталога
+    text = catalog.get_texts(language).get(key)
 
-    # Если текст всё еще не найден, используем значение по умолчанию или ключ
+    # Если текст не найден, используем значение по умолчанию или ключ
     if text is None:
-        text = default if default is not None else key
+        return default if default is not None else key
 
-    # Форматируем текст, если указаны аргументы для форматирования
-    if kwargs:
+    # Форматируем текст, только если это шаблон
+    if kwargs and key in catalog.templates.get(language, catalog.templates.get(FALLBACK_LANGUAGE, ())):
         try:
             text = text.format(**kwargs)
         except KeyError as e:
@@ -93,4 +199,50 @@ def get_all_texts(language: str) -> Dict[str, str]:
     Возвращает:
         Dict[str, str]: Словарь со всеми переводами
     """
-    return _load_language_file(language)
+    return get_catalog().raw.get(language, {})
+
+def get_languages() -> List[str]:
+    """
+    Получает список языков, для которых есть переводы
+
+    Возвращает:
+        List[str]: Коды языков
+    """
+    return sorted(get_catalog().raw)
+
+def get_texts_version() -> int:
+    """
+    Получает версию каталога переводов (увеличивается при каждой перезагрузке)
+
+    Возвращает:
+        int: Версия каталога
+    """
+    return get_catalog().version
+
+def check_texts_changed() -> bool:
+    """
+    Проверяет изменения файлов переводов и перезагружает каталог, если они изменились
+
+    Возвращает:
+        bool: True, если каталог был перезагружен
+    """
+    if _texts_mtimes() == get_catalog().mtimes:
+        return False
+
+    reload_texts()
+    return True
+
+async def watch_texts(interval: float = TEXTS_RELOAD_INTERVAL) -> None:
+    """
+    Периодически проверяет файлы переводов и перезагружает их без перезапуска бота
+
+    Аргументы:
+        interval (float): Интервал проверки в секундах
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(check_texts_changed):
+                print("Translations reloaded")
+        except Exception as e:
+            print(f"Error reloading translations: {e}")
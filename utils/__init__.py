@@ -4,6 +4,7 @@ from utils.helpers import (
     parse_callback_data,
     get_file_extension,
     is_image_file,
+    is_previewable_file,
     split_long_message
 )
 from utils.message_utils import send_message_with_image
@@ -20,6 +21,7 @@ __all__ = [
     'parse_callback_data',
     'get_file_extension',
     'is_image_file',
+    'is_previewable_file',
     'split_long_message',
     'add_emoji_to_text',
     'get_emoji_for_key',
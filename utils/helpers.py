@@ -1,6 +1,15 @@
 import os
+import re
+import unicodedata
 from typing import Optional, List, Tuple
 
+# Числа в именах для естественной сортировки ("Лекция 2.9" раньше "Лекция 2.10")
+_NUMBER_SPLIT_RE = re.compile(r"(\d+)")
+# Огласовки и удлинитель (татвиль) арабского письма не влияют на порядок
+_ARABIC_MARKS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+# Варианты написания арабских букв, которые при сортировке считаются одной буквой
+_ARABIC_LETTERS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ى": "ي", "ة": "ه"})
+
 def get_parent_path(path: str) -> Optional[str]:
     """
     Получает родительский путь для заданного пути
@@ -76,6 +85,18 @@ def is_image_file(filename: str) -> bool:
     image_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'webp']
     return get_file_extension(filename) in image_extensions
 
+def is_previewable_file(filename: str) -> bool:
+    """
+    Проверяет, можно ли построить превью файла (PDF или изображение)
+
+    Аргументы:
+        filename (str): Имя файла
+
+    Возвращает:
+        bool: True, если для файла строится превью
+    """
+    return get_file_extension(filename) == 'pdf' or is_image_file(filename)
+
 def split_long_message(text: str, max_length: int = 4096) -> List[str]:
     """
     Разбивает длинное сообщение на части, если оно превышает ограничение Telegram
@@ -95,3 +116,43 @@ def split_long_message(text: str, max_length: int = 4096) -> List[str]:
         parts.append(text[i:i + max_length])
 
     return parts
+
+def _fold_for_sort(text: str) -> str:
+    """
+    Приводит текст к виду для сравнения: без учета регистра, "ё" как "е",
+    арабские буквы без огласовок и с едиными формами алифа
+    """
+    if text.isascii():
+        return text.lower()
+
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    return _ARABIC_MARKS_RE.sub("", text).translate(_ARABIC_LETTERS)
+
+def natural_sort_key(text: str) -> Tuple:
+    """
+    Ключ естественной сортировки имен папок и файлов.
+    Сначала идут имена без чисел, затем имена с числами по первому числу (как и раньше),
+    а при равном первом числе имена сравниваются по частям: числа - как числа, текст - без учета регистра.
+
+    Аргументы:
+        text (str): Текст для сортировки
+
+    Возвращает:
+        Tuple: Кортеж (есть_ли_число, первое_число, части_имени, исходный_текст)
+    """
+    folded = _fold_for_sort(text)
+
+    chunks = []
+    first_number = None
+    for index, part in enumerate(_NUMBER_SPLIT_RE.split(folded)):
+        if index % 2:
+            number = int(part)
+            if first_number is None:
+                first_number = number
+            # Числа идут раньше текста на той же позиции
+            chunks.append((0, number, ""))
+        elif part:
+            chunks.append((1, 0, part))
+
+    # Исходный текст в конце делает порядок однозначным (например, для "Ёж" и "еж" или "02" и "2")
+    return (first_number is not None, first_number or 0, tuple(chunks), text)
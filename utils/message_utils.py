@@ -1,7 +1,11 @@
-from aiogram.types import Message, FSInputFile
+from aiogram.types import Message
 import os
 from typing import Optional, Union
-from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup, InputMediaPhoto
+
+from services.file_id_cache import send_cached_file, get_file_id, extract_file_id
+from services.image_variants import resolve_image
 
 async def send_message_with_image(
         message: Message,
@@ -10,7 +14,9 @@ async def send_message_with_image(
         reply_markup: Optional[Union[InlineKeyboardMarkup, ReplyKeyboardMarkup]] = None
 ) -> Message:
     """
-    Отправляет сообщение с изображением
+    Отправляет сообщение с изображением.
+    Вместо исходника отправляется его оптимизированный вариант, если он собран.
+    Изображение загружается в Telegram только один раз, дальше используется его file_id.
 
     Аргументы:
         message (Message): Объект сообщения для ответа
@@ -26,12 +32,100 @@ async def send_message_with_image(
         # Если изображение не найдено, отправляем только текст
         return await message.answer(text=text, reply_markup=reply_markup)
 
-    # Создаем объект FSInputFile для изображения
-    photo = FSInputFile(image_path)
+    image_path = resolve_image(image_path)
+
+    async def send(photo):
+        return await message.answer_photo(
+            photo=photo,
+            caption=text,
+            reply_markup=reply_markup
+        )
 
     # Отправляем сообщение с изображением
-    return await message.answer_photo(
-        photo=photo,
-        caption=text,
-        reply_markup=reply_markup
-    )
+    return await send_cached_file(image_path, send)
+
+async def _edit_screen(
+        message: Message,
+        text: str,
+        image_path: Optional[str],
+        reply_markup: Optional[InlineKeyboardMarkup]
+) -> Optional[Union[Message, bool]]:
+    """
+    Редактирует сообщение под новый экран
+
+    Возвращает:
+        Optional[Union[Message, bool]]: Результат редактирования или None,
+        если сообщение такого типа нельзя превратить в нужный экран
+    """
+    current_file_id = extract_file_id(message)
+
+    if image_path is None:
+        # Сообщение с медиа нельзя превратить в текстовое
+        if current_file_id is not None or message.text is None:
+            return None
+        return await message.edit_text(text=text, reply_markup=reply_markup)
+
+    # Текстовое сообщение нельзя превратить в сообщение с медиа
+    if current_file_id is None:
+        return None
+
+    # Изображение то же самое: достаточно обновить подпись
+    if message.photo and current_file_id == await get_file_id(image_path):
+        return await message.edit_caption(caption=text, reply_markup=reply_markup)
+
+    async def edit(photo):
+        return await message.edit_media(
+            media=InputMediaPhoto(media=photo, caption=text),
+            reply_markup=reply_markup
+        )
+
+    # Заменяем изображение (по file_id, если оно уже загружалось)
+    return await send_cached_file(image_path, edit)
+
+async def show_screen(
+        message: Message,
+        text: str,
+        image_path: Optional[str] = None,
+        reply_markup: Optional[Union[InlineKeyboardMarkup, ReplyKeyboardMarkup]] = None
+) -> Message:
+    """
+    Показывает новый экран на месте сообщения бота.
+    В зависимости от текущего и нужного вида сообщения использует edit_text, edit_caption
+    или edit_media и только если отредактировать нельзя, удаляет сообщение и отправляет новое
+
+    Аргументы:
+        message (Message): Сообщение бота, на месте которого показывается экран
+        text (str): Текст экрана
+        image_path (Optional[str]): Путь к изображению (None - экран без изображения)
+        reply_markup (Optional[Union[InlineKeyboardMarkup, ReplyKeyboardMarkup]]): Клавиатура
+
+    Возвращает:
+        Message: Сообщение с новым экраном
+    """
+    if image_path is not None and not os.path.exists(image_path):
+        # Если изображение не найдено, показываем только текст
+        image_path = None
+    elif image_path is not None:
+        # Оптимизированный вариант изображения (file_id запоминается для него)
+        image_path = resolve_image(image_path)
+
+    # Обычную клавиатуру нельзя прикрепить при редактировании
+    if reply_markup is None or isinstance(reply_markup, InlineKeyboardMarkup):
+        try:
+            edited = await _edit_screen(message, text, image_path, reply_markup)
+            if edited is not None:
+                return edited if isinstance(edited, Message) else message
+        except TelegramBadRequest as e:
+            if "message is not modified" in str(e):
+                return message
+            print(f"Error editing message: {e}")
+
+    try:
+        await message.delete()
+    except TelegramBadRequest as e:
+        print(f"Error deleting message: {e}")
+
+    if image_path is not None:
+        return await send_message_with_image(message, text, image_path, reply_markup)
+
+    return await message.answer(text=text, reply_markup=reply_markup)
@@ -0,0 +1,188 @@
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+# Версия правил стемминга: при ее изменении сохраненный поисковый индекс строится заново
+STEMMER_VERSION = 1
+
+# Слова: последовательности букв или цифр (буквы и цифры разделяются: "3семестр" -> "3", "семестр")
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+")
+_CYRILLIC_RE = re.compile(r"[а-я]")
+
+_RU_VOWELS = "аеиоуыэюя"
+
+# Окончания для алгоритма Snowball (Портера) для русского языка.
+# Окончания из первой группы удаляются, только если перед ними стоит "а" или "я"
+_RU_PERFECTIVE_GERUND = (("в", "вши", "вшись"), ("ив", "ивши", "ившись", "ыв", "ывши", "ывшись"))
+_RU_ADJECTIVE = (
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом",
+    "его", "ого", "ему", "ому", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею"
+)
+_RU_PARTICIPLE = (("ем", "нн", "вш", "ющ", "щ"), ("ивш", "ывш", "ующ"))
+_RU_REFLEXIVE = ("ся", "сь")
+_RU_VERB = (
+    ("ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет", "ют", "ны", "ть", "ешь", "нно"),
+    (
+        "ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй", "ил", "ыл", "им", "ым", "ен",
+        "ило", "ыло", "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю"
+    )
+)
+_RU_NOUN = (
+    "а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и", "ией", "ей", "ой", "ий", "й",
+    "иям", "ям", "ием", "ем", "ам", "ом", "о", "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью", "ю", "ия", "ья", "я"
+)
+_RU_SUPERLATIVE = ("ейше", "ейш")
+_RU_DERIVATIONAL = ("ост", "ость")
+
+# Окончания английских слов, которые отбрасывает упрощенный стеммер
+_EN_SUFFIXES = ("ations", "ation", "ingly", "ings", "ing", "edly", "ed", "ies", "es", "ly", "s")
+
+def _longest_ending(word: str, endings: Tuple[str, ...]) -> str:
+    """
+    Находит самое длинное окончание слова из списка
+    """
+    best = ""
+    for ending in endings:
+        if len(ending) > len(best) and word.endswith(ending):
+            best = ending
+    return best
+
+def _remove_grouped(word: str, groups: Tuple[Tuple[str, ...], Tuple[str, ...]]) -> str:
+    """
+    Удаляет окончание из двух групп Snowball. Возвращает слово без изменений, если окончание не найдено
+    """
+    first, second = groups
+    ending = _longest_ending(word, first + second)
+    if not ending:
+        return word
+    if ending in second or word[:-len(ending)].endswith(("а", "я")):
+        return word[:-len(ending)]
+    return word
+
+def _ru_regions(word: str) -> Tuple[int, int]:
+    """
+    Находит начало областей RV и R2 слова
+    """
+    rv = len(word)
+    for index, char in enumerate(word):
+        if char in _RU_VOWELS:
+            rv = index + 1
+            break
+
+    def next_region(start: int) -> int:
+        for index in range(start + 1, len(word)):
+            if word[index] not in _RU_VOWELS and word[index - 1] in _RU_VOWELS:
+                return index + 1
+        return len(word)
+
+    r1 = next_region(0)
+    return rv, next_region(r1)
+
+def _stem_russian(word: str) -> str:
+    """
+    Стемминг русского слова по алгоритму Snowball
+    """
+    rv, r2 = _ru_regions(word)
+    prefix, region = word[:rv], word[rv:]
+
+    # Шаг 1: деепричастие, иначе возвратная частица и прилагательное, глагол или существительное
+    stemmed = _remove_grouped(region, _RU_PERFECTIVE_GERUND)
+    if stemmed == region:
+        ending = _longest_ending(region, _RU_REFLEXIVE)
+        if ending:
+            region = region[:-len(ending)]
+
+        ending = _longest_ending(region, _RU_ADJECTIVE)
+        if ending:
+            stemmed = _remove_grouped(region[:-len(ending)], _RU_PARTICIPLE)
+        else:
+            stemmed = _remove_grouped(region, _RU_VERB)
+            if stemmed == region:
+                ending = _longest_ending(region, _RU_NOUN)
+                stemmed = region[:-len(ending)] if ending else region
+    region = stemmed
+
+    # Шаг 2
+    if region.endswith("и"):
+        region = region[:-1]
+
+    # Шаг 3: словообразовательное окончание в области R2
+    ending = _longest_ending(region, _RU_DERIVATIONAL)
+    if ending and rv + len(region) - len(ending) >= r2:
+        region = region[:-len(ending)]
+
+    # Шаг 4
+    if region.endswith("нн"):
+        region = region[:-1]
+    else:
+        ending = _longest_ending(region, _RU_SUPERLATIVE)
+        if ending:
+            region = region[:-len(ending)]
+            if region.endswith("нн"):
+                region = region[:-1]
+        elif region.endswith("ь"):
+            region = region[:-1]
+
+    return prefix + region
+
+def _stem_english(word: str) -> str:
+    """
+    Упрощенный стемминг английского слова: отбрасывает окончания множественного числа,
+    форм глагола и наречий и конечную "e"
+    """
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+
+    for suffix in _EN_SUFFIXES:
+        stem = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 3 and re.search(r"[aeiouy]", stem):
+            if suffix == "ies":
+                stem += "y"
+            elif len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "aeiouls":
+                # running -> run
+                stem = stem[:-1]
+            word = stem
+            break
+
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Приводит слово к основе (русское или английское слово определяется по алфавиту)
+
+    Аргументы:
+        word (str): Слово в нижнем регистре
+
+    Возвращает:
+        str: Основа слова
+    """
+    if word.isdigit():
+        # Незначащие нули не влияют на поиск: "03" и "3" - одно и то же число
+        return word.lstrip("0") or "0"
+    if _CYRILLIC_RE.search(word):
+        return _stem_russian(word)
+    return _stem_english(word)
+
+def normalize_text(text: str) -> str:
+    """
+    Приводит текст к виду для поиска: нижний регистр без учета особенностей алфавитов, "ё" -> "е"
+    """
+    return text.casefold().replace("ё", "е")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на слова в нормализованном виде
+
+    Аргументы:
+        text (str): Исходный текст
+
+    Возвращает:
+        List[str]: Слова (буквенные слова короче двух букв отбрасываются)
+    """
+    return [
+        token for token in _TOKEN_RE.findall(normalize_text(text))
+        if len(token) > 1 or token.isdigit()
+    ]
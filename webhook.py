@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import multiprocessing
+import signal
+from typing import Any, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import (
+    WEBHOOK_BASE_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_DRAIN_TIMEOUT,
+    WORKER_USER_CACHE_TTL,
+    FSM_STORAGE
+)
+
+logger = logging.getLogger(__name__)
+
+class DrainingRequestHandler(SimpleRequestHandler):
+    """
+    Обработчик вебхука, который при остановке перестает принимать новые обновления
+    и дожидается завершения уже принятых, прежде чем закрыть сессию бота
+    """
+
+    def __init__(
+            self,
+            dispatcher: Dispatcher,
+            bot: Bot,
+            drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT,
+            **kwargs: Any
+    ):
+        """
+        Аргументы:
+            dispatcher (Dispatcher): Диспетчер бота
+            bot (Bot): Экземпляр бота
+            drain_timeout (float): Максимальное время ожидания обработки принятых обновлений в секундах
+            **kwargs: Остальные аргументы SimpleRequestHandler
+        """
+        # Ожидание при остановке отслеживает фоновые задачи обработки, поэтому обновления
+        # всегда обрабатываются в фоне (Telegram сразу получает ответ на запрос)
+        kwargs.pop("handle_in_background", None)
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self.drain_timeout = drain_timeout
+        self._closing = False
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Количество обновлений, которые сейчас обрабатываются
+        """
+        return len(self._background_feed_update_tasks)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self._closing:
+            # Telegram повторит доставку обновления позже (или другому процессу)
+            return web.Response(status=503, text="Shutting down")
+        return await super().handle(request)
+
+    __call__ = handle
+
+    async def close(self) -> None:
+        """
+        Дожидается обработки принятых обновлений и закрывает сессию бота
+        """
+        self._closing = True
+
+        tasks = list(self._background_feed_update_tasks)
+        if tasks:
+            logger.info("Draining %d in-flight updates...", len(tasks))
+            done, pending = await asyncio.wait(tasks, timeout=self.drain_timeout)
+            if pending:
+                logger.warning("%d updates were not processed before shutdown", len(pending))
+                for task in pending:
+                    task.cancel()
+
+        await super().close()
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, **kwargs: Any) -> web.Application:
+    """
+    Создает aiohttp-приложение, которое принимает обновления от Telegram
+
+    Аргументы:
+        dp (Dispatcher): Диспетчер бота
+        bot (Bot): Экземпляр бота
+        **kwargs: Дополнительные данные для обработчиков запуска и остановки
+
+    Возвращает:
+        web.Application: Приложение с обработчиком вебхука
+    """
+    app = web.Application()
+
+    handler = DrainingRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SECRET or None
+    )
+    handler.register(app, path=WEBHOOK_PATH)
+
+    # События запуска и остановки диспетчера привязываются к жизненному циклу приложения
+    setup_application(app, dp, bot=bot, **kwargs)
+
+    return app
+
+async def run_webhook(
+        dp: Dispatcher,
+        bot: Bot,
+        host: str = WEBHOOK_HOST,
+        port: int = WEBHOOK_PORT,
+        reuse_port: bool = False,
+        set_webhook: bool = True,
+        worker_index: Optional[int] = None
+) -> None:
+    """
+    Запускает бота в режиме вебхука и работает до получения сигнала остановки
+
+    Аргументы:
+        dp (Dispatcher): Диспетчер бота
+        bot (Bot): Экземпляр бота
+        host (str): Адрес, на котором слушает сервер
+        port (int): Порт сервера
+        reuse_port (bool): Разрешить нескольким процессам слушать один порт
+        set_webhook (bool): Зарегистрировать вебхук в Telegram после запуска сервера
+        worker_index (Optional[int]): Номер процесса-обработчика при запуске в нескольких процессах
+    """
+    app = create_webhook_app(dp, bot, worker_index=worker_index)
+    runner = web.AppRunner(app, handle_signals=False)
+    await runner.setup()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Например, на Windows или не в главном потоке
+            pass
+
+    try:
+        site = web.TCPSite(runner, host=host, port=port, reuse_port=reuse_port or None)
+        await site.start()
+        logger.info("Webhook server is listening on %s:%s%s", host, port, WEBHOOK_PATH)
+
+        # Регистрируем вебхук в Telegram, только если задан публичный адрес.
+        # Без него вебхук настраивается снаружи (например, одним процессом за балансировщиком)
+        if set_webhook and WEBHOOK_BASE_URL:
+            await bot.set_webhook(
+                url=f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}",
+                secret_token=WEBHOOK_SECRET or None,
+                allowed_updates=dp.resolve_used_update_types()
+            )
+
+        await stop_event.wait()
+    finally:
+        logger.info("Stopping webhook server...")
+        await runner.cleanup()
+
+def _run_worker(worker_index: int) -> None:
+    """
+    Точка входа процесса-обработчика
+    """
+    import app
+    from database.user_cache import user_cache
+
+    # Профиль может измениться в другом процессе, поэтому кэш хранит его недолго
+    user_cache.ttl = min(user_cache.ttl, WORKER_USER_CACHE_TTL)
+
+    try:
+        asyncio.run(app.main(worker_index=worker_index))
+    except KeyboardInterrupt:
+        pass
+
+def run_workers(count: int) -> None:
+    """
+    Запускает несколько процессов-обработчиков вебхука на одном порту и ждет их завершения.
+    Состояние, общее для процессов (пользователи, идентификаторы путей, file_id, FSM при
+    FSM_STORAGE=sqlite или redis), хранится в базе данных; остальные кэши у каждого процесса свои
+    и проверяют актуальность по версиям данных
+
+    Аргументы:
+        count (int): Количество процессов
+    """
+    if count > 1 and FSM_STORAGE == "memory":
+        # У каждого процесса было бы свое хранилище: состояние (например, ожидание поискового запроса)
+        # терялось бы, как только следующее обновление пользователя попадет в другой процесс
+        raise RuntimeError("WEBHOOK_WORKERS > 1 requires FSM_STORAGE=sqlite or FSM_STORAGE=redis")
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_run_worker, args=(index,), name=f"webhook-worker-{index}")
+        for index in range(count)
+    ]
+
+    for process in processes:
+        process.start()
+    logger.info("Started %d webhook workers", count)
+
+    def stop(signum, frame):
+        # Каждый процесс сам дожидается обработки принятых обновлений
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for process in processes:
+        process.join()